@@ -5,6 +5,8 @@ Main GUI Application
 import logging
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 from PyQt5.QtCore import Qt, QThread, QTime, QTimer, pyqtSignal
@@ -43,6 +45,7 @@ from PyQt5.QtWidgets import (
 from ..platforms.factory import PlatformFactory
 from ..utils.config import ConfigManager
 from ..utils.logger import get_logger
+from .control import connect_monitoring_service
 
 # Optional services
 try:
@@ -95,14 +98,21 @@ class MonitoringWorker(QThread):
 
     data_updated = pyqtSignal(dict)
 
-    def __init__(self, monitoring_service):
+    # Seconds between refreshes of the last-hour CPU statistics
+    STATISTICS_INTERVAL = 60.0
+
+    def __init__(self, monitoring_service, interval: float = 2.0):
         super().__init__()
         self.monitoring_service = monitoring_service
+        self.interval = interval
         self.is_running = False
+        self._stop_event = threading.Event()
+        self._statistics_updated = None
 
     def run(self):
         """Run monitoring loop"""
         self.is_running = True
+        self._stop_event.clear()
         self.logger = logging.getLogger(__name__)
         self.logger.info("MonitoringWorker thread started")
 
@@ -110,19 +120,40 @@ class MonitoringWorker(QThread):
             try:
                 data = self.monitoring_service.get_system_stats()
                 if data:  # Only emit if we have data
+                    self._add_statistics(data)
                     self.data_updated.emit(data)
                 else:
                     self.logger.warning("No monitoring data received")
-                self.msleep(2000)  # Update every 2 seconds
+                # The service picks the next interval from system activity
+                delay = data.get("next_interval") if data else None
+                self._stop_event.wait(delay or self.interval)
             except Exception as e:
                 self.logger.error(f"Monitoring error: {e}")
-                self.msleep(5000)  # Wait longer on error
+                self._stop_event.wait(5)  # Wait longer on error
 
         self.logger.info("MonitoringWorker thread stopped")
 
+    def _add_statistics(self, data: dict):
+        """Attach last-hour CPU statistics when they are due for a refresh"""
+        if not hasattr(self.monitoring_service, "get_statistics"):
+            return
+        now = time.monotonic()
+        if (
+            self._statistics_updated is not None
+            and now - self._statistics_updated < self.STATISTICS_INTERVAL
+        ):
+            return
+        self._statistics_updated = now
+        try:
+            stats = self.monitoring_service.get_statistics(["cpu"], 3600)
+            data["cpu_statistics"] = stats.get("cpu")
+        except Exception as e:
+            self.logger.warning(f"Cannot compute CPU statistics: {e}")
+
     def stop(self):
         """Stop the monitoring loop"""
         self.is_running = False
+        self._stop_event.set()
         self.wait()  # Wait for thread to finish
 
 
@@ -253,7 +284,11 @@ class SysPilotApp:
 
         # Services - use platform factory
         self.cleanup_service = PlatformFactory.create_cleanup_service(self.config)
-        self.monitoring_service = PlatformFactory.create_monitoring_service(self.config)
+        # Reuse the daemon's samples when it is running
+        self.monitoring_service = connect_monitoring_service(
+            self.config,
+            lambda: PlatformFactory.create_monitoring_service(self.config),
+        )
         self.system_info_service = PlatformFactory.create_system_info_service()
 
         # Optional services
@@ -462,6 +497,10 @@ class SysPilotApp:
         self.monitoring_widgets["cpu_label"] = QLabel("CPU Usage: Loading...")
         stats_layout.addWidget(self.monitoring_widgets["cpu_label"])
 
+        # CPU statistics over the last hour
+        self.monitoring_widgets["cpu_stats_label"] = QLabel("CPU Last Hour: N/A")
+        stats_layout.addWidget(self.monitoring_widgets["cpu_stats_label"])
+
         # CPU temperature
         self.monitoring_widgets["cpu_temp_label"] = QLabel(
             "CPU Temperature: Loading..."
@@ -762,20 +801,32 @@ class SysPilotApp:
     def start_monitoring(self):
         """Start system monitoring"""
         self.logger.info("Creating monitoring worker...")
-        self.monitoring_worker = MonitoringWorker(self.monitoring_service)
+        self.monitoring_worker = MonitoringWorker(
+            self.monitoring_service, self.config.get_monitoring_interval()
+        )
         self.monitoring_worker.data_updated.connect(self.update_monitoring_data)
         self.logger.info("Starting monitoring worker thread...")
         self.monitoring_worker.start()
         self.logger.info("Monitoring worker started successfully")
 
-        # Also set up a timer as backup to ensure updates happen
+        # Backup timer in case the worker stalls; it only samples when no
+        # update arrived for longer than the longest adaptive interval
+        adaptive = self.config.get("monitoring", "adaptive_interval", {})
+        self.monitoring_watchdog_interval = (
+            max(adaptive.get("max_interval", 30), self.config.get_monitoring_interval())
+            + 5
+        )
+        self.last_monitoring_update = time.monotonic()
         self.monitoring_timer = QTimer()
         self.monitoring_timer.timeout.connect(self.manual_monitoring_update)
-        self.monitoring_timer.start(3000)  # Every 3 seconds
+        self.monitoring_timer.start(int(self.monitoring_watchdog_interval * 1000))
         self.logger.info("Backup monitoring timer started")
 
     def manual_monitoring_update(self):
         """Manual monitoring update as backup"""
+        stale = time.monotonic() - self.last_monitoring_update
+        if stale < self.monitoring_watchdog_interval:
+            return
         try:
             data = self.monitoring_service.get_system_stats()
             if data:
@@ -785,11 +836,21 @@ class SysPilotApp:
 
     def update_monitoring_data(self, data):
         """Update monitoring widgets with new data"""
+        self.last_monitoring_update = time.monotonic()
         # Update traditional monitoring widgets
         if "cpu_percent" in data:
             cpu_text = f"CPU Usage: {data['cpu_percent']:.1f}%"
             self.monitoring_widgets["cpu_label"].setText(cpu_text)
 
+        # Computed by the monitoring worker, about once a minute
+        cpu_stats = data.get("cpu_statistics")
+        if cpu_stats and cpu_stats.get("count"):
+            stats_text = (
+                f"CPU Last Hour: mean {cpu_stats['mean']:.1f}%, "
+                f"p95 {cpu_stats['p95']:.1f}%, max {cpu_stats['max']:.1f}%"
+            )
+            self.monitoring_widgets["cpu_stats_label"].setText(stats_text)
+
         if "cpu_temperature" in data and data["cpu_temperature"] is not None:
             temp_text = f"CPU Temperature: {data['cpu_temperature']:.1f}°C"
             self.monitoring_widgets["cpu_temp_label"].setText(temp_text)
@@ -820,7 +881,10 @@ class SysPilotApp:
             self.monitoring_widgets["disk_label"].setText(disk_text)
 
         if "network_io" in data and data["network_io"]:
-            network_text = f"Network: {data['network_io'].get('bytes_sent', 0)} KB/s up, {data['network_io'].get('bytes_recv', 0)} KB/s down"
+            network_text = (
+                f"Network: {data['network_io'].get('bytes_sent_rate', 0):.1f} KB/s up, "
+                f"{data['network_io'].get('bytes_recv_rate', 0):.1f} KB/s down"
+            )
             self.monitoring_widgets["network_label"].setText(network_text)
 
         if "top_processes" in data and data["top_processes"]:
@@ -1115,4 +1179,6 @@ class SysPilotApp:
         else:
             if self.monitoring_worker:
                 self.monitoring_worker.stop()
+            if hasattr(self.monitoring_service, "stop"):
+                self.monitoring_service.stop()
             event.accept()
@@ -4,13 +4,17 @@ Command Line Interface
 
 import argparse
 import sys
+import time
+from datetime import datetime
 from typing import Optional
 
+from ..monitoring.shared import SharedSnapshotReader
 from ..services.cleanup_service import CleanupService
 from ..services.monitoring_service import MonitoringService
 from ..services.system_info import SystemInfoService
 from ..utils.config import ConfigManager
 from ..utils.logger import get_logger
+from .control import connect_monitoring_service
 
 
 class SysPilotCLI:
@@ -28,7 +32,10 @@ class SysPilotCLI:
 
         # Services
         self.cleanup_service = CleanupService(self.config)
-        self.monitoring_service = MonitoringService(self.config)
+        # Reuse the daemon's samples when it is running
+        self.monitoring_service = connect_monitoring_service(
+            self.config, lambda: MonitoringService(self.config)
+        )
         self.system_info_service = SystemInfoService()
 
     def run(self):
@@ -180,9 +187,10 @@ class SysPilotCLI:
         print("2. Top Processes")
         print("3. Disk Usage")
         print("4. Network Information")
-        print("5. Back to Main Menu")
+        print("5. Statistics (Last Hour)")
+        print("6. Back to Main Menu")
 
-        choice = input("\nEnter your choice (1-5): ").strip()
+        choice = input("\nEnter your choice (1-6): ").strip()
 
         if choice == "1":
             self.show_current_stats()
@@ -193,6 +201,8 @@ class SysPilotCLI:
         elif choice == "4":
             self.show_network_info()
         elif choice == "5":
+            self.show_statistics()
+        elif choice == "6":
             return
         else:
             print("Invalid choice. Please try again.")
@@ -229,6 +239,89 @@ class SysPilotCLI:
         except Exception as e:
             print(f"Error getting system stats: {e}")
 
+    def watch_stats(self, interval: float = 1.0):
+        """Show live statistics until interrupted"""
+        shared_config = self.config.get("daemon", "shared_memory", {})
+        reader = SharedSnapshotReader.open(shared_config.get("name"))
+        generation = None
+
+        print("Live System Statistics (Ctrl+C to stop):")
+        try:
+            while True:
+                if reader is not None:
+                    # Published by the daemon: only print new snapshots
+                    if reader.generation != generation:
+                        generation = reader.generation
+                        values = reader.read()
+                        if values:
+                            self._print_stats_line(values)
+                else:
+                    stats = self.monitoring_service.get_system_stats()
+                    network = stats.get("network_io", {})
+                    self._print_stats_line(
+                        {
+                            "timestamp": time.time(),
+                            "cpu_percent": stats.get("cpu_percent"),
+                            "memory_percent": stats.get("memory_percent"),
+                            "disk_percent": stats.get("disk_percent"),
+                            "network_sent_rate": network.get("bytes_sent_rate"),
+                            "network_recv_rate": network.get("bytes_recv_rate"),
+                        }
+                    )
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print()
+        finally:
+            if reader is not None:
+                reader.close()
+
+    @staticmethod
+    def _print_stats_line(values: dict):
+        """Print one line of live statistics"""
+        stamp = datetime.fromtimestamp(values["timestamp"]).strftime("%H:%M:%S")
+        print(
+            f"{stamp}  CPU {values.get('cpu_percent') or 0:5.1f}%  "
+            f"Memory {values.get('memory_percent') or 0:5.1f}%  "
+            f"Disk {values.get('disk_percent') or 0:5.1f}%  "
+            f"Net {values.get('network_sent_rate') or 0:.1f}/"
+            f"{values.get('network_recv_rate') or 0:.1f} KB/s"
+        )
+
+    def show_statistics(self, window: int = 3600):
+        """Show usage statistics over a recent window"""
+        print(f"\nUsage Statistics (last {window // 60} minutes):")
+        print("=" * 60)
+
+        try:
+            stats = self.monitoring_service.get_statistics(
+                ["cpu", "memory", "disk"], window
+            )
+
+            if not any(summary.get("count") for summary in stats.values()):
+                print("No history recorded yet. Start the daemon to record history.")
+                return
+
+            print(
+                f"{'Metric':<8} {'Mean':<8} {'p50':<8} {'p95':<8} {'p99':<8} "
+                f"{'Max':<8} {'Above':<10}"
+            )
+            print("-" * 60)
+
+            for metric, summary in stats.items():
+                if not summary.get("count"):
+                    continue
+
+                above = summary.get("time_above")
+                above_text = f"{above / 60:.1f} min" if above is not None else "-"
+                print(
+                    f"{metric:<8} {summary['mean']:<8.1f} {summary['p50']:<8.1f} "
+                    f"{summary['p95']:<8.1f} {summary['p99']:<8.1f} "
+                    f"{summary['max']:<8.1f} {above_text:<10}"
+                )
+
+        except Exception as e:
+            print(f"Error getting statistics: {e}")
+
     def show_top_processes(self):
         """Show top processes"""
         print("\nTop Processes (by CPU usage):")
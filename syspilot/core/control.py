@@ -0,0 +1,579 @@
+"""
+Daemon control socket
+
+The daemon listens on a Unix domain socket so the GUI and CLI can reuse its
+samples and history instead of each running their own collectors. Messages
+are length-prefixed frames:
+
+    payload length u32 (big endian), codec u8, payload
+
+The payload is msgpack when the ``msgpack`` package is installed and JSON
+otherwise; the server answers in the codec of the request. Requests are
+``{"method": ..., "params": {...}}`` and responses ``{"ok": true,
+"result": ...}`` or ``{"ok": false, "error": ...}``. A ``subscribe``
+request turns the connection into a stream of one response per tick; its
+optional ``metrics`` parameter limits the stream to those metric values.
+The server runs on the daemon's event loop and is fed by the monitoring
+engine's subscriptions.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from ..monitoring.engine import EventLoopThread, MonitoringEngine
+from ..utils.logger import get_logger
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_SOCKET_PATH = "~/.config/syspilot/daemon.sock"
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+FRAME_HEADER = struct.Struct(">IB")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class ControlError(Exception):
+    """Error reported by the daemon or the transport"""
+
+
+class DaemonUnavailable(ControlError):
+    """The daemon cannot be reached or closed the connection"""
+
+
+def _plain(value):
+    """Convert history views and tuples to types every codec can encode"""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    # memoryview, array.array, numpy arrays and numpy scalars
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return value
+
+
+def encode(message, codec: int) -> bytes:
+    """Encode a message as one frame"""
+    if codec == CODEC_MSGPACK:
+        payload = msgpack.packb(message, default=_plain)
+    else:
+        payload = json.dumps(message, default=_plain, separators=(",", ":")).encode()
+    return FRAME_HEADER.pack(len(payload), codec) + payload
+
+
+def _frame_header(header: bytes):
+    """Unpack and check a frame header"""
+    length, codec = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ControlError(f"Frame of {length} bytes exceeds the limit")
+    return length, codec
+
+
+def _decode_payload(payload: bytes, codec: int):
+    """Decode a frame payload"""
+    try:
+        if codec == CODEC_MSGPACK:
+            if msgpack is None:
+                raise ControlError(
+                    "msgpack frame received but msgpack is not installed"
+                )
+            return msgpack.unpackb(payload)
+        if codec == CODEC_JSON:
+            return json.loads(payload)
+    except ValueError as e:
+        # Covers malformed JSON and msgpack, and non-string msgpack map keys
+        raise ControlError(f"Cannot decode frame: {e}")
+    raise ControlError(f"Unknown codec {codec}")
+
+
+def read_frame(stream):
+    """
+    Read one frame from a binary file object
+
+    Returns:
+        (message, codec), or None at end of stream
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+
+    length, codec = _frame_header(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return _decode_payload(payload, codec), codec
+
+
+async def read_frame_async(reader: asyncio.StreamReader):
+    """
+    Read one frame from an asyncio stream
+
+    Returns:
+        (message, codec), or None at end of stream
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        length, codec = _frame_header(header)
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        return None
+    return _decode_payload(payload, codec), codec
+
+
+def socket_path(config=None) -> Path:
+    """Control socket path from the daemon configuration"""
+    path = DEFAULT_SOCKET_PATH
+    if config is not None:
+        path = config.get("daemon", "control_socket", {}).get("path", path)
+    return Path(path).expanduser()
+
+
+class ControlServer:
+    """Serve daemon calls on a Unix domain socket"""
+
+    def __init__(
+        self,
+        daemon,
+        path: Optional[str] = None,
+        engine: Optional[MonitoringEngine] = None,
+        runner: Optional[EventLoopThread] = None,
+    ):
+        """
+        Initialize control server
+
+        Args:
+            daemon: SysPilotDaemon whose services are exposed
+            path: Socket path (defaults to the configured path)
+            engine: Monitoring engine feeding subscriptions
+            runner: Event loop thread to serve on (the engine's by default)
+        """
+        self.daemon = daemon
+        self.path = Path(path).expanduser() if path else socket_path(daemon.config)
+        self.engine = engine
+        self.runner = runner or (engine.runner if engine else EventLoopThread())
+        self.logger = get_logger(__name__)
+
+        self._owns_runner = runner is None and engine is None
+        self._server = None
+        # Connection handler task -> its writer
+        self._clients = {}
+        self._subscriptions = set()
+
+        self.methods = {
+            "snapshot": self._snapshot,
+            "history": self._history,
+            "statistics": self._statistics,
+            "process_info": self._process_info,
+            "processes_info": self._processes_info,
+            "temperature_sensors": self._temperature_sensors,
+            "cleanup": self._cleanup,
+            "status": self._status,
+        }
+
+    def start(self):
+        """Bind the socket and serve on the event loop"""
+        if self._server is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Left over from a daemon that did not shut down cleanly
+        if self.path.exists():
+            self.path.unlink()
+
+        self.runner.start()
+        self._server = self.runner.run(
+            asyncio.start_unix_server(self._handle, str(self.path))
+        )
+        os.chmod(self.path, 0o600)
+        self.logger.info(f"Control socket listening on {self.path}")
+
+    def stop(self):
+        """Stop serving and remove the socket"""
+        if self._server is None:
+            return
+
+        async def close(server):
+            server.close()
+            # Connections outlive the listening socket: end them as well,
+            # letting their handlers return instead of being cancelled
+            for subscription in list(self._subscriptions):
+                subscription.close()
+            for writer in self._clients.values():
+                writer.close()
+            if self._clients:
+                await asyncio.wait(list(self._clients), timeout=5)
+            await server.wait_closed()
+
+        self.runner.run(close(self._server))
+        self._server = None
+        if self._owns_runner:
+            self.runner.stop()
+
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+    async def _handle(self, reader, writer):
+        """Answer requests on one client connection"""
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                frame = await read_frame_async(reader)
+                if frame is None:
+                    return
+
+                request, codec = frame
+                method = request.get("method") if isinstance(request, dict) else None
+                params = (request.get("params") or {}) if method else {}
+
+                if method == "subscribe":
+                    await self._stream(writer, codec, params)
+                    return
+
+                try:
+                    # Calls may block (statistics, cleanup): keep them off
+                    # the event loop
+                    result = await loop.run_in_executor(
+                        None, self.dispatch, method, params
+                    )
+                    response = encode({"ok": True, "result": result}, codec)
+                except Exception as e:
+                    response = encode({"ok": False, "error": str(e)}, codec)
+
+                writer.write(response)
+                await writer.drain()
+        except (ControlError, ValueError) as e:
+            self.logger.warning(f"Dropping control client: {e}")
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # The loop is stopping with the client still connected
+            writer.close()
+            raise
+        finally:
+            self._clients.pop(task, None)
+            writer.close()
+
+    async def _stream(self, writer, codec: int, params: Dict):
+        """Send every tick until the client goes away"""
+        if self.engine is None:
+            error = {"ok": False, "error": "Monitoring is not running"}
+            writer.write(encode(error, codec))
+            await writer.drain()
+            return
+
+        subscription = self.engine.subscribe(params.get("metrics"))
+        self._subscriptions.add(subscription)
+        try:
+            async for item in subscription:
+                writer.write(encode({"ok": True, "result": item}, codec))
+                await writer.drain()
+        finally:
+            self._subscriptions.discard(subscription)
+            subscription.close()
+
+    def dispatch(self, method: Optional[str], params: Dict):
+        """Run one call and return its result"""
+        handler = self.methods.get(method)
+        if handler is None:
+            raise ControlError(f"Unknown method: {method}")
+        return handler(**params)
+
+    def _snapshot(self) -> Dict:
+        service = self.daemon.monitoring_service
+        snapshot = service.last_snapshot
+        if snapshot is None:
+            return service.get_system_stats()
+        return snapshot.to_dict(service.alert_engine.active())
+
+    def _history(self, metric: str, limit: Optional[int] = None, **kwargs) -> Dict:
+        return _plain(
+            self.daemon.monitoring_service.get_history(metric, limit, **kwargs)
+        )
+
+    def _statistics(self, metrics, window: float, **kwargs) -> Dict:
+        return self.daemon.monitoring_service.get_statistics(metrics, window, **kwargs)
+
+    def _process_info(self, pid: int, **kwargs) -> Dict:
+        return self.daemon.monitoring_service.get_process_info(pid, **kwargs)
+
+    def _processes_info(self, pids, fields=None) -> Dict:
+        result = self.daemon.monitoring_service.get_processes_info(pids, fields)
+        # Map keys are strings in both codecs; the client restores the PIDs
+        return {str(pid): info for pid, info in result.items()}
+
+    def _temperature_sensors(self):
+        return self.daemon.monitoring_service.get_temperature_sensors()
+
+    def _cleanup(self) -> Dict:
+        self.logger.info("Cleanup requested over the control socket")
+        return self.daemon.cleanup_service.full_cleanup()
+
+    def _status(self) -> Dict:
+        return self.daemon.get_daemon_status()
+
+
+class DaemonClient:
+    """Client for the daemon control socket"""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 5.0):
+        """
+        Initialize client
+
+        Args:
+            path: Socket path (defaults to the default path)
+            timeout: Seconds to wait for a response
+        """
+        self.path = Path(path or DEFAULT_SOCKET_PATH).expanduser()
+        self.timeout = timeout
+        self.codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+        self._lock = threading.Lock()
+        self._sock = None
+        self._stream = None
+
+    @classmethod
+    def connect(cls, path: Optional[str] = None, timeout: float = 5.0):
+        """
+        Connect to a running daemon
+
+        Returns:
+            Connected DaemonClient, or None when no daemon is listening
+        """
+        client = cls(path, timeout)
+        try:
+            client._open()
+        except OSError:
+            return None
+        return client
+
+    def _open(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._stream = sock.makefile("rb")
+
+    def close(self):
+        """Close the connection"""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def call(self, method: str, **params):
+        """
+        Call a daemon method
+
+        Returns:
+            The method's result
+
+        Raises:
+            DaemonUnavailable: The connection failed
+            ControlError: The daemon reported an error
+        """
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._open()
+                self._sock.sendall(
+                    encode({"method": method, "params": params}, self.codec)
+                )
+                frame = read_frame(self._stream)
+            except OSError as e:
+                self.close()
+                raise DaemonUnavailable(f"Daemon connection failed: {e}")
+
+            if frame is None:
+                self.close()
+                raise DaemonUnavailable("Daemon closed the connection")
+
+        response = frame[0]
+        if not response.get("ok"):
+            raise ControlError(response.get("error", "Unknown error"))
+        return response.get("result")
+
+    def subscribe(self, metrics=None) -> Iterator[Dict]:
+        """
+        Stream the stats of every tick taken by the daemon
+
+        Uses its own connection, so the client stays usable for calls.
+
+        Args:
+            metrics: Only stream these metric values (see the monitoring
+                service's metric_values)
+        """
+        client = type(self)(self.path, timeout=None)
+        request = {"method": "subscribe", "params": {"metrics": metrics}}
+        try:
+            client._open()
+            client._sock.sendall(encode(request, client.codec))
+            while True:
+                frame = read_frame(client._stream)
+                if frame is None:
+                    return
+                response = frame[0]
+                if not response.get("ok"):
+                    raise ControlError(response.get("error", "Unknown error"))
+                yield response.get("result")
+        finally:
+            client.close()
+
+    def snapshot(self) -> Dict:
+        """Stats of the daemon's latest tick"""
+        return self.call("snapshot")
+
+    def history(self, metric: str, limit: Optional[int] = None, **kwargs) -> Dict:
+        """Columns of a history metric, as lists"""
+        return self.call("history", metric=metric, limit=limit, **kwargs)
+
+    def statistics(self, metrics, window: float, **kwargs) -> Dict:
+        """Window statistics computed by the daemon"""
+        return self.call("statistics", metrics=list(metrics), window=window, **kwargs)
+
+    def process_info(self, pid: int, **kwargs) -> Dict:
+        """Information about one process, with its history if tracked"""
+        return self.call("process_info", pid=pid, **kwargs)
+
+    def processes_info(self, pids, fields=None) -> Dict[int, Dict]:
+        """Requested fields of several processes"""
+        result = self.call("processes_info", pids=list(pids), fields=fields)
+        return {int(pid): info for pid, info in result.items()}
+
+    def temperature_sensors(self):
+        """Every temperature sensor of the daemon's host"""
+        return self.call("temperature_sensors")
+
+    def cleanup(self) -> Dict:
+        """Run a full cleanup in the daemon"""
+        return self.call("cleanup")
+
+    def status(self) -> Dict:
+        """Daemon status"""
+        return self.call("status")
+
+
+class RemoteMonitoringService:
+    """
+    MonitoringService stand-in backed by the daemon
+
+    Falls back to a local service, created on first need, when the daemon
+    goes away. Errors the daemon reports for a call are raised to the
+    caller. While connected, methods the socket does not offer raise
+    AttributeError rather than starting a second sampler next to the
+    daemon.
+    """
+
+    def __init__(self, client: DaemonClient, local_factory: Callable[[], object]):
+        """
+        Initialize remote service
+
+        Args:
+            client: Connected daemon client
+            local_factory: Creates the local MonitoringService fallback
+        """
+        self.client = client
+        self.local_factory = local_factory
+        self.logger = get_logger(__name__)
+        self._local = None
+
+    @property
+    def local(self):
+        """Local monitoring service, created on first use"""
+        if self._local is None:
+            self._local = self.local_factory()
+        return self._local
+
+    def _remote(self, method: str, *args, **kwargs):
+        """Call the daemon, or the local service once the daemon is gone"""
+        if self.client is not None:
+            try:
+                return getattr(self.client, method)(*args, **kwargs)
+            except DaemonUnavailable as e:
+                self.logger.warning(f"Daemon unavailable, sampling locally: {e}")
+                self.client.close()
+                self.client = None
+        return None
+
+    def get_system_stats(self) -> Dict:
+        stats = self._remote("snapshot")
+        return stats if stats is not None else self.local.get_system_stats()
+
+    def get_history(self, metric: str, limit: Optional[int] = None, **kwargs):
+        history = self._remote("history", metric, limit, **kwargs)
+        if history is not None:
+            return history
+        return self.local.get_history(metric, limit, **kwargs)
+
+    def get_statistics(self, metrics, window: float, **kwargs) -> Dict:
+        stats = self._remote("statistics", metrics, window, **kwargs)
+        if stats is not None:
+            return stats
+        return self.local.get_statistics(metrics, window, **kwargs)
+
+    def get_process_info(self, pid: int, **kwargs) -> Dict:
+        info = self._remote("process_info", pid, **kwargs)
+        return info if info is not None else self.local.get_process_info(pid, **kwargs)
+
+    def get_processes_info(self, pids, fields=None) -> Dict[int, Dict]:
+        pids = list(pids)
+        info = self._remote("processes_info", pids, fields)
+        if info is not None:
+            return info
+        return self.local.get_processes_info(pids, fields)
+
+    def get_temperature_sensors(self):
+        sensors = self._remote("temperature_sensors")
+        if sensors is not None:
+            return sensors
+        return self.local.get_temperature_sensors()
+
+    def __getattr__(self, name: str):
+        if self.__dict__.get("client") is not None:
+            raise AttributeError(f"{name} is not available from the daemon")
+        return getattr(self.local, name)
+
+    def stop(self):
+        """Close the connection and stop the local fallback, if any"""
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        if self._local is not None and hasattr(self._local, "stop"):
+            self._local.stop()
+
+
+def connect_monitoring_service(config, local_factory: Callable[[], object]):
+    """
+    Monitoring service for the GUI and CLI
+
+    Args:
+        config: ConfigManager
+        local_factory: Creates a local MonitoringService
+
+    Returns:
+        RemoteMonitoringService when a daemon is listening, otherwise the
+        local service
+    """
+    if config.get("daemon", "control_socket", {}).get("enabled", True):
+        client = DaemonClient.connect(str(socket_path(config)))
+        if client is not None:
+            return RemoteMonitoringService(client, local_factory)
+    return local_factory()
@@ -12,11 +12,16 @@ from typing import Optional
 
 import schedule
 
+from ..monitoring.engine import EventLoopThread, MonitoringEngine
+from ..monitoring.exporter import MetricsExporter
+from ..monitoring.shared import SharedSnapshotPublisher
+from ..monitoring.tsdb import TimeSeriesStore
 from ..services.cleanup_service import CleanupService
 from ..services.monitoring_service import MonitoringService
 from ..services.scheduling_service import SchedulingService
 from ..utils.config import ConfigManager
 from ..utils.logger import get_logger
+from .control import ControlServer
 
 
 class SysPilotDaemon:
@@ -39,8 +44,34 @@ class SysPilotDaemon:
 
         # Daemon state
         self.is_running = False
-        self.monitoring_thread = None
         self.scheduler_thread = None
+        self.stop_event = threading.Event()
+
+        # Scheduled cleanups wait for an idle system in their own thread, so
+        # the scheduler keeps running other jobs meanwhile
+        self.cleanup_thread = None
+
+        # One event loop runs monitoring, the control socket and the exporter
+        self.event_loop = EventLoopThread("syspilot-daemon")
+        self.monitoring_engine = MonitoringEngine(
+            self.monitoring_service,
+            self.config.get_monitoring_interval(),
+            runner=self.event_loop,
+            adaptive=True,
+        )
+        self.monitoring_engine.add_listener(self._on_monitoring_tick)
+
+        # Memory-mapped history files, written by the monitoring loop
+        self.history_store = None
+
+        # OpenMetrics endpoint serving the latest snapshot
+        self.metrics_exporter = None
+
+        # Unix socket serving snapshots and history to the GUI and CLI
+        self.control_server = None
+
+        # Shared-memory segment with the latest snapshot, for local readers
+        self.shared_publisher = None
 
         # PID file
         self.pid_file = Path.home() / ".config" / "syspilot" / "daemon.pid"
@@ -71,11 +102,15 @@ class SysPilotDaemon:
             # Start scheduling service
             self.scheduling_service.start_scheduler()
 
-            # Start monitoring thread
+            self.event_loop.start()
+            self._start_control_server()
+
+            # Start monitoring
             if self.config.get("daemon", "monitoring_enabled", True):
-                self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
-                self.monitoring_thread.daemon = True
-                self.monitoring_thread.start()
+                self._open_history_store()
+                self._start_metrics_exporter()
+                self._open_shared_snapshot()
+                self.monitoring_engine.start()
 
             # Start scheduler thread
             self.scheduler_thread = threading.Thread(target=self._scheduler_loop)
@@ -98,17 +133,38 @@ class SysPilotDaemon:
         """Stop the daemon"""
         self.logger.info("Stopping SysPilot daemon")
         self.is_running = False
+        self.stop_event.set()
 
         # Stop scheduling service
         self.scheduling_service.stop_scheduler()
 
-        # Wait for threads to finish
-        if self.monitoring_thread and self.monitoring_thread.is_alive():
-            self.monitoring_thread.join(timeout=5)
+        self.monitoring_engine.stop()
+
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+
+        if self.control_server:
+            self.control_server.stop()
+            self.control_server = None
+
+        self.event_loop.stop()
+        self.monitoring_service.stop()
+
+        if self.history_store:
+            self.history_store.close()
+            self.history_store = None
+
+        if self.shared_publisher:
+            self.shared_publisher.close()
+            self.shared_publisher = None
 
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
 
+        if self.cleanup_thread and self.cleanup_thread.is_alive():
+            self.cleanup_thread.join(timeout=5)
+
         self._cleanup_daemon()
         self.logger.info("SysPilot daemon stopped")
 
@@ -179,8 +235,27 @@ class SysPilotDaemon:
             self.logger.error(f"Error scheduling cleanup tasks: {e}")
 
     def _scheduled_cleanup(self):
+        """Start the scheduled cleanup unless the previous one is still running"""
+        if self.cleanup_thread and self.cleanup_thread.is_alive():
+            self.logger.info("Previous scheduled cleanup still running, skipping")
+            return
+
+        self.cleanup_thread = threading.Thread(
+            target=self._run_scheduled_cleanup, name="syspilot-cleanup", daemon=True
+        )
+        self.cleanup_thread.start()
+
+    def _run_scheduled_cleanup(self):
         """Run scheduled cleanup"""
         try:
+            # Defer while the system is under pressure, but not forever
+            max_delay = self.config.get("cleanup", "pressure_throttle", {}).get(
+                "max_delay", 1800
+            )
+            self.cleanup_service.wait_for_idle(max_delay, stop_event=self.stop_event)
+            if self.stop_event.is_set():
+                return
+
             self.logger.info("Running scheduled cleanup")
 
             result = self.cleanup_service.full_cleanup()
@@ -190,33 +265,96 @@ class SysPilotDaemon:
         except Exception as e:
             self.logger.error(f"Scheduled cleanup failed: {e}")
 
-    def _monitoring_loop(self):
-        """Monitoring loop"""
+    def _on_monitoring_tick(self, stats: dict):
+        """Persist and publish a monitoring tick, and report alerts"""
+        self._persist_history()
+        self._publish_shared_snapshot(stats)
+
+        # Report alert transitions, not every firing sample
+        for alert in stats.get("alert_events", []):
+            if alert["state"] == "firing":
+                self.logger.warning(f"System alert: {alert['message']}")
+
+                # Could send notifications here
+                self._send_alert_notification(alert)
+            else:
+                self.logger.info(f"Alert resolved: {alert['name']}")
+
+    def _open_history_store(self):
+        """Open the persistent history files if enabled"""
         try:
-            self.logger.info("Starting monitoring loop")
+            if self.config.get("monitoring", "persistent_history", True):
+                self.history_store = TimeSeriesStore(
+                    capacity=self.config.get(
+                        "monitoring", "persistent_history_size", 86400
+                    )
+                )
+        except Exception as e:
+            self.logger.error(f"Error opening history store: {e}")
 
-            while self.is_running:
-                try:
-                    # Get system stats
-                    stats = self.monitoring_service.get_system_stats()
+    def _start_control_server(self):
+        """Start the control socket if enabled"""
+        try:
+            if self.config.get("daemon", "control_socket", {}).get("enabled", True):
+                self.control_server = ControlServer(self, engine=self.monitoring_engine)
+                self.control_server.start()
+        except Exception as e:
+            self.logger.error(f"Error starting control socket: {e}")
+            self.control_server = None
+
+    def _start_metrics_exporter(self):
+        """Start the OpenMetrics endpoint if enabled"""
+        try:
+            exporter_config = self.config.get("daemon", "metrics_exporter", {})
+            if exporter_config.get("enabled", False):
+                self.metrics_exporter = MetricsExporter(
+                    self.monitoring_service,
+                    host=exporter_config.get("host", "127.0.0.1"),
+                    port=exporter_config.get("port", 9877),
+                    runner=self.event_loop,
+                )
+                self.metrics_exporter.start()
+        except Exception as e:
+            self.logger.error(f"Error starting metrics exporter: {e}")
+            self.metrics_exporter = None
 
-                    # Check for alerts
-                    alerts = stats.get("alerts", [])
-                    for alert in alerts:
-                        self.logger.warning(f"System alert: {alert['message']}")
+    def _open_shared_snapshot(self):
+        """Create the shared-memory snapshot segment if enabled"""
+        try:
+            shared_config = self.config.get("daemon", "shared_memory", {})
+            if shared_config.get("enabled", True):
+                self.shared_publisher = SharedSnapshotPublisher(
+                    shared_config.get("name"),
+                    shared_config.get("history_size", 300),
+                )
+        except Exception as e:
+            self.logger.error(f"Error creating shared snapshot segment: {e}")
+            self.shared_publisher = None
 
-                        # Could send notifications here
-                        self._send_alert_notification(alert)
+    def _publish_shared_snapshot(self, stats: dict):
+        """Write the latest snapshot into the shared-memory segment"""
+        snapshot = self.monitoring_service.last_snapshot
+        if not self.shared_publisher or snapshot is None:
+            return
 
-                    # Sleep for monitoring interval
-                    time.sleep(self.config.get_monitoring_interval())
+        try:
+            self.shared_publisher.publish(snapshot, len(stats.get("alerts", [])))
+        except Exception as e:
+            self.logger.error(f"Error publishing shared snapshot: {e}")
 
-                except Exception as e:
-                    self.logger.error(f"Monitoring loop error: {e}")
-                    time.sleep(10)  # Wait before retrying
+    def _persist_history(self):
+        """Append the latest snapshot to the persistent history files"""
+        snapshot = self.monitoring_service.last_snapshot
+        if not self.history_store or snapshot is None:
+            return
 
+        try:
+            rows = self.monitoring_service.history_rows(snapshot)
+            for metric, values in rows.items():
+                columns = self.monitoring_service.histories[metric].columns[1:]
+                self.history_store.append(metric, columns, snapshot.timestamp, values)
         except Exception as e:
-            self.logger.error(f"Monitoring loop failed: {e}")
+            self.logger.error(f"Error persisting history: {e}")
 
     def _scheduler_loop(self):
         """Scheduler loop"""
@@ -261,6 +399,16 @@ class SysPilotDaemon:
                     "daemon", "cleanup_schedule", "0 2 * * *"
                 ),
                 "uptime": None,  # Could track uptime
+                "control_socket": (
+                    str(self.control_server.path) if self.control_server else None
+                ),
+                "shared_memory": (
+                    self.shared_publisher.name if self.shared_publisher else None
+                ),
+                "metrics_url": (
+                    self.metrics_exporter.url if self.metrics_exporter else None
+                ),
+                "collector_profile": self.monitoring_service.get_collector_profile(),
             }
 
             return status
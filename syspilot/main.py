@@ -36,6 +36,9 @@ def main():
     parser.add_argument(
         "--system-info", action="store_true", help="Show system information"
     )
+    parser.add_argument(
+        "--watch", action="store_true", help="Show live system statistics"
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--config", type=str, help="Path to configuration file")
 
@@ -50,13 +53,15 @@ def main():
             # Run as daemon
             daemon = SysPilotDaemon(config_path=args.config)
             daemon.run()
-        elif args.cli or args.clean_temp or args.system_info:
+        elif args.cli or args.clean_temp or args.system_info or args.watch:
             # Run in CLI mode
             cli = SysPilotCLI(config_path=args.config)
             if args.clean_temp:
                 cli.clean_temp()
             elif args.system_info:
                 cli.show_system_info()
+            elif args.watch:
+                cli.watch_stats()
             else:
                 cli.run()
         else:
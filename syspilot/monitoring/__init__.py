@@ -0,0 +1,21 @@
+"""
+Monitoring engine components used by the monitoring services
+"""
+
+from .collectors import Collector, CollectorRegistry
+from .cpu_sampler import CpuSampler, CpuUsage
+from .exporter import MetricsExporter
+from .history import ColumnarHistory
+from .rollups import RollupHistory
+from .snapshot import SystemSnapshot
+
+__all__ = [
+    "Collector",
+    "CollectorRegistry",
+    "ColumnarHistory",
+    "CpuSampler",
+    "CpuUsage",
+    "MetricsExporter",
+    "RollupHistory",
+    "SystemSnapshot",
+]
@@ -0,0 +1,141 @@
+"""
+Adaptive sampling interval
+
+A fixed interval wakes an idle host for nothing and is too coarse during an
+incident. The next interval is derived from the latest sample, judging
+every metric on its own:
+
+- near its threshold, jumping, or trending into it before the next sample
+  would be taken: sample at the shortest interval
+- changing: return to the configured interval
+- otherwise the interval backs off gradually, up to the longest interval
+  scaled by the metric's headroom below its threshold
+
+The shortest interval any metric asks for wins. Only metrics with an alert
+threshold are considered; distances and changes are measured relative to
+that threshold. Changes are taken between samples of an exponentially
+smoothed value, so ordinary jitter (a CPU moving between 5% and 25%) does
+not count as movement. Slow gauges such as disk usage do not limit the
+back-off by their headroom; a half-full disk is not a reason to sample
+often. Samples are timestamped, and rates and history already use the
+actual time between samples, so they stay correct at any interval.
+"""
+
+from typing import Dict, Optional, Sequence
+
+# Gauges that move slowly however full they are; being half full does not
+# keep the interval short
+SLOW_GAUGES = ("disk",)
+
+
+class AdaptiveInterval:
+    """Choose the time until the next sample"""
+
+    def __init__(
+        self,
+        base: float,
+        min_interval: float = 0.5,
+        max_interval: float = 30.0,
+        approach: float = 0.8,
+        fast_change: float = 0.15,
+        flat_change: float = 0.05,
+        growth: float = 1.5,
+        smoothing: float = 0.2,
+        slow_gauges: Sequence[str] = SLOW_GAUGES,
+    ):
+        """
+        Initialize adaptive interval
+
+        Args:
+            base: Configured interval in seconds
+            min_interval: Shortest interval, used near thresholds
+            max_interval: Longest interval, used while flat with full headroom
+            approach: Fraction of a threshold counted as near it
+            fast_change: Change of the smoothed value between two samples,
+                as a fraction of the threshold, counted as a jump
+            flat_change: Change of the smoothed value between two samples,
+                as a fraction of the threshold, counted as flat
+            growth: Factor the interval grows by per flat sample
+            smoothing: Weight of a new sample in the smoothed value
+            slow_gauges: Metrics whose headroom does not limit the back-off
+        """
+        self.base = base
+        self.min_interval = min(min_interval, base)
+        self.max_interval = max(max_interval, base)
+        self.approach = approach
+        self.fast_change = fast_change
+        self.flat_change = flat_change
+        self.growth = growth
+        self.smoothing = smoothing
+        self.slow_gauges = frozenset(slow_gauges)
+
+        self.interval = base
+        self.reason = "initial"
+        self._smoothed = {}
+        self._previous_time = None
+
+    def update(
+        self,
+        metrics: Dict[str, Optional[float]],
+        thresholds: Dict[str, float],
+        timestamp: float,
+    ) -> float:
+        """
+        Feed a sample and get the interval until the next one
+
+        Args:
+            metrics: Metric values of the sample
+            thresholds: Alert threshold per metric
+            timestamp: Time of the sample in seconds
+
+        Returns:
+            Seconds until the next sample
+        """
+        elapsed = None
+        if self._previous_time is not None and timestamp > self._previous_time:
+            elapsed = timestamp - self._previous_time
+        self._previous_time = timestamp
+
+        # Interval this sample leads to if every metric is flat
+        idle = min(max(self.interval * self.growth, self.base), self.max_interval)
+
+        urgent = False
+        steady = True
+        limit = self.max_interval
+        for metric, threshold in thresholds.items():
+            value = metrics.get(metric)
+            if value is None or threshold <= 0:
+                continue
+
+            previous = self._smoothed.get(metric)
+            if previous is None:
+                smoothed, change = value, 0.0
+            else:
+                smoothed = previous + self.smoothing * (value - previous)
+                change = smoothed - previous
+            self._smoothed[metric] = smoothed
+
+            near = self.approach * threshold
+            if value >= near or abs(change) >= self.fast_change * threshold:
+                urgent = True
+            # Reaching the threshold before an idle sleep would end
+            elif (
+                elapsed and change > 0 and (near - smoothed) * elapsed < (change * idle)
+            ):
+                urgent = True
+            elif abs(change) > self.flat_change * threshold:
+                steady = False
+            elif metric not in self.slow_gauges:
+                # The less headroom, the shorter the longest interval
+                headroom = 1 - value / near
+                limit = min(limit, max(self.max_interval * headroom, self.base))
+
+        if urgent:
+            self.interval, self.reason = self.min_interval, "urgent"
+        elif steady:
+            self.interval, self.reason = min(idle, limit), "idle"
+        else:
+            # Leave the shortest interval gradually, drop a long one at once
+            self.interval = min(self.interval * 2, self.base)
+            self.reason = "normal"
+        return self.interval
@@ -0,0 +1,238 @@
+"""
+Stateful alert rules
+
+Each rule watches one metric and moves between ok, pending and firing:
+
+- a threshold rule compares the value, a rate rule its change per second
+- ``duration`` requires the condition to hold that long before firing
+- ``clear`` is the hysteresis level the signal must drop below to resolve
+  (defaults to the threshold)
+- ``cooldown`` suppresses re-firing for that long after the last firing
+
+Only transitions (firing, resolved) are reported, so a value hovering around
+the threshold does not produce an alert per sample. Rules are indexed by
+metric and keep O(1) state, so evaluation is O(1) per rule per sample.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+KIND_THRESHOLD = "threshold"
+KIND_RATE = "rate"
+
+STATE_OK = "ok"
+STATE_PENDING = "pending"
+STATE_FIRING = "firing"
+STATE_RESOLVED = "resolved"
+
+
+class AlertRule:
+    """A rule and its evaluation state"""
+
+    __slots__ = (
+        "name",
+        "metric",
+        "kind",
+        "threshold",
+        "clear",
+        "duration",
+        "cooldown",
+        "level",
+        "message",
+        "state",
+        "pending_since",
+        "fired_at",
+        "value",
+        "previous",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        metric: str,
+        threshold: float,
+        kind: str = KIND_THRESHOLD,
+        clear: Optional[float] = None,
+        duration: float = 0,
+        cooldown: float = 0,
+        level: str = "warning",
+        message: Optional[str] = None,
+    ):
+        """
+        Initialize rule
+
+        Args:
+            name: Unique rule name, used to deduplicate alerts
+            metric: Metric the rule watches
+            threshold: Level above which the rule triggers
+            kind: KIND_THRESHOLD (value) or KIND_RATE (change per second)
+            clear: Level the signal must drop below to resolve
+            duration: Seconds the condition must hold before firing
+            cooldown: Minimum seconds between two firings
+            level: Alert level reported (warning, critical, ...)
+            message: Format string with {name}, {metric}, {value} and
+                {threshold} fields
+        """
+        if kind not in (KIND_THRESHOLD, KIND_RATE):
+            raise ValueError(f"Unknown alert rule kind: {kind}")
+
+        self.name = name
+        self.metric = metric
+        self.kind = kind
+        self.threshold = threshold
+        self.clear = threshold if clear is None else clear
+        self.duration = duration
+        self.cooldown = cooldown
+        self.level = level
+        self.message = (
+            message or "{name}: {metric} at {value:.1f} (threshold {threshold})"
+        )
+
+        self.state = STATE_OK
+        self.pending_since = None
+        self.fired_at = None
+        self.value = None
+        self.previous = None
+
+    @classmethod
+    def from_dict(cls, spec: Dict):
+        """Build a rule from its configuration dictionary"""
+        return cls(
+            name=spec["name"],
+            metric=spec["metric"],
+            threshold=spec["threshold"],
+            kind=spec.get("kind", KIND_THRESHOLD),
+            clear=spec.get("clear"),
+            duration=spec.get("for", 0),
+            cooldown=spec.get("cooldown", 0),
+            level=spec.get("level", "warning"),
+            message=spec.get("message"),
+        )
+
+    def evaluate(self, value: float, timestamp: float) -> Optional[str]:
+        """
+        Feed one sample
+
+        Args:
+            value: Metric value
+            timestamp: Epoch seconds
+
+        Returns:
+            STATE_FIRING or STATE_RESOLVED on a transition, otherwise None
+        """
+        if self.kind == KIND_RATE:
+            previous, self.previous = self.previous, (timestamp, value)
+            if previous is None or timestamp <= previous[0]:
+                return None
+            value = (value - previous[1]) / (timestamp - previous[0])
+
+        self.value = value
+
+        if self.state == STATE_FIRING:
+            if value < self.clear:
+                self.state = STATE_OK
+                self.pending_since = None
+                return STATE_RESOLVED
+            return None
+
+        if value <= self.threshold:
+            self.state = STATE_OK
+            self.pending_since = None
+            return None
+
+        if self.pending_since is None:
+            self.pending_since = timestamp
+        if timestamp - self.pending_since < self.duration:
+            self.state = STATE_PENDING
+            return None
+        if self.fired_at is not None and timestamp - self.fired_at < self.cooldown:
+            self.state = STATE_PENDING
+            return None
+
+        self.state = STATE_FIRING
+        self.fired_at = timestamp
+        return STATE_FIRING
+
+    def to_alert(self, state: Optional[str] = None, timestamp: Optional[float] = None):
+        """Alert dictionary for the current state"""
+        return {
+            "name": self.name,
+            "type": self.metric,
+            "level": self.level,
+            "state": state or self.state,
+            "message": self.message.format(
+                name=self.name,
+                metric=self.metric,
+                value=self.value,
+                threshold=self.threshold,
+            ),
+            "value": self.value,
+            "threshold": self.threshold,
+            "timestamp": timestamp,
+        }
+
+
+class AlertEngine:
+    """Evaluate alert rules incrementally"""
+
+    def __init__(self, rules: Iterable[AlertRule] = ()):
+        """
+        Initialize engine
+
+        Args:
+            rules: Initial rules
+        """
+        self.rules = {}
+        self._by_metric = {}
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: AlertRule):
+        """Add a rule, replacing any rule with the same name"""
+        self.remove_rule(rule.name)
+        self.rules[rule.name] = rule
+        self._by_metric.setdefault(rule.metric, []).append(rule)
+
+    def remove_rule(self, name: str):
+        """Remove a rule by name"""
+        rule = self.rules.pop(name, None)
+        if rule is not None:
+            self._by_metric[rule.metric].remove(rule)
+
+    def thresholds(self) -> Dict[str, float]:
+        """Lowest value threshold per metric, over the threshold rules"""
+        result = {}
+        for rule in self.rules.values():
+            if rule.kind == KIND_THRESHOLD:
+                current = result.get(rule.metric)
+                if current is None or rule.threshold < current:
+                    result[rule.metric] = rule.threshold
+        return result
+
+    def evaluate(self, values: Dict[str, float], timestamp: float) -> List[Dict]:
+        """
+        Feed one sample of every metric
+
+        Args:
+            values: Metric values (None values are skipped)
+            timestamp: Epoch seconds
+
+        Returns:
+            Alert dictionaries for the rules that fired or resolved
+        """
+        events = []
+        for metric, value in values.items():
+            if value is None:
+                continue
+            for rule in self._by_metric.get(metric, ()):
+                transition = rule.evaluate(value, timestamp)
+                if transition:
+                    events.append(rule.to_alert(transition, timestamp))
+        return events
+
+    def active(self) -> List[Dict]:
+        """Alert dictionaries of the rules currently firing"""
+        return [
+            rule.to_alert(timestamp=rule.fired_at)
+            for rule in self.rules.values()
+            if rule.state == STATE_FIRING
+        ]
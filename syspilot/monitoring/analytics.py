@@ -0,0 +1,93 @@
+"""
+Window statistics over history columns
+
+Computes mean, percentiles, max, rate of change and time above a threshold
+for a window of samples. With NumPy installed each statistic is a single
+vectorized operation on the (zero-copy) history columns; otherwise the same
+results are computed in pure Python.
+"""
+
+import math
+from typing import Dict, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PERCENTILES = (50, 95, 99)
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile of sorted values (NumPy's default)"""
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(
+    timestamps,
+    values,
+    threshold: Optional[float] = None,
+    percentiles: Sequence[int] = PERCENTILES,
+) -> Dict:
+    """
+    Summarize a window of samples
+
+    Args:
+        timestamps: Ascending epoch timestamps
+        values: Sample values, same length as timestamps
+        threshold: Also report the seconds spent above this value
+        percentiles: Percentiles to compute, as p<N> keys
+
+    Returns:
+        Dictionary with count, mean, min, max, last, p<N> percentiles,
+        rate (change per second between the first and last sample) and,
+        with a threshold, time_above in seconds. Empty windows only report
+        a count of 0.
+    """
+    count = len(values)
+    if not count:
+        return {"count": 0}
+
+    if np is not None:
+        times = np.asarray(timestamps, dtype=np.float64)
+        data = np.asarray(values, dtype=np.float64)
+        result = {
+            "count": count,
+            "mean": float(data.mean()),
+            "min": float(data.min()),
+            "max": float(data.max()),
+            "last": float(data[-1]),
+        }
+        for q, value in zip(percentiles, np.percentile(data, percentiles)):
+            result[f"p{q}"] = float(value)
+        span = float(times[-1] - times[0])
+        change = float(data[-1] - data[0])
+        if threshold is not None:
+            # Each sample holds until the next one
+            held = np.diff(times)
+            result["time_above"] = float(held[data[:-1] > threshold].sum())
+    else:
+        times = list(timestamps)
+        data = list(values)
+        ordered = sorted(data)
+        result = {
+            "count": count,
+            "mean": math.fsum(data) / count,
+            "min": ordered[0],
+            "max": ordered[-1],
+            "last": data[-1],
+        }
+        for q in percentiles:
+            result[f"p{q}"] = _percentile(ordered, q)
+        span = times[-1] - times[0]
+        change = data[-1] - data[0]
+        if threshold is not None:
+            result["time_above"] = math.fsum(
+                times[i + 1] - times[i] for i in range(count - 1) if data[i] > threshold
+            )
+
+    result["rate"] = change / span if span > 0 else 0.0
+    return result
@@ -0,0 +1,121 @@
+"""
+Streaming anomaly detection
+
+Every metric keeps an exponentially weighted mean and variance, plus one
+per hour of the day so that daily patterns (backups at night, busy office
+hours) are part of the baseline. A sample is scored against the baseline
+before it is folded in; the absolute z-score is what alert rules compare
+against. State is a fixed 25 baselines per metric and each update is O(1).
+"""
+
+import math
+import time
+from typing import Dict, Iterable, Optional
+
+HOURS_PER_DAY = 24
+
+
+class Ewma:
+    """Exponentially weighted mean and variance"""
+
+    __slots__ = ("mean", "variance", "count")
+
+    def __init__(self):
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+
+    def update(self, value: float, alpha: float):
+        """Fold one sample in"""
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.variance = (1 - alpha) * (self.variance + diff * increment)
+        self.count += 1
+
+
+class AnomalyDetector:
+    """Per-metric EWMA baselines with hour-of-day seasonality"""
+
+    def __init__(
+        self,
+        metrics: Iterable[str],
+        alpha: float = 0.05,
+        warmup: int = 30,
+        min_std: float = 1.0,
+        seasonal: bool = True,
+    ):
+        """
+        Initialize detector
+
+        Args:
+            metrics: Metric names to track
+            alpha: EWMA smoothing factor (higher adapts faster)
+            warmup: Samples a baseline needs before it is used for scoring
+            min_std: Lower bound for the standard deviation, so flat metrics
+                do not turn tiny changes into huge z-scores
+            seasonal: Score against the baseline of the current hour of the
+                day once it has warmed up
+        """
+        self.alpha = alpha
+        self.warmup = warmup
+        self.min_std = min_std
+        self.seasonal = seasonal
+        self.baselines = {
+            metric: (Ewma(), [Ewma() for _ in range(HOURS_PER_DAY)])
+            for metric in metrics
+        }
+
+    def score(self, metric: str, value: float, timestamp: float) -> Optional[float]:
+        """
+        Score a sample and fold it into the baselines
+
+        Args:
+            metric: Metric name
+            value: Sample value
+            timestamp: Epoch seconds
+
+        Returns:
+            z-score against the baseline, or None while warming up or for
+            untracked metrics
+        """
+        baselines = self.baselines.get(metric)
+        if baselines is None:
+            return None
+
+        overall, hourly = baselines
+        hour = hourly[time.localtime(timestamp).tm_hour]
+        baseline = hour if self.seasonal and hour.count >= self.warmup else overall
+
+        z_score = None
+        if baseline.count >= self.warmup:
+            std = max(math.sqrt(baseline.variance), self.min_std)
+            z_score = (value - baseline.mean) / std
+
+        overall.update(value, self.alpha)
+        hour.update(value, self.alpha)
+        return z_score
+
+    def scores(self, values: Dict[str, Optional[float]], timestamp: float) -> Dict:
+        """
+        Score one sample of every tracked metric
+
+        Args:
+            values: Metric values (None values are skipped)
+            timestamp: Epoch seconds
+
+        Returns:
+            Dictionary mapping "<metric>_anomaly" to the absolute z-score
+            (None while warming up)
+        """
+        results = {}
+        for metric in self.baselines:
+            value = values.get(metric)
+            if value is None:
+                continue
+            z_score = self.score(metric, value, timestamp)
+            results[f"{metric}_anomaly"] = abs(z_score) if z_score is not None else None
+        return results
@@ -0,0 +1,192 @@
+"""
+Collector registry
+
+Each metric source is registered with its own refresh interval and cost
+class. A tick only runs the collectors that are due and merges their results
+into a cache, so slow-changing or expensive metrics (boot time, temperatures,
+the process list) are not re-read on every tick.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..utils.logger import get_logger
+from .profiling import CollectorProfiler
+
+# Cost classes, used for reporting and to pick collectors to slow down
+COST_CHEAP = "cheap"
+COST_MODERATE = "moderate"
+COST_EXPENSIVE = "expensive"
+
+
+class Collector:
+    """A metric source with its refresh schedule and cached value"""
+
+    __slots__ = ("name", "func", "interval", "cost", "last_run", "value")
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: Optional[float] = 0.0,
+        cost: str = COST_CHEAP,
+    ):
+        """
+        Initialize collector
+
+        Args:
+            name: Metric name the result is cached under
+            func: Callable returning the metric value
+            interval: Seconds between refreshes; 0 runs every tick and None
+                runs once (for values that never change, like boot time)
+            cost: Cost class (COST_CHEAP, COST_MODERATE or COST_EXPENSIVE)
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cost = cost
+        self.last_run = None
+        self.value = None
+
+    def is_due(self, now: float) -> bool:
+        """Check whether the collector should run at the given time"""
+        if self.last_run is None:
+            return True
+        if self.interval is None:
+            return False
+        return now - self.last_run >= self.interval
+
+
+class CollectorRegistry:
+    """Run due collectors and keep their merged results"""
+
+    def __init__(self, profiler: Optional[CollectorProfiler] = None):
+        """
+        Initialize an empty registry
+
+        Args:
+            profiler: Times every collector call and enforces the overhead
+                budget (a default profiler when not given)
+        """
+        self.collectors = {}
+        self.logger = get_logger(__name__)
+        self.profiler = profiler or CollectorProfiler()
+
+        # Collectors refreshed by a background scheduler; run_due only runs
+        # them when they never ran
+        self.background = set()
+
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval: Optional[float] = 0.0,
+        cost: str = COST_CHEAP,
+    ) -> Collector:
+        """
+        Register a collector, replacing any collector with the same name
+
+        Args:
+            name: Metric name
+            func: Callable returning the metric value
+            interval: Refresh interval in seconds (0 = every tick, None = once)
+            cost: Cost class
+
+        Returns:
+            The registered collector
+        """
+        collector = Collector(name, func, interval, cost)
+        self.collectors[name] = collector
+        return collector
+
+    def set_interval(self, name: str, interval: Optional[float]):
+        """Change the refresh interval of a registered collector"""
+        if name in self.collectors:
+            self.collectors[name].interval = interval
+
+    def invalidate(self, name: Optional[str] = None):
+        """Force one collector (or all of them) to run on the next tick"""
+        targets = [self.collectors[name]] if name else self.collectors.values()
+        for collector in targets:
+            collector.last_run = None
+
+    def run_due(self, now: Optional[float] = None) -> Set[str]:
+        """
+        Run every collector that is due
+
+        A failing collector keeps its previous value and is retried when it
+        is next due.
+
+        Args:
+            now: Monotonic time of the tick (defaults to time.monotonic())
+
+        Returns:
+            Names of the collectors that were refreshed
+        """
+        if now is None:
+            now = time.monotonic()
+
+        refreshed = set()
+        for collector in self.collectors.values():
+            if not collector.is_due(now):
+                continue
+            if collector.name in self.background and collector.last_run is not None:
+                continue
+            if self._run(collector, now):
+                refreshed.add(collector.name)
+
+        self.profiler.enforce(self.collectors, now)
+        return refreshed
+
+    def run(self, name: str, now: Optional[float] = None) -> bool:
+        """
+        Refresh one collector now, whether it is due or not
+
+        Returns:
+            True if the collector ran successfully
+        """
+        collector = self.collectors.get(name)
+        if collector is None:
+            return False
+        return self._run(collector, time.monotonic() if now is None else now)
+
+    def _run(self, collector: Collector, now: float) -> bool:
+        """Run a collector and cache its value"""
+        collector.last_run = now
+        wall = time.perf_counter_ns()
+        cpu = time.thread_time_ns()
+        try:
+            collector.value = collector.func()
+            return True
+        except Exception as e:
+            self.logger.error(f"Error collecting {collector.name}: {e}")
+            return False
+        finally:
+            self.profiler.record(
+                collector.name,
+                time.perf_counter_ns() - wall,
+                time.thread_time_ns() - cpu,
+            )
+
+    def values(self) -> Dict[str, Any]:
+        """Get the cached value of every collector"""
+        return {name: c.value for name, c in self.collectors.items()}
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get the cached value of one collector"""
+        collector = self.collectors.get(name)
+        if collector is None or collector.value is None:
+            return default
+        return collector.value
+
+    def describe(self) -> List[Dict]:
+        """Describe registered collectors and their schedules"""
+        return [
+            {
+                "name": c.name,
+                "interval": c.interval,
+                "cost": c.cost,
+                "last_run": c.last_run,
+            }
+            for c in self.collectors.values()
+        ]
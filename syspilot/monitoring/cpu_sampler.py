@@ -0,0 +1,189 @@
+"""
+Background CPU sampler
+
+Keeps the delta between consecutive ``/proc/stat`` readings so that CPU usage
+can be answered instantly from the last window, instead of blocking the
+caller in ``psutil.cpu_percent(interval=...)``.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import psutil
+
+from ..utils.logger import get_logger
+
+# Modes that make up total CPU time; guest time is already part of user time
+CPU_MODES = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal")
+IDLE_MODES = (CPU_MODES.index("idle"), CPU_MODES.index("iowait"))
+
+CpuTimes = Tuple[float, ...]
+
+
+def read_psutil_cpu_times() -> List[CpuTimes]:
+    """Read per-CPU times through psutil, ordered as CPU_MODES"""
+    return [
+        tuple(getattr(times, mode, 0.0) for mode in CPU_MODES)
+        for times in psutil.cpu_times(percpu=True)
+    ]
+
+
+def _window_usage(prev: CpuTimes, curr: CpuTimes) -> Tuple[float, Dict[str, float]]:
+    """Compute busy percent and per-mode percentages between two readings"""
+    deltas = [max(c - p, 0.0) for p, c in zip(prev, curr)]
+    total = sum(deltas)
+    if total <= 0:
+        return 0.0, dict.fromkeys(CPU_MODES, 0.0)
+
+    idle = sum(deltas[i] for i in IDLE_MODES)
+    modes = {mode: round(d / total * 100, 1) for mode, d in zip(CPU_MODES, deltas)}
+    return round((total - idle) / total * 100, 1), modes
+
+
+class CpuUsage:
+    """CPU usage over one sampling window"""
+
+    __slots__ = ("percent", "modes", "percpu", "percpu_modes", "window")
+
+    def __init__(
+        self,
+        percent: float = 0.0,
+        modes: Optional[Dict[str, float]] = None,
+        percpu: Sequence[float] = (),
+        percpu_modes: Sequence[Dict[str, float]] = (),
+        window: float = 0.0,
+    ):
+        self.percent = percent
+        self.modes = modes if modes is not None else dict.fromkeys(CPU_MODES, 0.0)
+        self.percpu = list(percpu)
+        self.percpu_modes = list(percpu_modes)
+        self.window = window
+
+
+class CpuSampler:
+    """Sample CPU times in the background and keep the latest usage window"""
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        source: Optional[Callable[[], List[CpuTimes]]] = None,
+    ):
+        """
+        Initialize CPU sampler
+
+        Args:
+            interval: Seconds between background samples
+            source: Callable returning per-CPU times ordered as CPU_MODES
+                (defaults to psutil)
+        """
+        self.interval = interval
+        self.source = source or read_psutil_cpu_times
+        self.logger = get_logger(__name__)
+
+        self._lock = threading.Lock()
+        self._prev = None
+        self._prev_time = None
+        self._usage = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Take a baseline reading and start the background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self.sample()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="syspilot-cpu-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+
+    def _run(self):
+        """Background sampling loop"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Error sampling CPU times: {e}")
+
+    def sample(self) -> Optional[CpuUsage]:
+        """
+        Read CPU times now and update the latest window
+
+        Returns:
+            The new usage window, or None when there is no previous reading
+        """
+        percpu_times = self.source()
+        now = time.monotonic()
+
+        with self._lock:
+            prev, prev_time = self._prev, self._prev_time
+            self._prev, self._prev_time = percpu_times, now
+
+            # No baseline yet, or CPUs were hot-plugged: start a new window
+            if prev is None or len(prev) != len(percpu_times):
+                return None
+
+            percpu = [_window_usage(p, c) for p, c in zip(prev, percpu_times)]
+            percent, modes = _window_usage(
+                tuple(map(sum, zip(*prev))), tuple(map(sum, zip(*percpu_times)))
+            )
+
+            usage = CpuUsage(
+                percent=percent,
+                modes=modes,
+                percpu=[core[0] for core in percpu],
+                percpu_modes=[core[1] for core in percpu],
+                window=now - prev_time,
+            )
+            self._usage = usage
+
+        return usage
+
+    def usage(self) -> CpuUsage:
+        """Get the latest usage window without blocking"""
+        usage = self._usage
+        if usage is None:
+            # Not started or no window yet: measure against the baseline, if any
+            usage = self.sample() or CpuUsage()
+        return usage
+
+    def cpu_percent(self, percpu: bool = False) -> Union[float, List[float]]:
+        """
+        Get CPU usage percentage from the latest window
+
+        Args:
+            percpu: Return a list with one value per logical CPU
+
+        Returns:
+            Busy percentage (or list of them)
+        """
+        usage = self.usage()
+        return list(usage.percpu) if percpu else usage.percent
+
+    def cpu_times_percent(
+        self, percpu: bool = False
+    ) -> Union[Dict[str, float], List[Dict[str, float]]]:
+        """
+        Get per-mode CPU percentages (user, system, iowait, steal, ...)
+
+        Args:
+            percpu: Return a list with one breakdown per logical CPU
+
+        Returns:
+            Mapping of mode to percentage (or list of them)
+        """
+        usage = self.usage()
+        if percpu:
+            return [dict(modes) for modes in usage.percpu_modes]
+        return dict(usage.modes)
@@ -0,0 +1,293 @@
+"""
+asyncio monitoring engine
+
+One event loop, running in a background thread, drives monitoring:
+
+- every collector with its own refresh interval runs as a task on that
+  schedule, and a tick task builds a snapshot at the monitoring interval;
+  the blocking reads (psutil, /proc) run in a small thread pool
+- consumers subscribe to a stream of stats, or of a few metrics, and get a
+  bounded queue; a consumer that falls behind loses its oldest items
+  instead of slowing down the engine or the other consumers
+- servers (the metrics exporter, the control socket) run on the same loop
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from ..utils.logger import get_logger
+
+# Items a subscriber may fall behind before its oldest items are dropped
+SUBSCRIPTION_SIZE = 8
+
+_CLOSED = object()
+
+
+class EventLoopThread:
+    """An asyncio event loop running in a daemon thread"""
+
+    def __init__(self, name: str = "syspilot-loop"):
+        """
+        Initialize loop thread
+
+        Args:
+            name: Thread name
+        """
+        self.name = name
+        self.loop = None
+        self._thread = None
+
+    def start(self):
+        """Start the loop"""
+        if self._thread is not None:
+            return
+
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        """Cancel remaining tasks and stop the loop"""
+        if self._thread is None:
+            return
+
+        async def cancel_tasks():
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.run(cancel_tasks())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+        self._thread = None
+        self.loop = None
+
+    def submit(self, coro):
+        """Schedule a coroutine from another thread; returns a Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Optional[float] = 10):
+        """Run a coroutine from another thread and wait for its result"""
+        return self.submit(coro).result(timeout)
+
+
+class Subscription:
+    """Bounded asynchronous stream of items from the engine"""
+
+    def __init__(self, engine, metrics: Optional[Iterable[str]], maxsize: int):
+        """
+        Initialize subscription; use MonitoringEngine.subscribe() instead
+
+        Args:
+            engine: Publishing engine
+            metrics: Metric names to receive, or None for whole stats
+            maxsize: Queue size before the oldest items are dropped
+        """
+        self.engine = engine
+        self.metrics = tuple(metrics) if metrics is not None else None
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def offer(self, item):
+        """Queue an item, dropping the oldest one when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    def close(self):
+        """Stop receiving items"""
+        self.engine.unsubscribe(self)
+        self.offer(_CLOSED)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.queue.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        return item
+
+
+class MonitoringEngine:
+    """Run a monitoring service's collectors and ticks on an event loop"""
+
+    def __init__(
+        self,
+        service,
+        interval: float,
+        runner: Optional[EventLoopThread] = None,
+        workers: int = 2,
+        adaptive: bool = False,
+    ):
+        """
+        Initialize engine
+
+        Args:
+            service: MonitoringService providing collectors and snapshots
+            interval: Seconds between snapshots
+            runner: Event loop thread to run on (a private one by default)
+            workers: Threads for blocking collector reads
+            adaptive: Wait the "next_interval" the service's stats report
+                instead of the fixed interval
+        """
+        self.service = service
+        self.interval = interval
+        self.runner = runner or EventLoopThread("syspilot-monitoring")
+        self.workers = workers
+        self.adaptive = adaptive
+        self.logger = get_logger(__name__)
+
+        self.listeners = []
+        self.subscriptions = set()
+        self._owns_runner = runner is None
+        self._executor = None
+        self._main = None
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """
+        Call a function with the stats of every tick
+
+        Listeners run in the worker pool, so they may block briefly.
+        """
+        self.listeners.append(callback)
+
+    def subscribe(
+        self, metrics: Optional[Iterable[str]] = None, maxsize: int = SUBSCRIPTION_SIZE
+    ) -> Subscription:
+        """
+        Subscribe to the stream of ticks (call on the engine's loop)
+
+        Args:
+            metrics: Only receive these metric values (as returned by the
+                service's metric_values) plus the timestamp; None receives
+                the whole stats dictionary
+            maxsize: Items kept for a slow consumer before dropping
+
+        Returns:
+            Subscription to iterate with ``async for``
+        """
+        subscription = Subscription(self, metrics, maxsize)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription"""
+        self.subscriptions.discard(subscription)
+
+    def publish(self, snapshot, stats: Dict):
+        """Fan one tick out to the subscribers (call on the engine's loop)"""
+        metric_values = None
+        for subscription in list(self.subscriptions):
+            if subscription.metrics is None:
+                subscription.offer(stats)
+                continue
+            if metric_values is None:
+                metric_values = self.service.metric_values(snapshot)
+            item = {"timestamp": snapshot.timestamp}
+            for metric in subscription.metrics:
+                item[metric] = metric_values.get(metric)
+            subscription.offer(item)
+
+    def start(self):
+        """Start collector and tick tasks"""
+        if self._main is not None:
+            return
+
+        self.runner.start()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="syspilot-collector"
+        )
+        self._main = self.runner.submit(self._run())
+
+    def stop(self):
+        """Stop the tasks, close the subscriptions and the worker pool"""
+        if self._main is None:
+            return
+
+        self._main.cancel()
+        self.runner.run(self._close_subscriptions())
+        self._executor.shutdown(wait=True)
+        self.service.collectors.background.clear()
+        self._main = None
+        if self._owns_runner:
+            self.runner.stop()
+
+    async def _close_subscriptions(self):
+        for subscription in list(self.subscriptions):
+            subscription.close()
+
+    async def _run(self):
+        """Run collectors on their own schedules next to the tick task"""
+        registry = self.service.collectors
+        scheduled = [
+            collector
+            for collector in registry.collectors.values()
+            if collector.interval  # 0 runs every tick, None once
+        ]
+        registry.background.update(collector.name for collector in scheduled)
+
+        tasks = [asyncio.create_task(self._collect(c.name)) for c in scheduled]
+        tasks.append(asyncio.create_task(self._ticks()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _collect(self, name: str):
+        """Refresh one collector at its interval"""
+        loop = asyncio.get_running_loop()
+        registry = self.service.collectors
+        while True:
+            await loop.run_in_executor(self._executor, registry.run, name)
+            collector = registry.collectors.get(name)
+            if collector is None or not collector.interval:
+                return
+            await asyncio.sleep(collector.interval)
+
+    async def _ticks(self):
+        """Build a snapshot every interval and publish it"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            interval = self.interval
+            try:
+                stats = await loop.run_in_executor(self._executor, self._tick)
+                if stats:
+                    self.publish(self.service.last_snapshot, stats)
+                    if self.adaptive:
+                        interval = stats.get("next_interval") or interval
+            except Exception as e:
+                self.logger.error(f"Monitoring tick failed: {e}")
+
+            # Keep the cadence; skip ticks rather than bunching them up
+            deadline += interval
+            now = loop.time()
+            if deadline < now:
+                deadline = now
+            await asyncio.sleep(deadline - now)
+
+    def _tick(self) -> Dict:
+        """Take a snapshot and run the listeners (in the worker pool)"""
+        stats = self.service.get_system_stats()
+        for listener in self.listeners:
+            try:
+                listener(stats)
+            except Exception as e:
+                self.logger.error(f"Monitoring listener failed: {e}")
+        return stats
@@ -0,0 +1,405 @@
+"""
+OpenMetrics exporter
+
+Serves the latest monitoring snapshot on ``/metrics`` in the OpenMetrics
+text format, so Prometheus can scrape the daemon directly. The family
+headers and every ``name{labels} `` sample prefix are built once as bytes;
+a scrape only formats the values, and the body is cached until the next
+snapshot, so repeated scrapes of the same tick cost a single write.
+Per-process data is not exported, which keeps the body size independent of
+the number of running processes. The HTTP server is a minimal asyncio one,
+running on the daemon's event loop.
+"""
+
+import asyncio
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.logger import get_logger
+from .engine import EventLoopThread
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+EOF_LINE = b"# EOF\n"
+
+# Most distinct sample prefixes kept before the cache is rebuilt
+MAX_PREFIXES = 4096
+
+# Seconds a client gets to send its request
+REQUEST_TIMEOUT = 10
+MAX_HEADER_LINES = 100
+
+GAUGE = "gauge"
+COUNTER = "counter"
+
+# name -> (type, help)
+FAMILIES = {
+    "syspilot_cpu_usage_percent": (GAUGE, "CPU busy percentage"),
+    "syspilot_cpu_core_usage_percent": (GAUGE, "Busy percentage per logical CPU"),
+    "syspilot_cpu_mode_percent": (GAUGE, "Share of CPU time per mode"),
+    "syspilot_cpu_temperature_celsius": (GAUGE, "Hottest CPU sensor"),
+    "syspilot_load_average": (GAUGE, "System load average"),
+    "syspilot_memory_total_bytes": (GAUGE, "Total physical memory"),
+    "syspilot_memory_available_bytes": (GAUGE, "Memory available for new work"),
+    "syspilot_memory_used_bytes": (GAUGE, "Used physical memory"),
+    "syspilot_memory_usage_percent": (GAUGE, "Memory usage percentage"),
+    "syspilot_swap_total_bytes": (GAUGE, "Total swap space"),
+    "syspilot_swap_used_bytes": (GAUGE, "Used swap space"),
+    "syspilot_filesystem_size_bytes": (GAUGE, "Root filesystem size"),
+    "syspilot_filesystem_used_bytes": (GAUGE, "Root filesystem used space"),
+    "syspilot_filesystem_usage_percent": (GAUGE, "Root filesystem usage"),
+    "syspilot_disk_read_bytes": (COUNTER, "Bytes read from all disks"),
+    "syspilot_disk_written_bytes": (COUNTER, "Bytes written to all disks"),
+    "syspilot_disk_read_bytes_per_second": (GAUGE, "Bytes read per second"),
+    "syspilot_disk_write_bytes_per_second": (GAUGE, "Bytes written per second"),
+    "syspilot_disk_read_operations_per_second": (GAUGE, "Reads completed per second"),
+    "syspilot_disk_write_operations_per_second": (
+        GAUGE,
+        "Writes completed per second",
+    ),
+    "syspilot_disk_busy_percent": (GAUGE, "Share of time the disk was busy"),
+    "syspilot_disk_await_seconds": (GAUGE, "Average time per I/O request"),
+    "syspilot_network_received_bytes": (COUNTER, "Bytes received, all NICs"),
+    "syspilot_network_sent_bytes": (COUNTER, "Bytes sent, all NICs"),
+    "syspilot_network_receive_bytes_per_second": (GAUGE, "Bytes received per second"),
+    "syspilot_network_transmit_bytes_per_second": (GAUGE, "Bytes sent per second"),
+    "syspilot_network_receive_packets_per_second": (
+        GAUGE,
+        "Packets received per second",
+    ),
+    "syspilot_network_transmit_packets_per_second": (GAUGE, "Packets sent per second"),
+    "syspilot_network_dropped_packets_per_second": (
+        GAUGE,
+        "Packets dropped per second, both directions",
+    ),
+    "syspilot_network_error_packets_per_second": (
+        GAUGE,
+        "Packets with errors per second, both directions",
+    ),
+    "syspilot_boot_time_seconds": (GAUGE, "System boot time, epoch seconds"),
+    "syspilot_alert_firing": (GAUGE, "Alerts currently firing"),
+    "syspilot_snapshot_timestamp_seconds": (GAUGE, "Time of the snapshot"),
+}
+
+# Units announced for families whose name ends in them, longest first
+UNITS = (
+    "bytes_per_second",
+    "packets_per_second",
+    "operations_per_second",
+    "bytes",
+    "percent",
+    "celsius",
+    "seconds",
+)
+
+# Per-device rates: (family, rate field, scale)
+DISK_RATE_FAMILIES = (
+    ("syspilot_disk_read_bytes_per_second", "read_bytes", 1),
+    ("syspilot_disk_write_bytes_per_second", "write_bytes", 1),
+    ("syspilot_disk_read_operations_per_second", "read_iops", 1),
+    ("syspilot_disk_write_operations_per_second", "write_iops", 1),
+    ("syspilot_disk_busy_percent", "utilization", 1),
+    ("syspilot_disk_await_seconds", "await_ms", 0.001),
+)
+NETWORK_RATE_FAMILIES = (
+    ("syspilot_network_receive_bytes_per_second", "rx_bytes", 1),
+    ("syspilot_network_transmit_bytes_per_second", "tx_bytes", 1),
+    ("syspilot_network_receive_packets_per_second", "rx_packets", 1),
+    ("syspilot_network_transmit_packets_per_second", "tx_packets", 1),
+    ("syspilot_network_dropped_packets_per_second", "drops", 1),
+    ("syspilot_network_error_packets_per_second", "errors", 1),
+)
+
+
+def _header(name: str, kind: str, text: str) -> bytes:
+    """TYPE, UNIT (when the name ends in one) and HELP lines of a family"""
+    lines = [f"# TYPE {name} {kind}\n"]
+    for unit in UNITS:
+        if name.endswith("_" + unit):
+            lines.append(f"# UNIT {name} {unit}\n")
+            break
+    lines.append(f"# HELP {name} {text}\n")
+    return "".join(lines).encode()
+
+
+HEADERS = {name: _header(name, kind, text) for name, (kind, text) in FAMILIES.items()}
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]  # name suffix, labels, value
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> bytes:
+    """Format a sample value"""
+    if math.isnan(value):
+        return b"NaN"
+    if math.isinf(value):
+        return b"+Inf" if value > 0 else b"-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return b"%d" % value
+    return repr(float(value)).encode()
+
+
+class OpenMetricsRenderer:
+    """Render snapshots as OpenMetrics text"""
+
+    def __init__(self):
+        self._prefixes = {}
+
+    def _prefix(self, name: str, labels: Labels) -> bytes:
+        """Cached 'name{labels} ' prefix of a sample line"""
+        key = (name, labels)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if len(self._prefixes) >= MAX_PREFIXES:
+                self._prefixes.clear()
+            if labels:
+                pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                prefix = f"{name}{{{pairs}}} ".encode()
+            else:
+                prefix = f"{name} ".encode()
+            self._prefixes[key] = prefix
+        return prefix
+
+    def render(self, snapshot, alerts: Iterable[Dict] = ()) -> bytes:
+        """
+        Render one snapshot
+
+        Args:
+            snapshot: SystemSnapshot, or None before the first tick
+            alerts: Alerts currently firing
+
+        Returns:
+            Complete exposition, terminated by "# EOF"
+        """
+        if snapshot is None:
+            return EOF_LINE
+
+        parts = []
+        for family, samples in self._families(snapshot, alerts):
+            if not samples:
+                continue
+            parts.append(HEADERS[family])
+            for suffix, labels, value in samples:
+                parts.append(self._prefix(family + suffix, labels))
+                parts.append(_format_value(value))
+                parts.append(b"\n")
+        parts.append(EOF_LINE)
+        return b"".join(parts)
+
+    @staticmethod
+    def _families(snapshot, alerts) -> List[Tuple[str, List[Sample]]]:
+        """Samples of every metric family, in exposition order"""
+        cpu = snapshot.cpu
+        memory, swap = snapshot.memory, snapshot.swap
+        usage, disk_io = snapshot.disk_usage, snapshot.disk_io
+        network_io = snapshot.network_io
+
+        def single(value: Optional[float]) -> List[Sample]:
+            return [] if value is None else [("", (), value)]
+
+        def counter(value: Optional[float]) -> List[Sample]:
+            return [] if value is None else [("_total", (), value)]
+
+        families = [
+            ("syspilot_cpu_usage_percent", single(cpu.percent)),
+            (
+                "syspilot_cpu_core_usage_percent",
+                [("", (("cpu", str(i)),), v) for i, v in enumerate(cpu.percpu)],
+            ),
+            (
+                "syspilot_cpu_mode_percent",
+                [("", (("mode", mode),), v) for mode, v in cpu.modes.items()],
+            ),
+            ("syspilot_cpu_temperature_celsius", single(snapshot.cpu_temperature)),
+            (
+                "syspilot_load_average",
+                [
+                    ("", (("period", period),), value)
+                    for period, value in zip(
+                        ("1m", "5m", "15m"), snapshot.load_avg or ()
+                    )
+                ],
+            ),
+        ]
+
+        if memory is not None:
+            families += [
+                ("syspilot_memory_total_bytes", single(memory.total)),
+                ("syspilot_memory_available_bytes", single(memory.available)),
+                ("syspilot_memory_used_bytes", single(memory.used)),
+                ("syspilot_memory_usage_percent", single(memory.percent)),
+            ]
+        if swap is not None:
+            families += [
+                ("syspilot_swap_total_bytes", single(swap.total)),
+                ("syspilot_swap_used_bytes", single(swap.used)),
+            ]
+        if usage is not None:
+            families += [
+                ("syspilot_filesystem_size_bytes", single(usage.total)),
+                ("syspilot_filesystem_used_bytes", single(usage.used)),
+                ("syspilot_filesystem_usage_percent", single(usage.percent)),
+            ]
+        if disk_io is not None:
+            families += [
+                ("syspilot_disk_read_bytes", counter(disk_io.read_bytes)),
+                ("syspilot_disk_written_bytes", counter(disk_io.write_bytes)),
+            ]
+        families += [
+            (
+                family,
+                [
+                    ("", (("device", device),), rates[field] * scale)
+                    for device, rates in snapshot.disk_rates.items()
+                ],
+            )
+            for family, field, scale in DISK_RATE_FAMILIES
+        ]
+        if network_io is not None:
+            families += [
+                ("syspilot_network_received_bytes", counter(network_io.bytes_recv)),
+                ("syspilot_network_sent_bytes", counter(network_io.bytes_sent)),
+            ]
+        families += [
+            (
+                family,
+                [
+                    ("", (("interface", nic),), rates[field] * scale)
+                    for nic, rates in snapshot.interface_rates.items()
+                ],
+            )
+            for family, field, scale in NETWORK_RATE_FAMILIES
+        ]
+        families += [
+            ("syspilot_boot_time_seconds", single(snapshot.boot_time)),
+            (
+                "syspilot_alert_firing",
+                [
+                    ("", (("name", alert["name"]), ("level", alert["level"])), 1)
+                    for alert in alerts
+                ],
+            ),
+            ("syspilot_snapshot_timestamp_seconds", single(snapshot.timestamp)),
+        ]
+        return families
+
+
+class MetricsExporter:
+    """HTTP endpoint exposing a monitoring service in OpenMetrics format"""
+
+    def __init__(
+        self,
+        monitoring_service,
+        host: str = "127.0.0.1",
+        port: int = 9877,
+        runner: Optional[EventLoopThread] = None,
+    ):
+        """
+        Initialize exporter
+
+        Args:
+            monitoring_service: Service whose last snapshot is exported
+            host: Address to listen on
+            port: TCP port (0 picks a free one)
+            runner: Event loop thread to serve on (a private one by default)
+        """
+        self.monitoring_service = monitoring_service
+        self.host = host
+        self.port = port
+        self.runner = runner or EventLoopThread("syspilot-metrics-exporter")
+        self.logger = get_logger(__name__)
+        self.renderer = OpenMetricsRenderer()
+
+        self._owns_runner = runner is None
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._body = EOF_LINE
+        self._server = None
+
+    def body(self) -> bytes:
+        """Exposition of the latest snapshot, rebuilt only when it changed"""
+        with self._lock:
+            snapshot = self.monitoring_service.last_snapshot
+            if snapshot is not self._snapshot:
+                self._body = self.renderer.render(
+                    snapshot, self.monitoring_service.alert_engine.active()
+                )
+                self._snapshot = snapshot
+            return self._body
+
+    @property
+    def url(self) -> Optional[str]:
+        """Scrape URL while the server runs"""
+        if self._server is None:
+            return None
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        """Bind the port and serve on the event loop"""
+        if self._server is not None:
+            return
+
+        self.runner.start()
+        self._server = self.runner.run(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.logger.info(f"Serving metrics on {self.url}")
+
+    def stop(self):
+        """Stop serving and release the port"""
+        if self._server is None:
+            return
+
+        async def close(server):
+            server.close()
+            await server.wait_closed()
+
+        self.runner.run(close(self._server))
+        self._server = None
+        if self._owns_runner:
+            self.runner.stop()
+
+    async def _handle(self, reader, writer):
+        """Answer one request and close the connection"""
+        try:
+            request = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            for _ in range(MAX_HEADER_LINES):
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request.split()
+            method = parts[0] if parts else b""
+            path = parts[1].split(b"?", 1)[0] if len(parts) > 1 else b""
+
+            if method not in (b"GET", b"HEAD"):
+                writer.write(self._response(b"405 Method Not Allowed", b""))
+            elif path != b"/metrics":
+                writer.write(self._response(b"404 Not Found", b""))
+            else:
+                body = self.body()
+                writer.write(
+                    self._response(b"200 OK", body, send_body=method == b"GET")
+                )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            self.logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status: bytes, body: bytes, send_body: bool = True) -> bytes:
+        """Build an HTTP response"""
+        headers = [
+            b"HTTP/1.1 " + status,
+            b"Content-Type: " + CONTENT_TYPE.encode(),
+            b"Content-Length: %d" % len(body),
+            b"Connection: close",
+        ]
+        return b"\r\n".join(headers) + b"\r\n\r\n" + (body if send_body else b"")
@@ -0,0 +1,157 @@
+"""
+Columnar ring-buffer history
+
+Samples are stored column-wise in preallocated float64 buffers (NumPy arrays
+when NumPy is installed, array('d') otherwise) with epoch timestamps in
+their own column. Each buffer holds two copies of the ring: every sample is
+written at index i and i + capacity, so the most recent N samples are always
+one contiguous range and can be returned as a slice without copying.
+"""
+
+from array import array
+from typing import Dict, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _allocate(size: int):
+    """Allocate a zeroed float64 column"""
+    if np is not None:
+        return np.zeros(size, dtype=np.float64)
+    return array("d", [0.0]) * size
+
+
+def count_since(timestamps, since: float) -> int:
+    """
+    Count the trailing samples at or after a time
+
+    Args:
+        timestamps: Ascending timestamp column
+        since: Epoch seconds
+
+    Returns:
+        Number of samples with timestamp >= since (binary search)
+    """
+    if np is not None and isinstance(timestamps, np.ndarray):
+        return len(timestamps) - int(np.searchsorted(timestamps, since))
+
+    low, high = 0, len(timestamps)
+    while low < high:
+        middle = (low + high) // 2
+        if timestamps[middle] < since:
+            low = middle + 1
+        else:
+            high = middle
+    return len(timestamps) - low
+
+
+class ColumnarHistory:
+    """Fixed-capacity history with one typed column per metric"""
+
+    def __init__(self, columns: Sequence[str], capacity: int):
+        """
+        Initialize history
+
+        Args:
+            columns: Metric column names (a "timestamp" column is added)
+            capacity: Maximum number of samples kept
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError("History capacity must be positive")
+
+        self.capacity = capacity
+        self.columns = ("timestamp",) + tuple(columns)
+        self._data = [_allocate(2 * capacity) for _ in self.columns]
+        # memoryview slices of array('d') do not copy; NumPy slices are views
+        self._views = [
+            column if np is not None else memoryview(column) for column in self._data
+        ]
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, *values: float):
+        """
+        Append one sample
+
+        Args:
+            timestamp: Epoch seconds
+            values: One value per metric column, in column order
+
+        Raises:
+            ValueError: If the number of values does not match the columns
+        """
+        if len(values) != len(self.columns) - 1:
+            raise ValueError(
+                f"Expected {len(self.columns) - 1} values, got {len(values)}"
+            )
+
+        index = self._next
+        mirror = index + self.capacity
+        for column, value in zip(self._data, (timestamp,) + values):
+            column[index] = column[mirror] = value
+
+        self._next = (index + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self):
+        """Drop all samples"""
+        self._next = 0
+        self._size = 0
+
+    def column(self, name: str, limit: Optional[int] = None):
+        """
+        Get one column, oldest sample first
+
+        Args:
+            name: Column name
+            limit: Only return the most recent samples
+
+        Returns:
+            Zero-copy slice of the column; it is overwritten as new samples
+            arrive, so copy it to keep it
+
+        Raises:
+            KeyError: If the column does not exist
+        """
+        if name not in self.columns:
+            raise KeyError(name)
+        start, end = self._bounds(limit)
+        return self._views[self.columns.index(name)][start:end]
+
+    def view(self, limit: Optional[int] = None) -> Dict:
+        """
+        Get all columns, oldest sample first
+
+        Args:
+            limit: Only return the most recent samples
+
+        Returns:
+            Dictionary mapping column names to zero-copy slices
+        """
+        start, end = self._bounds(limit)
+        return {name: view[start:end] for name, view in zip(self.columns, self._views)}
+
+    def latest(self) -> Optional[Dict]:
+        """Get the most recent sample as a dictionary"""
+        if not self._size:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {
+            name: float(data[index]) for name, data in zip(self.columns, self._data)
+        }
+
+    def _bounds(self, limit: Optional[int]):
+        """Contiguous [start, end) range of the most recent samples"""
+        count = self._size if limit is None else max(0, min(limit, self._size))
+        end = self._next + self.capacity
+        return end - count, end
@@ -0,0 +1,131 @@
+"""
+"System is busy" signal from pressure stall deltas
+
+Background work (cleanup, scheduled jobs) should yield while the machine is
+saturated. CPU or memory percentages do not tell that reliably; the share
+of time tasks stalled on CPU, memory or I/O does. The signal compares the
+PSI stall time accumulated since the previous check against per-resource
+thresholds, so it reacts to the last few seconds rather than to the
+kernel's 10 second average.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from ..platforms.linux.pressure import PressureReader
+from ..utils.logger import get_logger
+from .rates import PRESSURE_RATE_FIELDS, RateTracker, compute_pressure_rates
+
+# "some" stall percentages above which the system counts as busy
+DEFAULT_THRESHOLDS = {"cpu": 40.0, "memory": 10.0, "io": 30.0}
+
+
+class BusySignal:
+    """Tell whether CPU, memory or I/O pressure is above a threshold"""
+
+    def __init__(
+        self,
+        read: Callable[[], Dict],
+        thresholds: Optional[Dict[str, float]] = None,
+        min_interval: float = 1.0,
+    ):
+        """
+        Initialize signal
+
+        Args:
+            read: Returns PressureStall readings per resource
+            thresholds: "some" stall percentage per resource
+            min_interval: Seconds a result is reused before reading again
+        """
+        self.read = read
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.min_interval = min_interval
+        self.logger = get_logger(__name__)
+
+        self.tracker = RateTracker(PRESSURE_RATE_FIELDS, compute_pressure_rates)
+        self._lock = threading.Lock()
+        self._checked = None
+        self._stall = {}
+
+    @classmethod
+    def open(cls, thresholds: Optional[Dict[str, float]] = None):
+        """
+        Create a signal reading /proc/pressure
+
+        Returns:
+            BusySignal, or None when the kernel has no PSI
+        """
+        reader = PressureReader.open()
+        if reader is None:
+            return None
+        return cls(reader.read, thresholds)
+
+    def stall(self) -> Dict[str, float]:
+        """
+        "some" stall percentage per resource since the previous reading
+
+        The first reading has no delta and uses the 10 second average.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._checked is not None and now - self._checked < self.min_interval:
+                return self._stall
+
+            try:
+                readings = self.read()
+            except (OSError, KeyError) as e:
+                self.logger.debug(f"Cannot read pressure: {e}")
+                return {}
+
+            rates = self.tracker.update(readings, now)
+            self._stall = {
+                resource: (
+                    rates[resource]["some"] if resource in rates else reading.some_avg10
+                )
+                for resource, reading in readings.items()
+            }
+            self._checked = now
+            return self._stall
+
+    def busy_resources(self) -> Dict[str, float]:
+        """Resources whose stall percentage exceeds their threshold"""
+        return {
+            resource: value
+            for resource, value in self.stall().items()
+            if value > self.thresholds.get(resource, 100.0)
+        }
+
+    def is_busy(self) -> bool:
+        """Check whether any resource is under pressure"""
+        return bool(self.busy_resources())
+
+    def wait_until_idle(
+        self,
+        timeout: float,
+        poll: float = 5.0,
+        stop_event: Optional[threading.Event] = None,
+    ) -> bool:
+        """
+        Block while the system is busy
+
+        Args:
+            timeout: Most seconds to wait
+            poll: Seconds between checks
+            stop_event: Stop waiting early when set
+
+        Returns:
+            True if the system is idle, False if still busy after timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.is_busy():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            delay = min(poll, remaining)
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        return True
@@ -0,0 +1,167 @@
+"""
+Per-process history
+
+Keeps ring-buffer history for a bounded set of "interesting" processes:
+the top processes by CPU and by memory on each update, plus processes whose
+name matches a configured pattern. Histories come from a fixed pool that is
+allocated up front, and the process that has gone longest without being
+interesting is evicted to make room, so memory stays constant no matter how
+many processes come and go. Processes are keyed by PID and start time, and
+the history of an exited process stays available until it is evicted.
+Readers on other threads hold ``lock`` while they use a tracked process, as
+an update may append to its history or hand it to another process.
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from operator import attrgetter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .history import ColumnarHistory
+
+PROCESS_COLUMNS = ("cpu_percent", "rss", "io_bytes", "num_threads")
+
+
+class TrackedProcess:
+    """A tracked process and its history"""
+
+    __slots__ = ("pid", "start_time", "name", "history", "last_interesting", "alive")
+
+    def __init__(self, history: ColumnarHistory):
+        self.history = history
+        self.pid = None
+        self.start_time = None
+        self.name = None
+        self.last_interesting = None
+        self.alive = False
+
+    def to_dict(self, limit: Optional[int] = None) -> Dict:
+        """Process identity with its history columns"""
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "alive": self.alive,
+            "history": self.history.view(limit),
+        }
+
+
+class ProcessHistory:
+    """Ring-buffer history for a bounded set of processes"""
+
+    def __init__(
+        self,
+        max_processes: int = 32,
+        capacity: int = 300,
+        top: int = 5,
+        name_patterns: Sequence[str] = (),
+    ):
+        """
+        Initialize process history
+
+        Args:
+            max_processes: Processes tracked at once (size of the pool)
+            capacity: Samples kept per process
+            top: Processes picked by CPU and, separately, by RSS per update
+            name_patterns: fnmatch patterns of process names always tracked
+        """
+        self.max_processes = max_processes
+        self.top = top
+        self.name_patterns = tuple(name_patterns)
+        self._free = [
+            TrackedProcess(ColumnarHistory(PROCESS_COLUMNS, capacity))
+            for _ in range(max_processes)
+        ]
+        # Least recently interesting first
+        self.tracked = OrderedDict()
+        self.lock = threading.RLock()
+
+    def update(
+        self,
+        timestamp: float,
+        records: Dict[int, object],
+        read_io: Optional[Callable[[int], Optional[int]]] = None,
+    ):
+        """
+        Pick interesting processes and append a sample for every tracked one
+
+        Args:
+            timestamp: Epoch seconds of the sample
+            records: Process records (pid, start_time, name, cpu_percent,
+                rss, num_threads) by PID, e.g. ProcessTable.records
+            read_io: Returns the cumulative I/O bytes of a PID (optional,
+                only called for tracked processes)
+        """
+        with self.lock:
+            for record in self._interesting(records.values()):
+                key = (record.pid, record.start_time)
+                tracked = self.tracked.get(key)
+                if tracked is None:
+                    tracked = self._allocate(key, record)
+                tracked.last_interesting = timestamp
+                self.tracked.move_to_end(key)
+
+            for (pid, start_time), tracked in self.tracked.items():
+                record = records.get(pid)
+                tracked.alive = record is not None and record.start_time == start_time
+                if not tracked.alive:
+                    continue
+
+                io_bytes = read_io(pid) if read_io else None
+                tracked.name = record.name
+                tracked.history.append(
+                    timestamp,
+                    record.cpu_percent,
+                    record.rss,
+                    float("nan") if io_bytes is None else io_bytes,
+                    record.num_threads,
+                )
+
+    def _interesting(self, records: Iterable) -> List:
+        """Top processes by CPU and RSS plus name matches"""
+        records = list(records)
+        chosen = {}
+        for key in ("cpu_percent", "rss"):
+            for record in heapq.nlargest(self.top, records, key=attrgetter(key)):
+                chosen[record.pid] = record
+        if self.name_patterns:
+            for record in records:
+                if any(fnmatchcase(record.name, p) for p in self.name_patterns):
+                    chosen[record.pid] = record
+        return list(chosen.values())[: self.max_processes]
+
+    def _allocate(self, key, record) -> TrackedProcess:
+        """Take a history from the pool, evicting if it is empty"""
+        if self._free:
+            tracked = self._free.pop()
+        else:
+            _, tracked = self.tracked.popitem(last=False)
+            tracked.history.clear()
+
+        tracked.pid, tracked.start_time = key
+        tracked.name = record.name
+        self.tracked[key] = tracked
+        return tracked
+
+    def get(self, pid: int) -> Optional[TrackedProcess]:
+        """Most recently started tracked process with a PID"""
+        with self.lock:
+            matches = [t for t in self.tracked.values() if t.pid == pid]
+        if not matches:
+            return None
+        return max(matches, key=attrgetter("start_time"))
+
+    def processes(self) -> List[Dict]:
+        """Tracked processes, most recently interesting first"""
+        with self.lock:
+            return [
+                {
+                    "pid": tracked.pid,
+                    "name": tracked.name,
+                    "alive": tracked.alive,
+                    "samples": len(tracked.history),
+                    "last_interesting": tracked.last_interesting,
+                }
+                for tracked in reversed(self.tracked.values())
+            ]
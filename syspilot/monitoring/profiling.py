@@ -0,0 +1,201 @@
+"""
+Collector self-profiling and overhead budget
+
+Every collector call is timed with perf_counter_ns (latency) and
+thread_time_ns (CPU time of the calling thread). Latencies go into small
+fixed-bucket histograms; CPU time is summed per collector over a window.
+At the end of each window the CPU time spent collecting is compared with
+the overhead budget, a share of one core. Over budget, the collector that
+used the most CPU has its interval doubled; well under budget, slowed down
+collectors are brought back towards their configured interval.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional
+
+# Histogram bucket upper bounds: 10 µs to 10 s in 1-2.5-5 steps, then +Inf
+BUCKET_BOUNDS_NS = tuple(
+    int(mantissa * 10**exponent)
+    for exponent in range(4, 10)
+    for mantissa in (1, 2.5, 5)
+) + (10**10,)
+
+# Interval given to an every-tick collector when it is first slowed down
+MIN_SLOWED_INTERVAL = 1.0
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of call durations"""
+
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, duration_ns: int):
+        """Add one duration"""
+        self.buckets[bisect_left(BUCKET_BOUNDS_NS, duration_ns)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, q: float) -> Optional[int]:
+        """Upper bound (ns) of the bucket holding the q-th percentile"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                if index < len(BUCKET_BOUNDS_NS):
+                    return min(BUCKET_BOUNDS_NS[index], self.max_ns)
+                return self.max_ns
+        return self.max_ns
+
+    def to_dict(self) -> Dict:
+        """Summary in milliseconds"""
+        if not self.count:
+            return {"calls": 0}
+        return {
+            "calls": self.count,
+            "mean_ms": round(self.total_ns / self.count / 1e6, 3),
+            "p50_ms": round(self.percentile(50) / 1e6, 3),
+            "p99_ms": round(self.percentile(99) / 1e6, 3),
+            "max_ms": round(self.max_ns / 1e6, 3),
+        }
+
+
+class CollectorProfiler:
+    """Per-collector latency and CPU accounting with an overhead budget"""
+
+    def __init__(
+        self,
+        budget_percent: Optional[float] = 1.0,
+        window: float = 60.0,
+        max_slowdown: float = 8.0,
+    ):
+        """
+        Initialize profiler
+
+        Args:
+            budget_percent: CPU time allowed for collectors, in percent of
+                one core (None disables enforcement)
+            window: Seconds over which CPU time is summed
+            max_slowdown: Largest factor a collector interval is raised by
+        """
+        self.budget_percent = budget_percent
+        self.window = window
+        self.max_slowdown = max_slowdown
+
+        self.histograms = {}
+        self.base_intervals = {}
+        self.overhead_percent = None
+        self.cpu_shares = {}
+
+        self._lock = threading.Lock()
+        self._window_cpu = {}
+        self._window_start = time.monotonic()
+
+    def record(self, name: str, wall_ns: int, cpu_ns: int):
+        """Account one collector call"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(wall_ns)
+            self._window_cpu[name] = self._window_cpu.get(name, 0) + cpu_ns
+
+    def enforce(self, collectors: Dict, now: Optional[float] = None):
+        """
+        Close the window when it has elapsed and adjust intervals
+
+        Args:
+            collectors: Collectors by name (CollectorRegistry.collectors)
+            now: Monotonic time (defaults to time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return
+
+        with self._lock:
+            window_cpu, self._window_cpu = self._window_cpu, {}
+            self._window_start = now
+
+        scale = 100 / (elapsed * 1e9)
+        self.cpu_shares = {
+            name: round(cpu_ns * scale, 3) for name, cpu_ns in window_cpu.items()
+        }
+        self.overhead_percent = round(sum(window_cpu.values()) * scale, 3)
+
+        if self.budget_percent is None:
+            return
+        if self.overhead_percent > self.budget_percent:
+            self._slow_down(collectors, window_cpu)
+        elif self.overhead_percent < self.budget_percent / 2:
+            self._speed_up(collectors)
+
+    def _slow_down(self, collectors: Dict, window_cpu: Dict[str, int]):
+        """Double the interval of the costliest collector that can slow down"""
+        for name in sorted(window_cpu, key=window_cpu.get, reverse=True):
+            collector = collectors.get(name)
+            if collector is None or collector.interval is None:
+                continue
+            base = self.base_intervals.setdefault(name, collector.interval)
+            limit = max(base, MIN_SLOWED_INTERVAL) * self.max_slowdown
+            interval = max(collector.interval * 2, MIN_SLOWED_INTERVAL)
+            if collector.interval >= limit:
+                continue
+            collector.interval = min(interval, limit)
+            return
+
+    def _speed_up(self, collectors: Dict):
+        """Halve the interval of slowed down collectors, down to their base"""
+        for name, base in list(self.base_intervals.items()):
+            collector = collectors.get(name)
+            if collector is None:
+                del self.base_intervals[name]
+                continue
+            interval = collector.interval / 2
+            if interval <= max(base, MIN_SLOWED_INTERVAL / 2):
+                collector.interval = base
+                del self.base_intervals[name]
+            else:
+                collector.interval = interval
+
+    def report(self, collectors: Dict) -> Dict:
+        """
+        Profiling summary
+
+        Args:
+            collectors: Collectors by name, for their current intervals
+
+        Returns:
+            Overhead of the last window, the budget, and per collector the
+            latency summary, CPU share, interval and configured interval
+        """
+        with self._lock:
+            latencies = {
+                name: histogram.to_dict() for name, histogram in self.histograms.items()
+            }
+
+        result = {}
+        for name, collector in collectors.items():
+            entry = latencies.get(name, {"calls": 0})
+            entry["cpu_percent"] = self.cpu_shares.get(name)
+            entry["interval"] = collector.interval
+            entry["base_interval"] = self.base_intervals.get(name, collector.interval)
+            result[name] = entry
+
+        return {
+            "overhead_percent": self.overhead_percent,
+            "budget_percent": self.budget_percent,
+            "collectors": result,
+        }
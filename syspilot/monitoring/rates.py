@@ -0,0 +1,173 @@
+"""
+Per-device rate tracking
+
+Turns cumulative per-device counters (/proc/diskstats, /proc/net/dev or
+their psutil equivalents, cgroup accounting per unit, PSI stall totals) into
+per-second rates using monotonic-clock deltas between two readings.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DISK_RATE_FIELDS = (
+    "read_bytes",  # bytes/s
+    "write_bytes",  # bytes/s
+    "read_iops",
+    "write_iops",
+    "utilization",  # percent of time busy
+    "await_ms",  # average time per request
+)
+
+NETWORK_RATE_FIELDS = (
+    "rx_bytes",  # bytes/s
+    "tx_bytes",  # bytes/s
+    "rx_packets",  # packets/s
+    "tx_packets",  # packets/s
+    "drops",  # dropped packets/s, both directions
+    "errors",  # errors/s, both directions
+)
+
+UNIT_RATE_FIELDS = (
+    "cpu_percent",  # percent of one CPU
+    "memory_bytes",  # current usage
+    "io_read_bytes",  # bytes/s
+    "io_write_bytes",  # bytes/s
+    "memory_pressure",  # percent of time stalled on memory (avg10)
+)
+
+PRESSURE_RATE_FIELDS = (
+    "some",  # percent of time at least one task stalled
+    "full",  # percent of time all non-idle tasks stalled
+)
+
+# Pseudo block devices left out of history
+IGNORED_DISK_PREFIXES = ("loop", "ram")
+
+# Loopback and container veth pairs left out of history
+IGNORED_INTERFACE_PREFIXES = ("lo", "veth")
+
+
+def compute_disk_rates(previous, current, elapsed: float) -> Tuple[float, ...]:
+    """Rates for one block device, ordered as DISK_RATE_FIELDS"""
+    reads = current.read_count - previous.read_count
+    writes = current.write_count - previous.write_count
+    io_time = (current.read_time - previous.read_time) + (
+        current.write_time - previous.write_time
+    )
+    busy = getattr(current, "busy_time", 0) - getattr(previous, "busy_time", 0)
+
+    return (
+        (current.read_bytes - previous.read_bytes) / elapsed,
+        (current.write_bytes - previous.write_bytes) / elapsed,
+        reads / elapsed,
+        writes / elapsed,
+        min(100.0, busy / (elapsed * 1000) * 100),
+        io_time / (reads + writes) if reads + writes else 0.0,
+    )
+
+
+def compute_network_rates(previous, current, elapsed: float) -> Tuple[float, ...]:
+    """Rates for one interface, ordered as NETWORK_RATE_FIELDS"""
+    drops = (current.dropin - previous.dropin) + (current.dropout - previous.dropout)
+    errors = (current.errin - previous.errin) + (current.errout - previous.errout)
+
+    return (
+        (current.bytes_recv - previous.bytes_recv) / elapsed,
+        (current.bytes_sent - previous.bytes_sent) / elapsed,
+        (current.packets_recv - previous.packets_recv) / elapsed,
+        (current.packets_sent - previous.packets_sent) / elapsed,
+        drops / elapsed,
+        errors / elapsed,
+    )
+
+
+def compute_unit_rates(previous, current, elapsed: float) -> Tuple[float, ...]:
+    """Rates of one cgroup unit, ordered as UNIT_RATE_FIELDS"""
+    return (
+        (current.cpu_usec - previous.cpu_usec) / (elapsed * 1e6) * 100,
+        current.memory,
+        (current.io_read - previous.io_read) / elapsed,
+        (current.io_write - previous.io_write) / elapsed,
+        current.memory_pressure,
+    )
+
+
+def compute_pressure_rates(previous, current, elapsed: float) -> Tuple[float, ...]:
+    """Stall percentages of one PSI resource, ordered as PRESSURE_RATE_FIELDS"""
+    return (
+        min(100.0, (current.some_total - previous.some_total) / (elapsed * 1e4)),
+        min(100.0, (current.full_total - previous.full_total) / (elapsed * 1e4)),
+    )
+
+
+def sum_counters(counters: Dict[str, Any]):
+    """
+    Element-wise total of per-device counter tuples
+
+    Returns:
+        Counter tuple of the same type, or None without devices
+    """
+    rows = list(counters.values())
+    if not rows:
+        return None
+    return type(rows[0])(*map(sum, zip(*rows)))
+
+
+class RateTracker:
+    """Per-device rates from successive counter readings"""
+
+    def __init__(
+        self,
+        fields: Tuple[str, ...],
+        compute: Callable[[Any, Any, float], Tuple[float, ...]],
+    ):
+        """
+        Initialize tracker
+
+        Args:
+            fields: Names of the values returned by compute
+            compute: Function of (previous, current, elapsed seconds)
+        """
+        self.fields = fields
+        self.compute = compute
+        self.previous = {}
+        self.previous_time = None
+
+    def update(self, counters: Dict[str, Any], now: float) -> Dict[str, Dict]:
+        """
+        Feed a new reading
+
+        Devices seen for the first time, and devices whose counters went
+        backwards (reset or wrapped), have no rate until the next reading.
+
+        Args:
+            counters: Counter tuples per device
+            now: Monotonic time of the reading
+
+        Returns:
+            Dictionary mapping device names to {field: rate}
+        """
+        elapsed = now - self.previous_time if self.previous_time is not None else 0
+        rates = {}
+
+        if elapsed > 0:
+            for name, current in counters.items():
+                previous = self.previous.get(name)
+                if previous is None:
+                    continue
+                values = self.compute(previous, current, elapsed)
+                if min(values) < 0:
+                    continue
+                rates[name] = {
+                    field: round(value, 2) for field, value in zip(self.fields, values)
+                }
+
+        self.previous = counters
+        self.previous_time = now
+        return rates
+
+    @staticmethod
+    def total(rates: Dict[str, Dict], field: str) -> Optional[float]:
+        """Sum of one field over all devices, or None without rates"""
+        if not rates:
+            return None
+        return sum(device[field] for device in rates.values())
@@ -0,0 +1,202 @@
+"""
+Multi-resolution history (RRD-style rollups)
+
+Raw samples go into a ring buffer of fixed size, and every sample is also
+folded into the open bucket of each rollup tier (for example 1 minute and
+1 hour). When a sample lands in a new bucket the previous one is written to
+that tier's own ring as min/max/mean/last, so memory stays fixed, updates
+are O(1) per sample and any query reads at most one tier's capacity.
+"""
+
+import math
+from typing import Dict, Optional, Sequence
+
+from .history import ColumnarHistory, count_since
+
+RAW = "raw"
+
+# Tier name -> bucket width in seconds and number of buckets kept
+DEFAULT_TIERS = {
+    "1m": {"interval": 60, "size": 1440},  # one day
+    "1h": {"interval": 3600, "size": 720},  # thirty days
+}
+
+AGGREGATES = ("min", "max", "mean", "last")
+
+
+class _Bucket:
+    """Running aggregates of one open bucket"""
+
+    __slots__ = ("start", "count", "total", "low", "high", "last")
+
+    def __init__(self, start: float, width: int):
+        self.start = start
+        self.count = 0
+        self.total = [0.0] * width
+        self.low = [math.inf] * width
+        self.high = [-math.inf] * width
+        self.last = [0.0] * width
+
+    def add(self, values: Sequence[float]):
+        """Fold one sample into the bucket"""
+        self.count += 1
+        for i, value in enumerate(values):
+            self.total[i] += value
+            if value < self.low[i]:
+                self.low[i] = value
+            if value > self.high[i]:
+                self.high[i] = value
+            self.last[i] = value
+
+    def row(self):
+        """Aggregates in RollupTier column order"""
+        row = []
+        for i in range(len(self.total)):
+            row.extend(
+                (self.low[i], self.high[i], self.total[i] / self.count, self.last[i])
+            )
+        return row
+
+
+class RollupTier:
+    """Downsampled ring with min/max/mean/last per column and bucket"""
+
+    def __init__(self, columns: Sequence[str], interval: float, size: int):
+        """
+        Initialize tier
+
+        Args:
+            columns: Metric column names
+            interval: Bucket width in seconds
+            size: Number of closed buckets kept
+        """
+        self.interval = interval
+        self.width = len(columns)
+        self.history = ColumnarHistory(
+            [f"{name}_{agg}" for name in columns for agg in AGGREGATES], size
+        )
+        self.bucket = None
+
+    def add(self, timestamp: float, values: Sequence[float]):
+        """Fold a sample in, closing the open bucket when it is complete"""
+        start = timestamp - timestamp % self.interval
+        if self.bucket is not None and self.bucket.start != start:
+            self.history.append(self.bucket.start, *self.bucket.row())
+            self.bucket = None
+        if self.bucket is None:
+            self.bucket = _Bucket(start, self.width)
+        self.bucket.add(values)
+
+
+class RollupHistory:
+    """Raw ring buffer plus rollup tiers, queried by resolution or window"""
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        capacity: int,
+        tiers: Optional[Dict[str, Dict]] = None,
+    ):
+        """
+        Initialize history
+
+        Args:
+            columns: Metric column names
+            capacity: Number of raw samples kept
+            tiers: Rollup tiers as {name: {"interval": seconds, "size": n}}
+        """
+        self.raw = ColumnarHistory(columns, capacity)
+        self.columns = self.raw.columns
+        self.tiers = {
+            name: RollupTier(columns, spec["interval"], spec["size"])
+            for name, spec in sorted(
+                (tiers if tiers is not None else DEFAULT_TIERS).items(),
+                key=lambda item: item[1]["interval"],
+            )
+        }
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def append(self, timestamp: float, *values: float):
+        """
+        Append one sample to the raw ring and every tier
+
+        Args:
+            timestamp: Epoch seconds
+            values: One value per metric column
+        """
+        self.raw.append(timestamp, *values)
+        for tier in self.tiers.values():
+            tier.add(timestamp, values)
+
+    def latest(self) -> Optional[Dict]:
+        """Get the most recent raw sample"""
+        return self.raw.latest()
+
+    def view(self, limit: Optional[int] = None, resolution: str = RAW) -> Dict:
+        """
+        Get history at one resolution
+
+        Args:
+            limit: Only return the most recent samples or buckets
+            resolution: "raw" or a tier name such as "1m" or "1h"
+
+        Returns:
+            Dictionary of zero-copy column views, oldest first. Tier columns
+            are named <column>_min/_max/_mean/_last with the bucket start as
+            timestamp; the bucket still being filled is not included.
+
+        Raises:
+            KeyError: If the resolution does not exist
+        """
+        if resolution == RAW:
+            return self.raw.view(limit)
+        return self.tiers[resolution].history.view(limit)
+
+    def resolution_for(self, window: float, now: float) -> str:
+        """
+        Pick the finest resolution that still covers a time window
+
+        Args:
+            window: Window length in seconds
+            now: Current epoch time
+
+        Returns:
+            "raw" or a tier name
+        """
+        # Raw data is enough while nothing has been dropped from the ring or
+        # its oldest sample already reaches back past the window
+        timestamps = self.raw.column("timestamp")
+        if len(self.raw) < self.raw.capacity or now - timestamps[0] >= window:
+            return RAW
+
+        for name, tier in self.tiers.items():
+            if tier.interval * tier.history.capacity >= window:
+                return name
+
+        return next(reversed(self.tiers), RAW)
+
+    def window(self, seconds: float, now: float) -> Dict:
+        """
+        Get the samples covering the last seconds at a suitable resolution
+
+        Args:
+            seconds: Window length in seconds
+            now: Current epoch time
+
+        Returns:
+            Dictionary with the chosen "resolution" and its column views
+        """
+        resolution = self.resolution_for(seconds, now)
+        if resolution == RAW:
+            history = self.raw
+            since = now - seconds
+        else:
+            tier = self.tiers[resolution]
+            history = tier.history
+            since = now - seconds - tier.interval
+
+        count = count_since(history.column("timestamp"), since)
+
+        return {"resolution": resolution, **history.view(count)}
@@ -0,0 +1,310 @@
+"""
+Shared-memory snapshot publishing
+
+The daemon writes the latest snapshot values and a short history ring into
+a ``multiprocessing.shared_memory`` segment with a fixed layout. Readers in
+other processes map the same segment and read it in place: no socket round
+trip, no serialization, and polling an unchanged segment costs one integer
+read.
+
+Consistency uses a sequence lock. The writer makes the sequence odd before
+touching the data and even again afterwards; a reader retries while the
+sequence is odd or changed during its read.
+
+Layout (native byte order, float64 values, NaN for missing readings):
+    magic "SPSM", version u16, padding, history capacity u32, padding,
+    sequence u64, samples written u64, snapshot values, then one mirrored
+    ring (2 x capacity) per history column.
+"""
+
+import math
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+
+MAGIC = b"SPSM"
+VERSION = 1
+HEADER = struct.Struct("=4sH2xI4xQQ")
+SEQUENCE_OFFSET = 16
+COUNTER = struct.Struct("=Q")
+VALUE_SIZE = 8
+
+SNAPSHOT_FIELDS = (
+    "timestamp",
+    "cpu_percent",
+    "cpu_temperature",
+    "memory_percent",
+    "memory_used",
+    "memory_total",
+    "swap_percent",
+    "disk_percent",
+    "disk_read_rate",  # bytes/s
+    "disk_write_rate",  # bytes/s
+    "network_sent_rate",  # KB/s
+    "network_recv_rate",  # KB/s
+    "load_1min",
+    "load_5min",
+    "load_15min",
+    "alerts_active",
+)
+
+HISTORY_FIELDS = ("timestamp", "cpu_percent", "memory_percent", "disk_percent")
+
+# Reader attempts before giving up on a segment being rewritten
+READ_RETRIES = 100
+
+# Segments published by this process; the resource tracker owns them
+_published = set()
+
+
+def default_name() -> str:
+    """Segment name for the current user"""
+    return f"syspilot-{os.getuid()}"
+
+
+def _segment_size(capacity: int) -> int:
+    """Total segment size for a history capacity"""
+    return HEADER.size + VALUE_SIZE * (
+        len(SNAPSHOT_FIELDS) + 2 * capacity * len(HISTORY_FIELDS)
+    )
+
+
+def _snapshot_values(snapshot, alerts_active: int):
+    """Snapshot values ordered as SNAPSHOT_FIELDS"""
+    nan = math.nan
+    memory, swap = snapshot.memory, snapshot.swap
+    sent, recv = snapshot.network_rates or (nan, nan)
+    load = snapshot.load_avg or (nan, nan, nan)
+    disks = snapshot.disk_rates.values()
+
+    return (
+        snapshot.timestamp,
+        snapshot.cpu_percent,
+        nan if snapshot.cpu_temperature is None else snapshot.cpu_temperature,
+        snapshot.memory_percent,
+        memory.used if memory is not None else nan,
+        memory.total if memory is not None else nan,
+        swap.percent if swap is not None else nan,
+        snapshot.disk_percent,
+        sum(d["read_bytes"] for d in disks) if disks else nan,
+        sum(d["write_bytes"] for d in disks) if disks else nan,
+        sent,
+        recv,
+        *load,
+        alerts_active,
+    )
+
+
+class _Segment:
+    """Typed views over a mapped segment"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int):
+        self.shm = shm
+        self.capacity = capacity
+
+        values = shm.buf[HEADER.size : _segment_size(capacity)].cast("d")
+        count = len(SNAPSHOT_FIELDS)
+        ring = 2 * capacity
+        self.values = values
+        self.snapshot = values[:count]
+        self.history = [
+            values[offset : offset + ring]
+            for offset in range(count, count + ring * len(HISTORY_FIELDS), ring)
+        ]
+
+    @property
+    def sequence(self) -> int:
+        return COUNTER.unpack_from(self.shm.buf, SEQUENCE_OFFSET)[0]
+
+    @property
+    def written(self) -> int:
+        return COUNTER.unpack_from(self.shm.buf, SEQUENCE_OFFSET + COUNTER.size)[0]
+
+    def release(self):
+        for view in self.history:
+            view.release()
+        self.snapshot.release()
+        self.values.release()
+        self.history = []
+
+
+class SharedSnapshotPublisher:
+    """Write snapshots into a shared-memory segment (single writer)"""
+
+    def __init__(self, name: Optional[str] = None, history_size: int = 300):
+        """
+        Create the segment, replacing a stale one with the same name
+
+        Args:
+            name: Segment name (defaults to a per-user name)
+            history_size: Samples kept in the history ring
+        """
+        self.name = name or default_name()
+        self.capacity = history_size
+
+        try:
+            stale = shared_memory.SharedMemory(self.name)
+        except FileNotFoundError:
+            pass
+        else:
+            stale.close()
+            stale.unlink()
+
+        shm = shared_memory.SharedMemory(
+            self.name, create=True, size=_segment_size(history_size)
+        )
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, history_size, 0, 0)
+        _published.add(self.name)
+        self._segment = _Segment(shm, history_size)
+        for index in range(len(self._segment.values)):
+            self._segment.values[index] = math.nan
+
+    def publish(self, snapshot, alerts_active: int = 0):
+        """
+        Publish one snapshot and append it to the history ring
+
+        Args:
+            snapshot: SystemSnapshot
+            alerts_active: Number of alerts currently firing
+        """
+        segment = self._segment
+        buf = segment.shm.buf
+        sequence = segment.sequence
+        written = segment.written
+
+        COUNTER.pack_into(buf, SEQUENCE_OFFSET, sequence + 1)
+
+        values = _snapshot_values(snapshot, alerts_active)
+        for index, value in enumerate(values):
+            segment.snapshot[index] = value
+
+        index = written % self.capacity
+        mirror = index + self.capacity
+        row = (
+            snapshot.timestamp,
+            snapshot.cpu_percent,
+            snapshot.memory_percent,
+            snapshot.disk_percent,
+        )
+        for view, value in zip(segment.history, row):
+            view[index] = view[mirror] = value
+
+        COUNTER.pack_into(buf, SEQUENCE_OFFSET + COUNTER.size, written + 1)
+        COUNTER.pack_into(buf, SEQUENCE_OFFSET, sequence + 2)
+
+    def close(self):
+        """Release and remove the segment"""
+        if self._segment is None:
+            return
+        self._segment.release()
+        self._segment.shm.close()
+        try:
+            self._segment.shm.unlink()
+        except FileNotFoundError:
+            pass
+        _published.discard(self.name)
+        self._segment = None
+
+
+class SharedSnapshotReader:
+    """Read snapshots published by another process"""
+
+    def __init__(self, segment: _Segment):
+        """Wrap an attached segment; use open() instead"""
+        self._segment = segment
+
+    @classmethod
+    def open(cls, name: Optional[str] = None):
+        """
+        Attach to a published segment
+
+        Returns:
+            SharedSnapshotReader, or None when nothing is published
+        """
+        name = name or default_name()
+        try:
+            shm = shared_memory.SharedMemory(name)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # Attaching registers the segment with the resource tracker, which
+        # would remove it when this reader exits
+        if name not in _published:
+            resource_tracker.unregister(shm._name, "shared_memory")
+
+        if shm.size < HEADER.size:
+            shm.close()
+            return None
+        magic, version, capacity, _, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION or shm.size < _segment_size(capacity):
+            shm.close()
+            return None
+
+        return cls(_Segment(shm, capacity))
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever a new snapshot is published"""
+        return self._segment.sequence
+
+    def _consistent(self, read):
+        """Run read until it sees no concurrent write"""
+        segment = self._segment
+        for _ in range(READ_RETRIES):
+            before = segment.sequence
+            if before & 1:
+                time.sleep(0)
+                continue
+            result = read(segment)
+            if segment.sequence == before:
+                return result
+        return None
+
+    def read(self) -> Optional[Dict]:
+        """
+        Latest snapshot values
+
+        Returns:
+            Dictionary keyed by SNAPSHOT_FIELDS (None for missing readings),
+            or None when nothing was published yet
+        """
+        values = self._consistent(lambda segment: segment.snapshot.tolist())
+        if not values or math.isnan(values[0]):
+            return None
+        return {
+            field: None if math.isnan(value) else value
+            for field, value in zip(SNAPSHOT_FIELDS, values)
+        }
+
+    def history(self, limit: Optional[int] = None) -> Dict:
+        """
+        Recent history, oldest first
+
+        Args:
+            limit: Only return the most recent samples
+
+        Returns:
+            Dictionary mapping HISTORY_FIELDS to lists of values
+        """
+
+        def read(segment):
+            written = segment.written
+            size = min(written, segment.capacity)
+            count = size if limit is None else max(0, min(limit, size))
+            end = written % segment.capacity + segment.capacity
+            return {
+                field: view[end - count : end].tolist()
+                for field, view in zip(HISTORY_FIELDS, segment.history)
+            }
+
+        return self._consistent(read) or {field: [] for field in HISTORY_FIELDS}
+
+    def close(self):
+        """Detach from the segment"""
+        if self._segment is None:
+            return
+        self._segment.release()
+        self._segment.shm.close()
+        self._segment = None
@@ -0,0 +1,223 @@
+"""
+Immutable per-tick system snapshot
+
+Every source (memory, disk, network, ...) is read once per tick into a
+SystemSnapshot. The stats dictionary, alerts and history are all derived
+from the same snapshot, so they always agree with each other.
+"""
+
+import heapq
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .cpu_sampler import CpuUsage
+
+
+class SystemSnapshot(NamedTuple):
+    """Raw readings taken during one monitoring tick"""
+
+    timestamp: float
+    cpu: CpuUsage
+    cpu_temperature: Optional[float] = None
+    memory: Any = None  # psutil.virtual_memory()
+    swap: Any = None  # psutil.swap_memory()
+    disk_usage: Any = None  # psutil.disk_usage("/")
+    disk_io: Any = None  # psutil.disk_io_counters()
+    network_io: Any = None  # psutil.net_io_counters()
+    network_rates: Optional[Tuple[float, float]] = None  # sent/recv KB/s
+    disk_rates: Dict[str, Dict] = {}  # per disk, see rates.DISK_RATE_FIELDS
+    interface_rates: Dict[str, Dict] = {}  # per NIC, see NETWORK_RATE_FIELDS
+    unit_rates: Dict[str, Dict] = {}  # per systemd unit, see UNIT_RATE_FIELDS
+    pressure: Dict[str, Any] = {}  # PSI readings per resource (PressureStall)
+    pressure_rates: Dict[str, Dict] = {}  # see PRESSURE_RATE_FIELDS
+    top_processes: Tuple[Dict, ...] = ()
+    load_avg: Optional[Tuple[float, float, float]] = None
+    cpu_count: int = 0
+    boot_time: Optional[float] = None
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU usage percentage"""
+        return self.cpu.percent
+
+    @property
+    def memory_percent(self) -> float:
+        """Memory usage percentage"""
+        return self.memory.percent if self.memory is not None else 0.0
+
+    @property
+    def disk_percent(self) -> float:
+        """Root partition usage percentage"""
+        return self.disk_usage.percent if self.disk_usage is not None else 0.0
+
+    def memory_info(self) -> Dict:
+        """Detailed memory information"""
+        if self.memory is None or self.swap is None:
+            return {}
+
+        return {
+            "total": self.memory.total,
+            "available": self.memory.available,
+            "used": self.memory.used,
+            "free": self.memory.free,
+            "percent": self.memory.percent,
+            "swap_total": self.swap.total,
+            "swap_used": self.swap.used,
+            "swap_free": self.swap.free,
+            "swap_percent": self.swap.percent,
+        }
+
+    def disk_info(self) -> Dict:
+        """Detailed disk information"""
+        if self.disk_usage is None:
+            return {}
+
+        info = {
+            "total": self.disk_usage.total,
+            "used": self.disk_usage.used,
+            "free": self.disk_usage.free,
+            "percent": self.disk_usage.percent,
+        }
+
+        if self.disk_io:
+            info.update(
+                {
+                    "read_bytes": self.disk_io.read_bytes,
+                    "write_bytes": self.disk_io.write_bytes,
+                    "read_count": self.disk_io.read_count,
+                    "write_count": self.disk_io.write_count,
+                }
+            )
+
+        if self.disk_rates:
+            info.update(
+                {
+                    "read_bytes_rate": sum(
+                        d["read_bytes"] for d in self.disk_rates.values()
+                    ),
+                    "write_bytes_rate": sum(
+                        d["write_bytes"] for d in self.disk_rates.values()
+                    ),
+                }
+            )
+
+        return info
+
+    def network_info(self) -> Dict:
+        """Network I/O counters and rates"""
+        if self.network_io is None:
+            return {}
+
+        result = {
+            "bytes_sent": self.network_io.bytes_sent,
+            "bytes_recv": self.network_io.bytes_recv,
+            "packets_sent": self.network_io.packets_sent,
+            "packets_recv": self.network_io.packets_recv,
+        }
+
+        if self.network_rates is not None:
+            result.update(
+                {
+                    "bytes_sent_rate": round(self.network_rates[0], 2),
+                    "bytes_recv_rate": round(self.network_rates[1], 2),
+                }
+            )
+
+        return result
+
+    def pressure_info(self) -> Dict:
+        """Pressure stall averages and the stall share since the last tick"""
+        info = {}
+        for resource, stall in self.pressure.items():
+            info[resource] = stall._asdict()
+            rates = self.pressure_rates.get(resource)
+            if rates:
+                info[resource].update(
+                    some_stall_percent=rates["some"], full_stall_percent=rates["full"]
+                )
+        return info
+
+    def top_units(self, limit: int = 5) -> Dict:
+        """Systemd units using the most CPU, memory and I/O"""
+        if not self.unit_rates:
+            return {}
+
+        def ranked(key) -> List[Dict]:
+            units = heapq.nlargest(
+                limit, self.unit_rates.items(), key=lambda item: key(item[1])
+            )
+            return [{"unit": name, **rates} for name, rates in units]
+
+        return {
+            "cpu": ranked(itemgetter("cpu_percent")),
+            "memory": ranked(itemgetter("memory_bytes")),
+            "io": ranked(
+                lambda rates: rates["io_read_bytes"] + rates["io_write_bytes"]
+            ),
+        }
+
+    def system_load(self) -> Dict:
+        """System load averages"""
+        if self.load_avg is None:
+            return {}
+
+        count = self.cpu_count
+        load_1, load_5, load_15 = self.load_avg
+
+        return {
+            "load_1min": load_1,
+            "load_5min": load_5,
+            "load_15min": load_15,
+            "cpu_count": count,
+            "load_1min_percent": (load_1 / count) * 100 if count > 0 else 0,
+            "load_5min_percent": (load_5 / count) * 100 if count > 0 else 0,
+            "load_15min_percent": (load_15 / count) * 100 if count > 0 else 0,
+        }
+
+    def boot_info(self) -> Dict:
+        """System boot time information"""
+        if self.boot_time is None:
+            return {}
+
+        boot_time = datetime.fromtimestamp(self.boot_time)
+        uptime = datetime.fromtimestamp(self.timestamp) - boot_time
+
+        return {
+            "boot_time": boot_time.isoformat(),
+            "uptime_seconds": uptime.total_seconds(),
+            "uptime_days": uptime.days,
+            "uptime_hours": uptime.seconds // 3600,
+            "uptime_minutes": (uptime.seconds % 3600) // 60,
+        }
+
+    def to_dict(self, alerts: Optional[List[Dict]] = None) -> Dict:
+        """
+        Build the stats dictionary returned by get_system_stats
+
+        Args:
+            alerts: Alerts evaluated on this snapshot
+
+        Returns:
+            Dictionary with system statistics
+        """
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "cpu_percent": self.cpu_percent,
+            "cpu_percent_percpu": list(self.cpu.percpu),
+            "cpu_times_percent": dict(self.cpu.modes),
+            "cpu_temperature": self.cpu_temperature,
+            "memory_percent": self.memory_percent,
+            "memory_info": self.memory_info(),
+            "disk_percent": self.disk_percent,
+            "disk_info": self.disk_info(),
+            "disk_io_rates": dict(self.disk_rates),
+            "network_io": self.network_info(),
+            "network_interfaces": dict(self.interface_rates),
+            "top_processes": list(self.top_processes),
+            "top_units": self.top_units(),
+            "pressure": self.pressure_info(),
+            "system_load": self.system_load(),
+            "boot_time": self.boot_info(),
+            "alerts": alerts if alerts is not None else [],
+        }
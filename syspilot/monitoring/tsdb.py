@@ -0,0 +1,359 @@
+"""
+Memory-mapped time-series files
+
+Each metric is stored in its own fixed-size file: a small header followed by
+one float64 column per field (timestamp first). Like the in-memory history,
+every column holds the ring twice so the latest samples are contiguous. The
+daemon maps the files read-write and appends one row per tick, which only
+dirties a few pages in the page cache; the GUI and CLI map them read-only
+and read columns in place, and history survives restarts of either side.
+A layout change writes a new file and renames it over the old one, so
+existing read-only mappings stay valid; readers map the new file on their
+next read.
+
+Layout (little endian):
+    magic "SPTS", version u16, column count u16, capacity u32, padding,
+    samples written u64, then 32-byte column names, then the columns.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+from ..utils.logger import get_logger
+
+MAGIC = b"SPTS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI4xQ")
+COUNT_OFFSET = 16
+COUNT = struct.Struct("<Q")
+NAME_SIZE = 32
+VALUE_SIZE = 8
+FILE_SUFFIX = ".tsdb"
+
+DEFAULT_DIRECTORY = "~/.config/syspilot/history"
+
+
+def _layout_size(columns: int, capacity: int) -> int:
+    """Total file size for a layout"""
+    return HEADER.size + NAME_SIZE * columns + VALUE_SIZE * 2 * capacity * columns
+
+
+class TimeSeriesFile:
+    """One memory-mapped ring file"""
+
+    def __init__(
+        self, path: str, mapping: mmap.mmap, columns: Sequence[str], capacity: int
+    ):
+        """
+        Wrap a mapped file; use create() or open_readonly() instead
+
+        Args:
+            path: File path
+            mapping: Memory map of the whole file
+            columns: Column names including "timestamp"
+            capacity: Ring capacity in samples
+        """
+        self.path = path
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._mapping = mapping
+        # Identifies the mapped file once path has been replaced
+        self.inode = None
+        data_offset = HEADER.size + NAME_SIZE * len(self.columns)
+        column_bytes = VALUE_SIZE * 2 * capacity
+        view = memoryview(mapping)
+        self._views = [
+            view[offset : offset + column_bytes].cast("d")
+            for offset in range(
+                data_offset,
+                data_offset + column_bytes * len(self.columns),
+                column_bytes,
+            )
+        ]
+        view.release()
+
+    @classmethod
+    def create(cls, path: str, columns: Sequence[str], capacity: int):
+        """
+        Open a file for writing, keeping its samples if the layout matches
+
+        Args:
+            path: File path
+            columns: Metric column names (a "timestamp" column is added)
+            capacity: Ring capacity in samples
+
+        Returns:
+            Writable TimeSeriesFile
+        """
+        columns = ("timestamp",) + tuple(columns)
+        size = _layout_size(len(columns), capacity)
+
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CLOEXEC)
+        except FileNotFoundError:
+            fd = None
+        if fd is not None and cls._read_layout(fd) != (columns, capacity):
+            os.close(fd)
+            fd = None
+        if fd is None:
+            # New file or changed layout: start an empty ring
+            fd = cls._create_empty(path, columns, capacity)
+
+        try:
+            mapping = mmap.mmap(fd, size)
+            inode = os.fstat(fd).st_ino
+        finally:
+            os.close(fd)
+
+        ts_file = cls(path, mapping, columns, capacity)
+        ts_file.inode = inode
+        return ts_file
+
+    @staticmethod
+    def _create_empty(path: str, columns: Sequence[str], capacity: int) -> int:
+        """
+        Write an empty ring next to path and move it into place
+
+        Readers may still map the old file; truncating it in place would
+        kill them with SIGBUS, while replacing it leaves their mapping valid.
+
+        Returns:
+            Read-write descriptor of the new file
+        """
+        directory, filename = os.path.split(path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{filename}.", dir=directory or ".")
+        try:
+            os.fchmod(fd, 0o644)
+            os.ftruncate(fd, _layout_size(len(columns), capacity))
+            header = HEADER.pack(MAGIC, VERSION, len(columns), capacity, 0)
+            names = b"".join(
+                name.encode()[:NAME_SIZE].ljust(NAME_SIZE, b"\0") for name in columns
+            )
+            os.pwrite(fd, header + names, 0)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.close(fd)
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        return fd
+
+    @classmethod
+    def open_readonly(cls, path: str):
+        """
+        Map an existing file read-only
+
+        Returns:
+            TimeSeriesFile, or None if the file is missing or not valid
+        """
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            return None
+
+        try:
+            layout = cls._read_layout(fd)
+            if layout is None:
+                return None
+            columns, capacity = layout
+            mapping = mmap.mmap(
+                fd, _layout_size(len(columns), capacity), access=mmap.ACCESS_READ
+            )
+            inode = os.fstat(fd).st_ino
+        except (OSError, ValueError):
+            return None
+        finally:
+            os.close(fd)
+
+        ts_file = cls(path, mapping, columns, capacity)
+        ts_file.inode = inode
+        return ts_file
+
+    @staticmethod
+    def _read_layout(fd: int):
+        """Read (columns, capacity) from a file header, or None if invalid"""
+        header = os.pread(fd, HEADER.size, 0)
+        if len(header) < HEADER.size:
+            return None
+
+        magic, version, column_count, capacity, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or not column_count or not capacity:
+            return None
+        if os.fstat(fd).st_size < _layout_size(column_count, capacity):
+            return None
+
+        names = os.pread(fd, NAME_SIZE * column_count, HEADER.size)
+        columns = tuple(
+            names[i : i + NAME_SIZE].rstrip(b"\0").decode(errors="replace")
+            for i in range(0, len(names), NAME_SIZE)
+        )
+        return columns, capacity
+
+    def replaced(self) -> bool:
+        """Check whether path now names another file (a layout change)"""
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except OSError:
+            return True
+
+    @property
+    def written(self) -> int:
+        """Total number of samples ever appended"""
+        return COUNT.unpack_from(self._mapping, COUNT_OFFSET)[0]
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def append(self, timestamp: float, *values: float):
+        """
+        Append one sample (single writer)
+
+        The sample counter is updated after the values, so readers never see
+        a sample before it is complete.
+        """
+        written = self.written
+        index = written % self.capacity
+        mirror = index + self.capacity
+        for view, value in zip(self._views, (timestamp,) + values):
+            view[index] = view[mirror] = value
+        COUNT.pack_into(self._mapping, COUNT_OFFSET, written + 1)
+
+    def view(self, limit: Optional[int] = None) -> Dict:
+        """
+        Get the latest samples in place, oldest first
+
+        Args:
+            limit: Only return the most recent samples
+
+        Returns:
+            Dictionary mapping column names to zero-copy views
+        """
+        written = self.written
+        size = min(written, self.capacity)
+        count = size if limit is None else max(0, min(limit, size))
+        end = written % self.capacity + self.capacity
+        return {
+            name: view[end - count : end]
+            for name, view in zip(self.columns, self._views)
+        }
+
+    def flush(self):
+        """Write dirty pages back to disk"""
+        if not self._mapping.closed:
+            self._mapping.flush()
+
+    def close(self):
+        """Release the mapping"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        try:
+            self._mapping.close()
+        except BufferError:
+            # Views handed out by view() are still alive; the mapping is
+            # released when they are garbage collected
+            pass
+
+
+class TimeSeriesStore:
+    """Directory of per-metric time-series files"""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_DIRECTORY,
+        capacity: int = 86400,
+        readonly: bool = False,
+    ):
+        """
+        Initialize store
+
+        Args:
+            directory: Directory holding <metric>.tsdb files
+            capacity: Samples per file when creating files
+            readonly: Map files read-only (for the GUI and CLI)
+        """
+        self.directory = Path(directory).expanduser()
+        self.capacity = capacity
+        self.readonly = readonly
+        self.logger = get_logger(__name__)
+        self.files = {}
+
+        if not readonly:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, metric: str) -> str:
+        return str(self.directory / f"{metric}{FILE_SUFFIX}")
+
+    def append(
+        self, metric: str, columns: Sequence[str], timestamp: float, values: Iterable
+    ):
+        """
+        Append one sample to a metric file, creating it on first use
+
+        Args:
+            metric: Metric name
+            columns: Metric column names
+            timestamp: Epoch seconds
+            values: One value per column
+        """
+        ts_file = self.files.get(metric)
+        if ts_file is None:
+            ts_file = self.files[metric] = TimeSeriesFile.create(
+                self._path(metric), columns, self.capacity
+            )
+        ts_file.append(timestamp, *values)
+
+    def read(self, metric: str, limit: Optional[int] = None) -> Dict:
+        """
+        Read a metric's latest samples
+
+        Args:
+            metric: Metric name
+            limit: Only return the most recent samples
+
+        Returns:
+            Dictionary of column views, or an empty dict if there is no file
+        """
+        ts_file = self.files.get(metric)
+        if ts_file is not None and self.readonly and ts_file.replaced():
+            # The daemon started a new ring; map the new file
+            self.files.pop(metric).close()
+            ts_file = None
+        if ts_file is None:
+            if not self.readonly:
+                return {}
+            ts_file = TimeSeriesFile.open_readonly(self._path(metric))
+            if ts_file is None:
+                return {}
+            self.files[metric] = ts_file
+        return ts_file.view(limit)
+
+    def metrics(self):
+        """List metrics with a file in the store"""
+        try:
+            return sorted(
+                name[: -len(FILE_SUFFIX)]
+                for name in os.listdir(self.directory)
+                if name.endswith(FILE_SUFFIX)
+            )
+        except OSError:
+            return []
+
+    def flush(self):
+        """Write dirty pages of all files back to disk"""
+        for ts_file in self.files.values():
+            ts_file.flush()
+
+    def close(self):
+        """Flush and release all files"""
+        if not self.readonly:
+            self.flush()
+        for ts_file in self.files.values():
+            ts_file.close()
+        self.files = {}
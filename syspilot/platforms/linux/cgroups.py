@@ -0,0 +1,164 @@
+"""
+cgroup v2 resource accounting per systemd unit
+
+systemd gives every service and scope its own cgroup, and the kernel keeps
+CPU, memory and I/O accounting for it. Reading four small files per unit
+answers "which service is using this host" directly, at a fraction of the
+cost of scanning every process. Units are discovered by walking the
+unified hierarchy once and again every rescan interval, or as soon as a
+unit disappears.
+"""
+
+import os
+import time
+from typing import Dict, NamedTuple
+
+from ...utils.logger import get_logger
+
+# cgroup directories accounted as one unit; slices are only descended into
+UNIT_SUFFIXES = (".service", ".scope")
+
+# Deepest slice nesting walked during discovery
+MAX_DEPTH = 6
+
+
+class UnitCounters(NamedTuple):
+    """Accounting values of one unit"""
+
+    cpu_usec: int  # cumulative
+    memory: int  # bytes currently charged
+    io_read: int  # cumulative bytes
+    io_write: int  # cumulative bytes
+    memory_pressure: float  # "some" avg10 percentage
+
+
+def _read(path: str, required: bool = True) -> bytes:
+    """Read a small cgroup file; optional files read as empty when missing"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        if required:
+            raise
+        return b""
+
+
+def _parse_cpu_usec(data: bytes) -> int:
+    """usage_usec from cpu.stat"""
+    for line in data.splitlines():
+        if line.startswith(b"usage_usec "):
+            return int(line.split()[1])
+    return 0
+
+
+def _parse_io(data: bytes):
+    """Read and written bytes summed over the devices in io.stat"""
+    read = write = 0
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b"=")
+            if key == b"rbytes":
+                read += int(value)
+            elif key == b"wbytes":
+                write += int(value)
+    return read, write
+
+
+def _parse_pressure(data: bytes) -> float:
+    """The "some" avg10 value of a pressure file"""
+    for line in data.splitlines():
+        if line.startswith(b"some "):
+            for field in line.split()[1:]:
+                if field.startswith(b"avg10="):
+                    return float(field[6:])
+    return 0.0
+
+
+class CgroupUnits:
+    """Read resource accounting of systemd units from cgroup v2"""
+
+    def __init__(self, root: str = "/sys/fs/cgroup", rescan_interval: float = 30.0):
+        """
+        Initialize and discover units
+
+        Args:
+            root: Mount point of the unified hierarchy
+            rescan_interval: Seconds between walks for new units
+        """
+        self.logger = get_logger(__name__)
+        self.root = root
+        self.rescan_interval = rescan_interval
+
+        self.units = {}  # unit name -> cgroup directory
+        self._last_scan = 0.0
+
+        self.discover()
+
+    @classmethod
+    def open(cls, root: str = "/sys/fs/cgroup"):
+        """
+        Create a reader, or return None without a cgroup v2 hierarchy
+
+        Returns:
+            CgroupUnits instance or None (cgroup v1 and non-Linux systems)
+        """
+        if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return None
+        return cls(root)
+
+    def discover(self):
+        """Walk the hierarchy for service and scope cgroups"""
+        units = {}
+        pending = [(self.root, 0)]
+        while pending:
+            path, depth = pending.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if entry.name.endswith(UNIT_SUFFIXES):
+                    units[entry.name] = entry.path
+                elif entry.name.endswith(".slice") and depth < MAX_DEPTH:
+                    pending.append((entry.path, depth + 1))
+
+        self.units = units
+        self._last_scan = time.monotonic()
+
+    def read(self) -> Dict[str, UnitCounters]:
+        """
+        Read the counters of every unit
+
+        Returns:
+            Dictionary mapping unit names to UnitCounters
+        """
+        if time.monotonic() - self._last_scan >= self.rescan_interval:
+            self.discover()
+
+        counters = {}
+        gone = False
+        for name, path in self.units.items():
+            try:
+                # cpu.stat always exists; the others need their controller
+                cpu_usec = _parse_cpu_usec(_read(f"{path}/cpu.stat"))
+                memory = _read(f"{path}/memory.current", required=False)
+                io_read, io_write = _parse_io(_read(f"{path}/io.stat", required=False))
+                pressure = _read(f"{path}/memory.pressure", required=False)
+                counters[name] = UnitCounters(
+                    cpu_usec,
+                    int(memory or 0),
+                    io_read,
+                    io_write,
+                    _parse_pressure(pressure),
+                )
+            except FileNotFoundError:
+                # Unit stopped; rediscover on the next read
+                gone = True
+            except (OSError, ValueError) as e:
+                self.logger.debug(f"Cannot read cgroup {path}: {e}")
+
+        if gone:
+            self._last_scan = 0.0
+        return counters
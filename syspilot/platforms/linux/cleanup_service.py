@@ -11,8 +11,12 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Callable, Dict, List, Optional
 
+from ...monitoring.pressure import BusySignal
+from ...services.log_compactor import LogCompactor, is_within_directory
+from ...services.thumbnail_cleaner import ThumbnailCleaner
 from ...utils.config import ConfigManager
 from ...utils.logger import get_logger
+from ...utils.priority import run_at_idle_priority
 
 
 class CleanupService:
@@ -33,6 +37,18 @@ class CleanupService:
             "space_freed": 0,
             "errors": [],
         }
+        # Validated by ThumbnailCleaner, never age-swept
+        self.thumbnail_dir = os.path.expanduser("~/.cache/thumbnails")
+
+        # Pause while CPU, memory or I/O pressure is high (Linux PSI)
+        throttle = {}
+        if config is not None:
+            throttle = config.get("cleanup", "pressure_throttle", {})
+        self.busy_signal = None
+        if throttle.get("enabled", True):
+            self.busy_signal = BusySignal.open(throttle.get("thresholds"))
+        self.max_throttle_wait = throttle.get("max_wait", 300)
+        self._throttle_deadline = None
 
     def full_cleanup(
         self,
@@ -50,6 +66,7 @@ class CleanupService:
             Dictionary with cleanup results
         """
         start_time = time.time()
+        self._throttle_deadline = time.monotonic() + self.max_throttle_wait
         self.stats = {
             "files_cleaned": 0,
             "directories_cleaned": 0,
@@ -74,6 +91,7 @@ class CleanupService:
             total_tasks = len(cleanup_tasks)
 
             for i, (task_name, task_func) in enumerate(cleanup_tasks):
+                self._throttle(status_callback)
                 if status_callback:
                     status_callback(task_name)
 
@@ -149,6 +167,9 @@ class CleanupService:
 
     def _clean_log_files(self):
         """Clean log files"""
+        log_dirs = self.config.get_log_dirs()
+        self._compact_log_dirs(log_dirs)
+
         log_patterns = self.config.get_log_files()
         max_age_days = self.config.get_max_age_days()
 
@@ -156,6 +177,11 @@ class CleanupService:
             try:
                 files = glob.glob(pattern)
                 for file_path in files:
+                    # Files in compacted directories are handled by the engine
+                    if any(
+                        is_within_directory(file_path, log_dir) for log_dir in log_dirs
+                    ):
+                        continue
                     if self._is_file_old(file_path, max_age_days):
                         self._remove_file(file_path)
             except Exception as e:
@@ -163,6 +189,32 @@ class CleanupService:
                     f"Error cleaning log files with pattern {pattern}: {e}"
                 )
 
+    def _compact_log_dirs(self, log_dirs: List[str]):
+        """Compress rotated logs, enforce log budgets and vacuum the journal"""
+        mb = 1024 * 1024
+        compactor = LogCompactor(
+            log_dirs,
+            dir_budget_bytes=self.config.get("cleanup", "log_dir_budget_mb", 256) * mb,
+            compress_delay_days=self.config.get(
+                "cleanup", "log_compress_delay_days", 1
+            ),
+            journal_dir=self.config.get("cleanup", "journal_dir", "/var/log/journal"),
+            journal_max_bytes=self.config.get("cleanup", "journal_max_size_mb", 512)
+            * mb,
+            journal_max_age_days=self.config.get("cleanup", "journal_max_age_days", 30),
+        )
+
+        result = run_at_idle_priority(compactor.run)
+
+        self.stats["files_cleaned"] += result["deleted"]
+        self.stats["space_freed"] += result["bytes_freed"]
+        self.stats["errors"].extend(result["errors"])
+        self.logger.info(
+            f"Log compaction: {result['compressed']} compressed, "
+            f"{result['deleted']} removed, "
+            f"{self._format_bytes(result['bytes_freed'])} freed"
+        )
+
     def _clean_package_cache(self):
         """Clean package cache"""
         try:
@@ -227,7 +279,6 @@ class CleanupService:
             "/var/cache/fontconfig",
             "/var/cache/man",
             os.path.expanduser("~/.cache/fontconfig"),
-            os.path.expanduser("~/.cache/thumbnails"),
         ]
 
         for cache_dir in system_cache_dirs:
@@ -235,6 +286,22 @@ class CleanupService:
                 self.logger.debug(f"Cleaning system cache: {cache_dir}")
                 self._clean_directory(cache_dir, 30, [])
 
+        self._clean_thumbnails()
+
+    def _clean_thumbnails(self):
+        """Remove thumbnails whose source file no longer exists"""
+        if not os.path.exists(self.thumbnail_dir):
+            return
+
+        self.logger.debug(f"Validating thumbnails: {self.thumbnail_dir}")
+        result = ThumbnailCleaner(self.thumbnail_dir).run()
+
+        self.stats["files_cleaned"] += result["removed"]
+        self.stats["space_freed"] += result["bytes_freed"]
+        self.logger.info(
+            f"Thumbnails: {result['checked']} checked, {result['removed']} removed"
+        )
+
     def _clean_directory(
         self, directory: str, max_age_days: int, exclude_patterns: List[str]
     ):
@@ -250,9 +317,15 @@ class CleanupService:
             if not os.path.exists(directory):
                 return
 
+            if is_within_directory(directory, self.thumbnail_dir):
+                return
+
             cutoff_date = datetime.now() - timedelta(days=max_age_days)
 
             for root, dirs, files in os.walk(directory):
+                self._prune_managed_dirs(root, dirs)
+                self._throttle()
+
                 # Clean files
                 for file in files:
                     file_path = os.path.join(root, file)
@@ -278,6 +351,53 @@ class CleanupService:
         except Exception as e:
             self.logger.error(f"Error cleaning directory {directory}: {e}")
 
+    def wait_for_idle(
+        self,
+        timeout: float,
+        stop_event=None,
+        status_callback: Optional[Callable[[str], None]] = None,
+    ) -> bool:
+        """
+        Wait until CPU, memory and I/O pressure are below their thresholds
+
+        Args:
+            timeout: Most seconds to wait
+            stop_event: threading.Event that ends the wait early
+            status_callback: Status update callback
+
+        Returns:
+            True if the system is idle (or pressure is unknown), False if it
+            was still busy when the wait ended
+        """
+        if self.busy_signal is None:
+            return True
+
+        busy = self.busy_signal.busy_resources()
+        if not busy:
+            return True
+
+        pressure = ", ".join(f"{name} {value:.0f}%" for name, value in busy.items())
+        self.logger.info(f"System busy ({pressure}), waiting up to {timeout:.0f}s")
+        if status_callback:
+            status_callback("Waiting for the system to become idle")
+
+        idle = self.busy_signal.wait_until_idle(timeout, stop_event=stop_event)
+        if not idle:
+            self.logger.info("System still busy, continuing")
+        return idle
+
+    def _throttle(self, status_callback: Optional[Callable[[str], None]] = None):
+        """Pause while the system is busy, within the wait budget of the run"""
+        if self.busy_signal is None or self._throttle_deadline is None:
+            return
+        remaining = self._throttle_deadline - time.monotonic()
+        if remaining > 0:
+            self.wait_for_idle(remaining, status_callback=status_callback)
+
+    def _prune_managed_dirs(self, root: str, dirs: List[str]):
+        """Stop os.walk from descending into directories with their own cleaner"""
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != self.thumbnail_dir]
+
     def _should_exclude(self, filename: str, exclude_patterns: List[str]) -> bool:
         """Check if file should be excluded based on patterns"""
         for pattern in exclude_patterns:
@@ -397,8 +517,13 @@ class CleanupService:
         """Get list of files that would be cleaned"""
         files_to_clean = []
 
+        if is_within_directory(directory, self.thumbnail_dir):
+            return files_to_clean
+
         try:
             for root, dirs, files in os.walk(directory):
+                self._prune_managed_dirs(root, dirs)
+
                 for file in files:
                     file_path = os.path.join(root, file)
 
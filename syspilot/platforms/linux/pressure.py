@@ -0,0 +1,107 @@
+"""
+Pressure Stall Information (PSI)
+
+/proc/pressure/{cpu,memory,io} report the share of time tasks were stalled
+waiting for a resource: "some" when at least one task waited, "full" when
+all non-idle tasks did at once. Unlike utilization, stall time measures
+saturation directly. The files are kept open and re-read in place like the
+other /proc fast-path readers.
+"""
+
+import os
+import re
+from typing import Dict, NamedTuple
+
+from ...utils.logger import get_logger
+from .procfs import ProcFile
+
+RESOURCES = ("cpu", "memory", "io")
+
+PRESSURE_PATTERN = re.compile(
+    rb"^(some|full) avg10=([\d.]+) avg60=([\d.]+) avg300=([\d.]+) total=(\d+)", re.M
+)
+
+
+class PressureStall(NamedTuple):
+    """Stall averages (percent) and cumulative stall time (µs) of a resource"""
+
+    some_avg10: float
+    some_avg60: float
+    some_avg300: float
+    some_total: int
+    full_avg10: float = 0.0
+    full_avg60: float = 0.0
+    full_avg300: float = 0.0
+    full_total: int = 0
+
+
+def _parse(data: memoryview) -> PressureStall:
+    """Parse the "some" and "full" lines of a pressure file"""
+    values = {}
+    for kind, avg10, avg60, avg300, total in PRESSURE_PATTERN.findall(data):
+        values[kind] = (float(avg10), float(avg60), float(avg300), int(total))
+    # Kernels before 5.13 have no "full" line for cpu
+    return PressureStall(*values[b"some"], *values.get(b"full", ()))
+
+
+class PressureReader:
+    """Read /proc/pressure through persistent handles"""
+
+    def __init__(self, proc_root: str = "/proc"):
+        """
+        Open the pressure files the kernel provides
+
+        Args:
+            proc_root: procfs mount point
+        """
+        self.logger = get_logger(__name__)
+        self.files = {}
+        for resource in RESOURCES:
+            try:
+                self.files[resource] = ProcFile(
+                    os.path.join(proc_root, "pressure", resource), 256
+                )
+            except OSError as e:
+                self.logger.debug(f"No pressure information for {resource}: {e}")
+
+    @classmethod
+    def open(cls, proc_root: str = "/proc"):
+        """
+        Open a reader, or return None when the kernel has no PSI
+
+        Returns:
+            PressureReader instance or None (kernels without CONFIG_PSI, or
+            booted with psi=0)
+        """
+        if not hasattr(os, "preadv"):
+            return None
+
+        reader = cls(proc_root)
+        if not reader.files:
+            return None
+        try:
+            reader.read()
+        except (OSError, KeyError) as e:
+            # psi=0 leaves the files in place but fails every read
+            reader.logger.debug(f"Pressure information unavailable: {e}")
+            reader.close()
+            return None
+        return reader
+
+    def read(self) -> Dict[str, PressureStall]:
+        """
+        Read the pressure of every resource
+
+        Returns:
+            Dictionary mapping cpu, memory and io to PressureStall
+        """
+        return {
+            resource: proc_file.parse(_parse)
+            for resource, proc_file in self.files.items()
+        }
+
+    def close(self):
+        """Close all file handles"""
+        for proc_file in self.files.values():
+            proc_file.close()
+        self.files = {}
@@ -0,0 +1,297 @@
+"""
+Incremental Linux process table
+
+Keeps a PID-keyed cache of compact process records between ticks. Each
+update re-reads /proc/<pid>/stat once per process and derives CPU usage from
+the delta against the previous reading, so a process does not need to be
+seen twice through psutil before it reports a meaningful value. Exited PIDs
+drop out of the table on the next scan.
+"""
+
+import heapq
+import os
+import pwd
+import time
+from operator import attrgetter
+from typing import Dict, List, Optional, Set
+
+# Fields after the ")" closing the command name in /proc/<pid>/stat
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_NUM_THREADS = 17
+STAT_STARTTIME = 19
+STAT_RSS = 21
+
+# Socket tables counted as connections, like psutil's kind="inet"
+INET_SOCKET_TABLES = ("tcp", "tcp6", "udp", "udp6")
+
+
+class ProcessRecord:
+    """Cached state of one process"""
+
+    __slots__ = (
+        "pid",
+        "start_time",
+        "name",
+        "uid",
+        "username",
+        "cpu_time",
+        "cpu_percent",
+        "rss",
+        "memory_percent",
+        "num_threads",
+    )
+
+    def __init__(self, pid: int, start_time: int, name: str, uid: int, username: str):
+        """
+        Initialize record
+
+        Args:
+            pid: Process ID
+            start_time: Start time in clock ticks since boot (detects PID reuse)
+            name: Command name
+            uid: Real user ID
+            username: User name for uid
+        """
+        self.pid = pid
+        self.start_time = start_time
+        self.name = name
+        self.uid = uid
+        self.username = username
+        self.cpu_time = 0
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.memory_percent = 0.0
+        self.num_threads = 0
+
+    def to_dict(self) -> Dict:
+        """Process information in the shape used by the stats dictionary"""
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "cpu_percent": self.cpu_percent,
+            "memory_percent": self.memory_percent,
+            "username": self.username,
+        }
+
+
+class ProcessTable:
+    """PID-keyed process cache updated incrementally from /proc"""
+
+    def __init__(self, proc_root: str = "/proc"):
+        """
+        Initialize process table
+
+        Args:
+            proc_root: procfs mount point
+        """
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.total_memory = os.sysconf("SC_PHYS_PAGES") * self.page_size
+        self.records = {}
+        self.last_update = None
+        self._usernames = {}
+
+    @classmethod
+    def open(cls, proc_root: str = "/proc"):
+        """
+        Create a process table, or return None when /proc is unavailable
+
+        Returns:
+            ProcessTable instance or None (callers fall back to psutil)
+        """
+        if not os.path.exists(os.path.join(proc_root, "self", "stat")):
+            return None
+        return cls(proc_root)
+
+    def update(self, now: Optional[float] = None):
+        """
+        Re-scan /proc and refresh every record
+
+        Args:
+            now: Monotonic time of the scan (defaults to time.monotonic())
+        """
+        if now is None:
+            now = time.monotonic()
+
+        elapsed = now - self.last_update if self.last_update is not None else None
+        uptime = self._read_uptime()
+        ticks = self.clock_ticks
+        previous = self.records
+        records = {}
+
+        with os.scandir(self.proc_root) as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+
+                pid = int(entry.name)
+                fields = self._read_stat(pid)
+                if fields is None:
+                    continue
+
+                name, values = fields
+                start_time = int(values[STAT_STARTTIME])
+                cpu_time = int(values[STAT_UTIME]) + int(values[STAT_STIME])
+
+                record = previous.get(pid)
+                if record is not None and record.start_time == start_time and elapsed:
+                    record.cpu_percent = round(
+                        (cpu_time - record.cpu_time) / ticks / elapsed * 100, 1
+                    )
+                else:
+                    # New process (or reused PID): estimate from its lifetime
+                    if record is None or record.start_time != start_time:
+                        record = self._new_record(pid, start_time, name)
+                        if record is None:
+                            continue
+                    lifetime = uptime - start_time / ticks if uptime else 0
+                    record.cpu_percent = (
+                        round(cpu_time / ticks / lifetime * 100, 1)
+                        if lifetime > 0
+                        else 0.0
+                    )
+
+                record.name = name
+                record.cpu_time = cpu_time
+                record.rss = int(values[STAT_RSS]) * self.page_size
+                record.memory_percent = (
+                    record.rss / self.total_memory * 100 if self.total_memory else 0.0
+                )
+                record.num_threads = int(values[STAT_NUM_THREADS])
+                records[pid] = record
+
+        # PIDs missing from this scan have exited
+        self.records = records
+        self.last_update = now
+
+    def top(self, limit: int = 10, key: str = "cpu_percent") -> List[ProcessRecord]:
+        """
+        Get the top processes without sorting the whole table
+
+        Args:
+            limit: Maximum number of records to return
+            key: Record attribute to rank by
+
+        Returns:
+            Records in descending order of key
+        """
+        return heapq.nlargest(limit, self.records.values(), key=attrgetter(key))
+
+    def read_io(self, pid: int) -> Optional[int]:
+        """
+        Read the bytes a process read from and wrote to storage
+
+        Returns:
+            read_bytes + write_bytes from /proc/<pid>/io, or None when the
+            process has exited or belongs to another user
+        """
+        try:
+            with open(f"{self.proc_root}/{pid}/io", "rb") as f:
+                total = 0
+                for line in f:
+                    if line.startswith((b"read_bytes:", b"write_bytes:")):
+                        total += int(line.split()[1])
+                return total
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def socket_inodes(self) -> Set[int]:
+        """
+        Read the inodes of all TCP and UDP sockets
+
+        One pass over /proc/net/{tcp,tcp6,udp,udp6}; with count_sockets()
+        this maps sockets to processes without a scan per process.
+        """
+        inodes = set()
+        for table in INET_SOCKET_TABLES:
+            try:
+                with open(f"{self.proc_root}/net/{table}", "rb") as f:
+                    next(f, None)  # header
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) > 9:
+                            inodes.add(int(fields[9]))
+            except (OSError, ValueError):
+                continue
+        return inodes
+
+    def count_sockets(self, pid: int, inodes: Set[int]) -> Optional[int]:
+        """
+        Count the open file descriptors of a process that are sockets in inodes
+
+        Returns:
+            Number of sockets, or None when the descriptors cannot be read
+        """
+        count = 0
+        try:
+            with os.scandir(f"{self.proc_root}/{pid}/fd") as entries:
+                for entry in entries:
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    if target.startswith("socket:[") and int(target[8:-1]) in inodes:
+                        count += 1
+        except OSError:
+            return None
+        return count
+
+    def _read_stat(self, pid: int):
+        """
+        Read and split /proc/<pid>/stat
+
+        Returns:
+            Tuple of (command name, fields after the name) or None if the
+            process has exited
+        """
+        try:
+            fd = os.open(f"{self.proc_root}/{pid}/stat", os.O_RDONLY | os.O_CLOEXEC)
+            try:
+                data = os.read(fd, 4096)
+            finally:
+                os.close(fd)
+        except OSError:
+            return None
+
+        # The command name may itself contain spaces or parentheses
+        start = data.find(b"(")
+        end = data.rfind(b")")
+        if start < 0 or end < 0:
+            return None
+
+        name = data[start + 1 : end].decode(errors="replace")
+        values = data[end + 2 :].split()
+        if len(values) <= STAT_RSS:
+            return None
+        return name, values
+
+    def _new_record(
+        self, pid: int, start_time: int, name: str
+    ) -> Optional[ProcessRecord]:
+        """Create a record, looking up the owner once per process"""
+        try:
+            uid = os.stat(f"{self.proc_root}/{pid}").st_uid
+        except OSError:
+            return None
+        return ProcessRecord(pid, start_time, name, uid, self._username(uid))
+
+    def _username(self, uid: int) -> str:
+        """Resolve (and cache) a user name"""
+        username = self._usernames.get(uid)
+        if username is None:
+            try:
+                username = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                username = str(uid)
+            self._usernames[uid] = username
+        return username
+
+    def _read_uptime(self) -> float:
+        """Read system uptime in seconds"""
+        try:
+            with open(os.path.join(self.proc_root, "uptime"), "rb") as f:
+                return float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return 0.0
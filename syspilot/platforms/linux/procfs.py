@@ -0,0 +1,352 @@
+"""
+Linux /proc fast-path readers
+
+The monitoring collectors read the same few /proc files on every tick.
+Instead of opening, reading and parsing them through psutil each time, the
+files are kept open and re-read with a positional read into a reusable
+buffer, then parsed with precompiled byte-level patterns.
+"""
+
+import os
+import re
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TypeVar, Union
+
+from ...utils.logger import get_logger
+
+T = TypeVar("T")
+
+DISK_SECTOR_SIZE = 512
+
+# First eight fields of "cpuN" lines: user nice system idle iowait irq softirq steal
+STAT_CPU_PATTERN = re.compile(
+    rb"^cpu(\d+) +(\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+)", re.M
+)
+MEMINFO_PATTERN = re.compile(rb"^([\w()]+): +(\d+)", re.M)
+# major minor name reads merged sectors ms writes merged sectors ms inflight io_ms
+DISKSTATS_PATTERN = re.compile(
+    rb"^ *\d+ +\d+ (\S+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+) (\d+)",
+    re.M,
+)
+# iface: rx bytes packets errs drop fifo frame compressed multicast, tx bytes ...
+NET_DEV_PATTERN = re.compile(
+    rb"^ *([^:\s]+): *(\d+) +(\d+) +(\d+) +(\d+) +\d+ +\d+ +\d+ +\d+"
+    rb" +(\d+) +(\d+) +(\d+) +(\d+)",
+    re.M,
+)
+
+
+class VirtualMemory(NamedTuple):
+    """Memory statistics, field-compatible with psutil.virtual_memory()"""
+
+    total: int
+    available: int
+    percent: float
+    used: int
+    free: int
+    buffers: int
+    cached: int
+    shared: int
+
+
+class SwapMemory(NamedTuple):
+    """Swap statistics, field-compatible with psutil.swap_memory()"""
+
+    total: int
+    used: int
+    free: int
+    percent: float
+
+
+class DiskIOCounters(NamedTuple):
+    """Block device counters, field-compatible with psutil.disk_io_counters()"""
+
+    read_count: int
+    write_count: int
+    read_bytes: int
+    write_bytes: int
+    read_time: int
+    write_time: int
+    read_merged_count: int
+    write_merged_count: int
+    busy_time: int
+
+
+class NetIOCounters(NamedTuple):
+    """Interface counters, field-compatible with psutil.net_io_counters()"""
+
+    bytes_sent: int
+    bytes_recv: int
+    packets_sent: int
+    packets_recv: int
+    errin: int
+    errout: int
+    dropin: int
+    dropout: int
+
+
+def _percent(used: int, total: int) -> float:
+    """Usage percentage rounded like psutil"""
+    return round(used / total * 100, 1) if total > 0 else 0.0
+
+
+def _sum_counters(rows: List[T], factory: Callable[..., T]) -> T:
+    """Element-wise sum of counter tuples"""
+    if not rows:
+        return factory(*([0] * len(factory._fields)))
+    return factory(*map(sum, zip(*rows)))
+
+
+class ProcFile:
+    """A /proc file kept open and re-read in place"""
+
+    def __init__(self, path: str, buffer_size: int = 8192):
+        """
+        Open a /proc file
+
+        Args:
+            path: File path
+            buffer_size: Initial read buffer size; grown as needed
+        """
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self.buffer = bytearray(buffer_size)
+        self.lock = threading.Lock()
+
+    def parse(self, parser: Callable[[memoryview], T]) -> T:
+        """
+        Re-read the file from offset 0 and parse it
+
+        The parser receives a view of the shared buffer, so it must not keep
+        a reference to it after returning.
+        """
+        with self.lock:
+            while True:
+                size = os.preadv(self.fd, [self.buffer], 0)
+                if size < len(self.buffer):
+                    break
+                # Content may have been truncated: grow and read again
+                self.buffer = bytearray(len(self.buffer) * 2)
+
+            view = memoryview(self.buffer)[:size]
+            try:
+                return parser(view)
+            finally:
+                view.release()
+
+    def close(self):
+        """Close the file descriptor"""
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ProcfsReader:
+    """Persistent-handle readers for /proc/stat, meminfo, diskstats and net/dev"""
+
+    def __init__(self, proc_root: str = "/proc", sys_block: str = "/sys/block"):
+        """
+        Open the /proc files used by the monitoring collectors
+
+        Args:
+            proc_root: procfs mount point
+            sys_block: sysfs block device directory
+
+        Raises:
+            OSError: If any of the files cannot be opened
+        """
+        self.logger = get_logger(__name__)
+        self.sys_block = sys_block
+        self.clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._disk_names = {}
+
+        self.files = {}
+        try:
+            for name in ("stat", "meminfo", "diskstats", "net/dev"):
+                self.files[name] = ProcFile(os.path.join(proc_root, name))
+        except OSError:
+            self.close()
+            raise
+
+    @classmethod
+    def open(cls, proc_root: str = "/proc", sys_block: str = "/sys/block"):
+        """
+        Open a reader, or return None when the fast path is unavailable
+
+        Returns:
+            ProcfsReader instance or None (callers fall back to psutil)
+        """
+        if not hasattr(os, "preadv"):
+            return None
+
+        try:
+            return cls(proc_root, sys_block)
+        except OSError as e:
+            get_logger(__name__).debug(f"procfs fast path unavailable: {e}")
+            return None
+
+    def close(self):
+        """Close all file handles"""
+        for proc_file in self.files.values():
+            proc_file.close()
+        self.files = {}
+
+    def cpu_times(self) -> List[Tuple[float, ...]]:
+        """
+        Read per-CPU times in seconds
+
+        Returns:
+            One tuple per CPU ordered user, nice, system, idle, iowait, irq,
+            softirq, steal
+        """
+        ticks = self.clock_ticks
+        return self.files["stat"].parse(
+            lambda data: [
+                tuple(int(value) / ticks for value in match[1:])
+                for match in STAT_CPU_PATTERN.findall(data)
+            ]
+        )
+
+    def memory(self) -> Tuple[VirtualMemory, SwapMemory]:
+        """
+        Read memory and swap statistics from a single /proc/meminfo read
+
+        Returns:
+            Tuple of (virtual memory, swap memory)
+        """
+        mems = self.files["meminfo"].parse(
+            lambda data: {
+                key: int(value) * 1024 for key, value in MEMINFO_PATTERN.findall(data)
+            }
+        )
+
+        total = mems.get(b"MemTotal", 0)
+        free = mems.get(b"MemFree", 0)
+        cached = mems.get(b"Cached", 0) + mems.get(b"SReclaimable", 0)
+        available = mems.get(b"MemAvailable", free)
+        if available > total:
+            available = free
+        used = total - available
+
+        virtual = VirtualMemory(
+            total=total,
+            available=available,
+            percent=_percent(used, total),
+            used=used,
+            free=free,
+            buffers=mems.get(b"Buffers", 0),
+            cached=cached,
+            shared=mems.get(b"Shmem", 0),
+        )
+
+        swap_total = mems.get(b"SwapTotal", 0)
+        swap_free = mems.get(b"SwapFree", 0)
+        swap_used = swap_total - swap_free
+        swap = SwapMemory(
+            total=swap_total,
+            used=swap_used,
+            free=swap_free,
+            percent=_percent(swap_used, swap_total),
+        )
+
+        return virtual, swap
+
+    def disk_io_counters(
+        self, perdisk: bool = False
+    ) -> Union[DiskIOCounters, Dict[str, DiskIOCounters]]:
+        """
+        Read block device counters
+
+        Args:
+            perdisk: Return a dict per device instead of the total
+
+        Returns:
+            Totals over whole disks (partitions are excluded to avoid double
+            counting), or counters per device
+        """
+        devices = self.files["diskstats"].parse(
+            lambda data: {
+                name.decode(): DiskIOCounters(
+                    read_count=int(reads),
+                    write_count=int(writes),
+                    read_bytes=int(rsect) * DISK_SECTOR_SIZE,
+                    write_bytes=int(wsect) * DISK_SECTOR_SIZE,
+                    read_time=int(rtime),
+                    write_time=int(wtime),
+                    read_merged_count=int(rmerged),
+                    write_merged_count=int(wmerged),
+                    busy_time=int(busy),
+                )
+                for (
+                    name,
+                    reads,
+                    rmerged,
+                    rsect,
+                    rtime,
+                    writes,
+                    wmerged,
+                    wsect,
+                    wtime,
+                    _inflight,
+                    busy,
+                ) in DISKSTATS_PATTERN.findall(data)
+            }
+        )
+
+        if perdisk:
+            return devices
+
+        return _sum_counters(
+            [c for name, c in devices.items() if self.is_disk(name)], DiskIOCounters
+        )
+
+    def net_io_counters(
+        self, pernic: bool = False
+    ) -> Union[NetIOCounters, Dict[str, NetIOCounters]]:
+        """
+        Read network interface counters
+
+        Args:
+            pernic: Return a dict per interface instead of the total
+
+        Returns:
+            Totals over all interfaces, or counters per interface
+        """
+        interfaces = self.files["net/dev"].parse(
+            lambda data: {
+                name.decode(): NetIOCounters(
+                    bytes_sent=int(tx_bytes),
+                    bytes_recv=int(rx_bytes),
+                    packets_sent=int(tx_packets),
+                    packets_recv=int(rx_packets),
+                    errin=int(rx_errs),
+                    errout=int(tx_errs),
+                    dropin=int(rx_drop),
+                    dropout=int(tx_drop),
+                )
+                for (
+                    name,
+                    rx_bytes,
+                    rx_packets,
+                    rx_errs,
+                    rx_drop,
+                    tx_bytes,
+                    tx_packets,
+                    tx_errs,
+                    tx_drop,
+                ) in NET_DEV_PATTERN.findall(data)
+            }
+        )
+
+        if pernic:
+            return interfaces
+
+        return _sum_counters(list(interfaces.values()), NetIOCounters)
+
+    def is_disk(self, name: str) -> bool:
+        """Check (and cache) whether a device is a whole disk, not a partition"""
+        is_disk = self._disk_names.get(name)
+        if is_disk is None:
+            path = os.path.join(self.sys_block, name.replace("/", "!"))
+            is_disk = self._disk_names[name] = os.path.exists(path)
+        return is_disk
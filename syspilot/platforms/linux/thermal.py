@@ -0,0 +1,259 @@
+"""
+Linux temperature sensor discovery
+
+psutil.sensors_temperatures() walks every hwmon device and reads all of its
+sysfs attributes on each call. Here the sensors are discovered once, the
+best CPU source is resolved to one input file per socket, and those files
+are kept open so a tick costs a single pread per socket. Discovery runs
+again when a read fails or the set of hwmon devices changes.
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from ...utils.logger import get_logger
+
+TEMP_INPUT_PATTERN = re.compile(r"^temp(\d+)_input$")
+
+# hwmon drivers that report CPU temperatures, best first
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "cpu-thermal")
+
+# Preferred labels per driver: the package sensor (one hwmon device per
+# socket) for Intel, the control temperature for AMD
+CPU_LABELS = {
+    "coretemp": ("Package id",),
+    "k10temp": ("Tctl", "Tdie"),
+    "zenpower": ("Tdie", "Tctl"),
+}
+
+# Thermal zone types that describe the CPU, used when no hwmon CPU chip exists
+CPU_ZONE_TYPES = ("x86_pkg_temp", "cpu-thermal", "cpu_thermal", "soc_thermal")
+
+
+class Sensor(NamedTuple):
+    """A temperature input file"""
+
+    chip: str
+    label: str
+    path: str
+
+
+def _read_text(path: str) -> Optional[str]:
+    """Read a short sysfs attribute"""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_celsius(path: str) -> Optional[float]:
+    """Read a millidegree sysfs temperature"""
+    value = _read_text(path)
+    try:
+        return int(value) / 1000.0 if value is not None else None
+    except ValueError:
+        return None
+
+
+def _natural_key(name: str):
+    """Sort hwmon10 after hwmon9"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+class ThermalSensors:
+    """Temperature sensors resolved once and read through open handles"""
+
+    def __init__(
+        self,
+        hwmon_root: str = "/sys/class/hwmon",
+        thermal_root: str = "/sys/class/thermal",
+        rescan_interval: float = 60.0,
+    ):
+        """
+        Initialize and discover sensors
+
+        Args:
+            hwmon_root: hwmon class directory
+            thermal_root: thermal class directory
+            rescan_interval: Seconds between checks for added or removed
+                hwmon devices
+        """
+        self.logger = get_logger(__name__)
+        self.hwmon_root = hwmon_root
+        self.thermal_root = thermal_root
+        self.rescan_interval = rescan_interval
+
+        self.sensors = []
+        self.cpu_sensors = []
+        self._fds = []
+        self._devices = None
+        self._last_scan = 0.0
+
+        self.discover()
+
+    @classmethod
+    def open(
+        cls,
+        hwmon_root: str = "/sys/class/hwmon",
+        thermal_root: str = "/sys/class/thermal",
+    ):
+        """
+        Create a sensor reader, or return None without sysfs
+
+        Returns:
+            ThermalSensors instance or None (callers fall back to psutil)
+        """
+        if not (os.path.isdir(hwmon_root) or os.path.isdir(thermal_root)):
+            return None
+        return cls(hwmon_root, thermal_root)
+
+    def discover(self):
+        """Enumerate all sensors and resolve the CPU temperature inputs"""
+        self.close()
+        self._devices = self._list_devices()
+        self._last_scan = time.monotonic()
+        self.sensors = self._hwmon_sensors() + self._zone_sensors()
+        self.cpu_sensors = self._resolve_cpu_sensors()
+
+        for sensor in self.cpu_sensors:
+            try:
+                self._fds.append(os.open(sensor.path, os.O_RDONLY | os.O_CLOEXEC))
+            except OSError as e:
+                self.logger.debug(f"Cannot open {sensor.path}: {e}")
+
+        if self.cpu_sensors:
+            labels = ", ".join(f"{s.chip}/{s.label}" for s in self.cpu_sensors)
+            self.logger.debug(f"CPU temperature sources: {labels}")
+
+    def close(self):
+        """Close the CPU sensor handles"""
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def cpu_temperature(self) -> Optional[float]:
+        """
+        Read the CPU temperature
+
+        Returns:
+            Hottest socket temperature in Celsius, or None if unavailable
+        """
+        if time.monotonic() - self._last_scan >= self.rescan_interval:
+            self._last_scan = time.monotonic()
+            if self._list_devices() != self._devices:
+                self.discover()
+
+        try:
+            return self._read_cpu()
+        except (OSError, ValueError):
+            # Device went away or was replaced: resolve the sources again
+            self.discover()
+            try:
+                return self._read_cpu()
+            except (OSError, ValueError):
+                return None
+
+    def all_sensors(self) -> List[Dict]:
+        """
+        Read every discovered sensor
+
+        Returns:
+            List of dictionaries with chip, label and current Celsius value
+        """
+        return [
+            {"chip": s.chip, "label": s.label, "current": _read_celsius(s.path)}
+            for s in self.sensors
+        ]
+
+    def _read_cpu(self) -> Optional[float]:
+        """One pread per socket, keeping the hottest reading"""
+        temps = [int(os.pread(fd, 32, 0)) / 1000.0 for fd in self._fds]
+        temps = [t for t in temps if 0 < t < 150]  # Reasonable temperature range
+        return round(max(temps), 1) if temps else None
+
+    def _list_devices(self) -> List[str]:
+        """List hwmon device entries"""
+        try:
+            return sorted(os.listdir(self.hwmon_root))
+        except OSError:
+            return []
+
+    def _hwmon_sensors(self) -> List[Sensor]:
+        """Enumerate temperature inputs of every hwmon device"""
+        sensors = []
+
+        for device in sorted(self._devices, key=_natural_key):
+            path = os.path.join(self.hwmon_root, device)
+            chip = _read_text(os.path.join(path, "name")) or device
+
+            try:
+                entries = os.listdir(path)
+            except OSError:
+                continue
+
+            inputs = sorted(
+                (int(match.group(1)), name)
+                for name in entries
+                for match in [TEMP_INPUT_PATTERN.match(name)]
+                if match
+            )
+            for index, name in inputs:
+                label = _read_text(os.path.join(path, f"temp{index}_label"))
+                sensors.append(
+                    Sensor(chip, label or f"temp{index}", os.path.join(path, name))
+                )
+
+        return sensors
+
+    def _zone_sensors(self) -> List[Sensor]:
+        """Enumerate thermal zones"""
+        try:
+            zones = [
+                name
+                for name in os.listdir(self.thermal_root)
+                if name.startswith("thermal_zone")
+            ]
+        except OSError:
+            return []
+
+        sensors = []
+        for zone in sorted(zones, key=_natural_key):
+            path = os.path.join(self.thermal_root, zone)
+            zone_type = _read_text(os.path.join(path, "type")) or zone
+            sensors.append(
+                Sensor("thermal_zone", zone_type, os.path.join(path, "temp"))
+            )
+
+        return sensors
+
+    def _resolve_cpu_sensors(self) -> List[Sensor]:
+        """Pick the CPU temperature inputs, one per socket where available"""
+        hwmon = [s for s in self.sensors if s.chip != "thermal_zone"]
+
+        for chip in CPU_CHIPS:
+            candidates = [s for s in hwmon if s.chip == chip]
+            if not candidates:
+                continue
+
+            for prefix in CPU_LABELS.get(chip, ()):
+                preferred = [s for s in candidates if s.label.startswith(prefix)]
+                if preferred:
+                    return preferred
+
+            return candidates[:1]
+
+        zones = [s for s in self.sensors if s.chip == "thermal_zone"]
+        for zone in zones:
+            if zone.label in CPU_ZONE_TYPES:
+                return [zone]
+
+        # Any sensor with a plausible reading
+        for sensor in hwmon + zones:
+            temp = _read_celsius(sensor.path)
+            if temp is not None and 0 < temp < 150:
+                return [sensor]
+
+        return []
@@ -0,0 +1,255 @@
+"""
+Log space compaction engine
+
+Understands logrotate naming (``syslog.1``, ``syslog.2.gz``,
+``app.log-20240101``) and the systemd journal layout so that rotated logs
+are compressed instead of deleted, and only trimmed when a directory exceeds
+its byte budget. A file only counts as rotated when the log it was rotated
+from sits next to it, so numbered files that are not logs (MySQL binary
+logs such as ``mysql-bin.000123``) are left alone.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import stat
+import time
+from typing import Dict, List, Optional
+
+from ..utils.logger import get_logger
+
+# Rotated siblings: name.N, name-YYYYMMDD[HH], name.old, optionally compressed
+ROTATED_PATTERN = re.compile(
+    r"^(?P<base>.+?)(?:\.(?P<index>\d+)|-(?P<date>\d{8}(?:\d{2})?)|\.old)"
+    r"(?P<compressed>\.(?:gz|xz|bz2|zst|lz4))?$"
+)
+
+# Archived journal files; the active system.journal/user-N.journal are kept
+ARCHIVED_JOURNAL_PATTERN = re.compile(r"^.+@.+\.journal$|^.+\.journal~$")
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def is_within_directory(path: str, directory: str) -> bool:
+    """Check whether path is directory or one of its descendants"""
+    path = os.path.realpath(path)
+    directory = os.path.realpath(directory)
+    return path == directory or path.startswith(directory + os.sep)
+
+
+class LogFile:
+    """A single file inside a log directory"""
+
+    __slots__ = ("path", "size", "mtime", "base", "rotated", "compressed")
+
+    def __init__(self, path: str, size: int, mtime: float):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+        match = ROTATED_PATTERN.match(os.path.basename(path))
+        self.base = match.group("base") if match else None
+        self.rotated = match is not None
+        self.compressed = bool(match and match.group("compressed"))
+
+
+class LogCompactor:
+    """Compress, budget and vacuum log directories"""
+
+    def __init__(
+        self,
+        log_dirs: List[str],
+        dir_budget_bytes: int,
+        compress_delay_days: float = 1,
+        journal_dir: Optional[str] = None,
+        journal_max_bytes: int = 0,
+        journal_max_age_days: float = 0,
+        compress_level: int = 6,
+    ):
+        """
+        Initialize log compactor
+
+        Args:
+            log_dirs: Directories to compact (walked recursively)
+            dir_budget_bytes: Byte budget per directory (0 disables trimming)
+            compress_delay_days: Minimum age before a rotated log is compressed,
+                mirroring logrotate's ``delaycompress``
+            journal_dir: systemd journal directory (skipped by the walker)
+            journal_max_bytes: Journal size budget (0 disables)
+            journal_max_age_days: Maximum archived journal age (0 disables)
+            compress_level: gzip compression level
+        """
+        self.log_dirs = log_dirs
+        self.dir_budget_bytes = dir_budget_bytes
+        self.compress_delay = compress_delay_days * 24 * 60 * 60
+        self.journal_dir = journal_dir
+        self.journal_max_bytes = journal_max_bytes
+        self.journal_max_age = journal_max_age_days * 24 * 60 * 60
+        self.compress_level = compress_level
+        self.logger = get_logger(__name__)
+
+    def run(self) -> Dict:
+        """
+        Compact all configured log directories and vacuum the journal
+
+        Returns:
+            Dictionary with compressed/deleted counts and bytes freed
+        """
+        result = {"compressed": 0, "deleted": 0, "bytes_freed": 0, "errors": []}
+
+        for log_dir in self.log_dirs:
+            if not os.path.isdir(log_dir):
+                continue
+
+            for root, dirs, files in os.walk(log_dir):
+                if self.journal_dir and is_within_directory(root, self.journal_dir):
+                    dirs[:] = []
+                    continue
+                self._compact_directory(root, files, result)
+
+        if self.journal_dir and os.path.isdir(self.journal_dir):
+            self._vacuum_journal(result)
+
+        return result
+
+    def _compact_directory(self, directory: str, names: List[str], result: Dict):
+        """Compress rotated logs, then enforce the directory byte budget"""
+        entries = self._scan(directory, names)
+        now = time.time()
+
+        for entry in entries:
+            if (
+                entry.rotated
+                and not entry.compressed
+                and now - entry.mtime >= self.compress_delay
+            ):
+                self._compress(entry, result)
+
+        if self.dir_budget_bytes <= 0:
+            return
+
+        total = sum(entry.size for entry in entries)
+        if total <= self.dir_budget_bytes:
+            return
+
+        # Oldest rotated files go first; active logs are never touched
+        for entry in sorted((e for e in entries if e.rotated), key=lambda e: e.mtime):
+            if total <= self.dir_budget_bytes:
+                break
+            if self._delete(entry.path, entry.size, result):
+                total -= entry.size
+
+    def _scan(self, directory: str, names: List[str]) -> List[LogFile]:
+        """Stat regular files in a directory, telling rotated logs apart"""
+        present = set(names)
+        entries = []
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            entry = LogFile(path, st.st_size, st.st_mtime)
+            # Rotated logs live next to the log they were rotated from
+            entry.rotated = entry.rotated and entry.base in present
+            entries.append(entry)
+        return entries
+
+    def _compress(self, entry: LogFile, result: Dict):
+        """
+        Gzip a rotated log in place using bounded memory
+
+        The original is replaced atomically and keeps its owner, mode and
+        mtime, so the service writing the log can still read it and
+        logrotate's age-based rotation still sees the right timestamps. The
+        entry is updated to describe the compressed file.
+        """
+        target = entry.path + ".gz"
+        if os.path.exists(target):
+            return
+
+        temp_path = target + ".tmp"
+        try:
+            with open(entry.path, "rb") as src, open(temp_path, "wb") as raw:
+                with gzip.GzipFile(
+                    filename=os.path.basename(entry.path),
+                    mode="wb",
+                    fileobj=raw,
+                    compresslevel=self.compress_level,
+                    mtime=int(entry.mtime),
+                ) as dst:
+                    shutil.copyfileobj(src, dst, COPY_CHUNK_SIZE)
+
+            shutil.copystat(entry.path, temp_path)
+            # copystat leaves the owner alone; running as root would
+            # otherwise hand syslog's files to root
+            st = os.stat(entry.path)
+            temp_st = os.stat(temp_path)
+            if (st.st_uid, st.st_gid) != (temp_st.st_uid, temp_st.st_gid):
+                os.chown(temp_path, st.st_uid, st.st_gid)
+            os.replace(temp_path, target)
+            os.remove(entry.path)
+
+            new_size = os.path.getsize(target)
+            result["compressed"] += 1
+            result["bytes_freed"] += max(entry.size - new_size, 0)
+            self.logger.debug(f"Compressed rotated log: {entry.path}")
+
+            entry.path = target
+            entry.size = new_size
+            entry.compressed = True
+
+        except OSError as e:
+            self._discard(temp_path)
+            result["errors"].append(f"Could not compress {entry.path}: {e}")
+            self.logger.debug(f"Could not compress {entry.path}: {e}")
+
+    def _vacuum_journal(self, result: Dict):
+        """
+        Remove archived journal files beyond the size or age budget
+
+        Like ``journalctl --vacuum-size/--vacuum-time``, only archived files
+        are removed; the files journald is currently writing are kept.
+        """
+        archived = []
+        total = 0
+
+        for root, dirs, files in os.walk(self.journal_dir):
+            for entry in self._scan(root, files):
+                total += entry.size
+                if ARCHIVED_JOURNAL_PATTERN.match(os.path.basename(entry.path)):
+                    archived.append(entry)
+
+        archived.sort(key=lambda e: e.mtime)
+        cutoff = time.time() - self.journal_max_age
+
+        for entry in archived:
+            too_old = self.journal_max_age > 0 and entry.mtime < cutoff
+            too_big = self.journal_max_bytes > 0 and total > self.journal_max_bytes
+            if not (too_old or too_big):
+                break
+            if self._delete(entry.path, entry.size, result):
+                total -= entry.size
+
+    def _delete(self, path: str, size: int, result: Dict) -> bool:
+        """Delete a file and record it in the result"""
+        try:
+            os.remove(path)
+            result["deleted"] += 1
+            result["bytes_freed"] += size
+            self.logger.debug(f"Removed log file: {path}")
+            return True
+        except OSError as e:
+            self.logger.debug(f"Could not remove log file {path}: {e}")
+            return False
+
+    @staticmethod
+    def _discard(path: str):
+        """Remove a partially written file if present"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -2,17 +2,109 @@
 System monitoring service
 """
 
+import heapq
 import os
 import time
-from collections import deque
-from datetime import datetime
-from typing import Dict, List, Optional
+from collections import Counter
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import psutil
 
+from ..monitoring.adaptive import AdaptiveInterval
+from ..monitoring.alerts import AlertEngine, AlertRule
+from ..monitoring.analytics import summarize
+from ..monitoring.anomaly import AnomalyDetector
+from ..monitoring.collectors import (
+    COST_CHEAP,
+    COST_EXPENSIVE,
+    COST_MODERATE,
+    CollectorRegistry,
+)
+from ..monitoring.cpu_sampler import CpuSampler, CpuUsage
+from ..monitoring.history import count_since
+from ..monitoring.process_history import ProcessHistory
+from ..monitoring.profiling import CollectorProfiler
+from ..monitoring.rates import (
+    DISK_RATE_FIELDS,
+    IGNORED_DISK_PREFIXES,
+    IGNORED_INTERFACE_PREFIXES,
+    NETWORK_RATE_FIELDS,
+    PRESSURE_RATE_FIELDS,
+    UNIT_RATE_FIELDS,
+    RateTracker,
+    compute_disk_rates,
+    compute_network_rates,
+    compute_pressure_rates,
+    compute_unit_rates,
+    sum_counters,
+)
+from ..monitoring.rollups import RAW, RollupHistory
+from ..monitoring.snapshot import SystemSnapshot
+from ..monitoring.tsdb import TimeSeriesStore
+from ..platforms.linux.cgroups import CgroupUnits
+from ..platforms.linux.pressure import PressureReader
+from ..platforms.linux.process_table import ProcessTable
+from ..platforms.linux.procfs import ProcfsReader
+from ..platforms.linux.thermal import ThermalSensors
 from ..utils.config import ConfigManager
 from ..utils.logger import get_logger
 
+# Built-in rules driven by monitoring.alert_thresholds:
+# (metric, threshold key, default, level, message)
+THRESHOLD_ALERTS = (
+    ("cpu", "cpu_percent", 80, "warning", "High CPU usage: {value:.1f}%"),
+    ("memory", "memory_percent", 85, "warning", "High memory usage: {value:.1f}%"),
+    ("disk", "disk_percent", 90, "critical", "High disk usage: {value:.1f}%"),
+    # Pressure stall "some" avg10: share of time tasks waited for the resource
+    (
+        "cpu_pressure",
+        "cpu_pressure_percent",
+        50,
+        "warning",
+        "CPU pressure: {value:.1f}%",
+    ),
+    (
+        "memory_pressure",
+        "memory_pressure_percent",
+        10,
+        "warning",
+        "Memory pressure: {value:.1f}%",
+    ),
+    ("io_pressure", "io_pressure_percent", 30, "warning", "I/O pressure: {value:.1f}%"),
+)
+
+# Per-device histories (disk_io.<device>, net_io.<interface>, pressure.<res>)
+# kept at most, and seconds after which a device that is gone loses its own
+MAX_DEVICE_HISTORIES = 64
+DEVICE_HISTORY_EXPIRY = 600
+
+# Fields get_processes_info can read
+PROCESS_FIELDS = (
+    "name",
+    "cmdline",
+    "cpu_percent",
+    "memory_percent",
+    "memory_info",
+    "status",
+    "create_time",
+    "username",
+    "num_threads",
+    "connections",  # number of TCP and UDP sockets
+)
+
+# Readers of the fields that map to a single psutil.Process call
+PROCESS_READERS = {
+    "name": psutil.Process.name,
+    "cmdline": psutil.Process.cmdline,
+    "memory_percent": psutil.Process.memory_percent,
+    "memory_info": lambda proc: proc.memory_info()._asdict(),
+    "status": psutil.Process.status,
+    "create_time": psutil.Process.create_time,
+    "username": psutil.Process.username,
+    "num_threads": psutil.Process.num_threads,
+}
+
 
 class MonitoringService:
     """Service for system monitoring and performance tracking"""
@@ -26,23 +118,209 @@ class MonitoringService:
         """
         self.config = config
         self.logger = get_logger(__name__)
+        monitoring_config = config.get("monitoring")
 
         # History storage
         self.history_size = config.get("monitoring", "history_size", 100)
-        self.cpu_history = deque(maxlen=self.history_size)
-        self.memory_history = deque(maxlen=self.history_size)
-        self.disk_history = deque(maxlen=self.history_size)
-        self.network_history = deque(maxlen=self.history_size)
-
-        # Network counters for rate calculation
-        self.prev_network_io = None
-        self.prev_network_time = None
+        # Raw samples plus 1-minute and 1-hour rollups kept in fixed memory
+        rollups = self.history_rollups = monitoring_config.get("history_rollups")
+        self.cpu_history = RollupHistory(["value"], self.history_size, rollups)
+        self.memory_history = RollupHistory(["value"], self.history_size, rollups)
+        self.disk_history = RollupHistory(["value"], self.history_size, rollups)
+        self.network_history = RollupHistory(
+            ["bytes_sent", "bytes_recv"], self.history_size, rollups
+        )
+        self.histories = {
+            "cpu": self.cpu_history,
+            "memory": self.memory_history,
+            "disk": self.disk_history,
+            "network": self.network_history,
+        }
+        # Last sample time of each per-device history
+        self._device_seen = {}
+        # Whole disk or partition, by device name (psutil fallback)
+        self._disk_names = {}
+
+        # Read-only view of the history files written by the daemon
+        self.persisted_history = None
+
+        # Per-device counter deltas for disk and network rates
+        self.disk_rate_tracker = RateTracker(DISK_RATE_FIELDS, compute_disk_rates)
+        self.network_rate_tracker = RateTracker(
+            NETWORK_RATE_FIELDS, compute_network_rates
+        )
+        self.unit_rate_tracker = RateTracker(UNIT_RATE_FIELDS, compute_unit_rates)
+        self.pressure_rate_tracker = RateTracker(
+            PRESSURE_RATE_FIELDS, compute_pressure_rates
+        )
+        self.pressure_rates = {}
+        self.disk_rates = {}
+        self.interface_rates = {}
+        self.unit_rates = {}
+        self._unit_counters = None
+        self.network_rates = None
+
+        # Latest snapshot, shared by stats, alerts and history
+        self.last_snapshot = None
 
         # Alert thresholds
         self.alert_thresholds = config.get_alert_thresholds()
 
+        # Alert engine: configured rules plus the simple threshold rules
+        self.alert_engine = AlertEngine(
+            AlertRule.from_dict(spec)
+            for spec in monitoring_config.get("alert_rules", [])
+        )
+        self._applied_thresholds = None
+
+        # Online anomaly detection; findings become alerts through the engine
+        self.anomaly_detector = None
+        anomaly_config = monitoring_config.get("anomaly_detection", {})
+        if anomaly_config.get("enabled", False):
+            self._setup_anomaly_detection(anomaly_config)
+
+        # Linux fast path: persistent /proc handles, psutil as the fallback
+        self.procfs = ProcfsReader.open()
+        self.process_table = ProcessTable.open()
+        self.thermal = ThermalSensors.open()
+        self.pressure = PressureReader.open()
+
+        # Per-unit accounting from cgroup v2 (systemd services and scopes)
+        self.cgroups = None
+        if monitoring_config.get("cgroups", {}).get("enabled", True):
+            self.cgroups = CgroupUnits.open()
+
+        # get_processes_info results, reused until the next snapshot
+        self._process_info = {}
+        self._process_info_tick = None
+        self._socket_inodes = None
+
+        # History of the most interesting processes (needs the process table)
+        self.process_history = None
+        process_config = monitoring_config.get("process_history", {})
+        if self.process_table and process_config.get("enabled", True):
+            self.process_history = ProcessHistory(
+                max_processes=process_config.get("max_processes", 32),
+                capacity=process_config.get("size", 300),
+                top=process_config.get("top", 5),
+                name_patterns=process_config.get("names", ()),
+            )
+
+        # Sampling interval that follows system activity
+        self.update_interval = monitoring_config.get("update_interval", 2)
+        self.adaptive_interval = None
+        adaptive_config = monitoring_config.get("adaptive_interval", {})
+        if adaptive_config.get("enabled", True):
+            self.adaptive_interval = AdaptiveInterval(
+                self.update_interval,
+                min_interval=adaptive_config.get("min_interval", 0.5),
+                max_interval=adaptive_config.get("max_interval", 30),
+            )
+
+        # Background CPU sampler so CPU usage never blocks a tick
+        self.cpu_sample_interval = monitoring_config.get("cpu_sample_interval", 1.0)
+        self.cpu_sampler = CpuSampler(
+            self.cpu_sample_interval,
+            source=self.procfs.cpu_times if self.procfs else None,
+        )
+        self.cpu_sampler.start()
+
+        # Collector registry: each source refreshes on its own schedule,
+        # slowed down when collecting exceeds the CPU overhead budget
+        budget = monitoring_config.get("overhead_budget", {})
+        self.collectors = CollectorRegistry(
+            CollectorProfiler(
+                budget.get("cpu_percent", 1.0) if budget.get("enabled", True) else None,
+                window=budget.get("window", 60),
+                max_slowdown=budget.get("max_slowdown", 8),
+            )
+        )
+        self._register_collectors(monitoring_config.get("collector_intervals", {}))
+
         self.logger.info("Monitoring service initialized")
 
+    def _register_collectors(self, intervals: Dict):
+        """
+        Register metric sources with their refresh interval and cost class
+
+        Args:
+            intervals: Per-collector interval overrides in seconds
+        """
+        # Disk and network sources return counters per device; totals and
+        # rates are derived from them
+        if self.procfs:
+            read_memory = self.procfs.memory
+            read_disk_io = partial(self._read_procfs_disks, self.procfs)
+            read_network_io = partial(self.procfs.net_io_counters, pernic=True)
+        else:
+            read_memory = self._read_psutil_memory
+            read_disk_io = self._read_psutil_disks
+            read_network_io = partial(psutil.net_io_counters, pernic=True)
+
+        sources = [
+            # Interval 0 refreshes every tick, None reads the value once
+            ("cpu", self.cpu_sampler.usage, 0, COST_CHEAP),
+            ("memory", read_memory, 0, COST_CHEAP),
+            ("disk_usage", lambda: psutil.disk_usage("/"), 5, COST_CHEAP),
+            ("disk_io", read_disk_io, 0, COST_CHEAP),
+            ("network_io", read_network_io, 0, COST_CHEAP),
+            ("load_avg", psutil.getloadavg, 0, COST_CHEAP),
+            ("cpu_count", psutil.cpu_count, None, COST_CHEAP),
+            ("boot_time", psutil.boot_time, None, COST_CHEAP),
+            ("cpu_temperature", self._get_cpu_temperature, 10, COST_MODERATE),
+            ("top_processes", self._get_top_processes, 5, COST_EXPENSIVE),
+        ]
+        if self.pressure:
+            sources.append(("pressure", self.pressure.read, 0, COST_CHEAP))
+        if self.cgroups:
+            sources.append(("cgroup_units", self.cgroups.read, 5, COST_MODERATE))
+
+        for name, reader, interval, cost in sources:
+            self.collectors.register(name, reader, intervals.get(name, interval), cost)
+
+    @staticmethod
+    def _read_procfs_disks(procfs: ProcfsReader) -> Dict:
+        """Read per-disk counters from /proc/diskstats, skipping partitions"""
+        counters = procfs.disk_io_counters(perdisk=True)
+        return {name: c for name, c in counters.items() if procfs.is_disk(name)}
+
+    def _read_psutil_disks(self) -> Dict:
+        """Read per-disk counters through psutil, skipping Linux partitions"""
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        # Only Linux reports partitions; whole disks are listed in /sys/block
+        if not os.path.isdir("/sys/block"):
+            return counters
+
+        disks = {}
+        for name, c in counters.items():
+            is_disk = self._disk_names.get(name)
+            if is_disk is None:
+                path = os.path.join("/sys/block", name.replace("/", "!"))
+                is_disk = self._disk_names[name] = os.path.exists(path)
+            if is_disk:
+                disks[name] = c
+        return disks
+
+    @staticmethod
+    def _read_psutil_memory() -> Tuple:
+        """Read memory and swap statistics through psutil"""
+        return psutil.virtual_memory(), psutil.swap_memory()
+
+    def stop(self):
+        """Stop background samplers and release /proc handles"""
+        self.cpu_sampler.stop()
+        if self.procfs:
+            self.procfs.close()
+            self.procfs = None
+        if self.thermal:
+            self.thermal.close()
+        if self.pressure:
+            self.pressure.close()
+            self.pressure = None
+        if self.persisted_history:
+            self.persisted_history.close()
+            self.persisted_history = None
+
     def get_system_stats(self) -> Dict:
         """
         Get current system statistics
@@ -51,41 +329,95 @@ class MonitoringService:
             Dictionary with system statistics
         """
         try:
-            stats = {
-                "timestamp": datetime.now().isoformat(),
-                "cpu_percent": self._get_cpu_percent(),
-                "cpu_temperature": self._get_cpu_temperature(),
-                "memory_percent": self._get_memory_percent(),
-                "memory_info": self._get_memory_info(),
-                "disk_percent": self._get_disk_percent(),
-                "disk_info": self._get_disk_info(),
-                "network_io": self._get_network_io(),
-                "top_processes": self._get_top_processes(),
-                "system_load": self._get_system_load(),
-                "boot_time": self._get_boot_time(),
-                "alerts": self._check_alerts(),
-            }
+            snapshot = self.collect_snapshot()
+            alert_events = self._check_alerts(snapshot)
 
             # Update history
-            self._update_history(stats)
+            self._update_history(snapshot)
 
+            stats = snapshot.to_dict(self.alert_engine.active())
+            stats["alert_events"] = alert_events
+            stats["next_interval"] = self.next_interval(snapshot)
+            stats["collector_profile"] = self.get_collector_profile()
             return stats
 
         except Exception as e:
             self.logger.error(f"Error getting system stats: {e}")
             return {}
 
-    def _get_cpu_percent(self) -> float:
-        """Get CPU usage percentage"""
-        try:
-            return psutil.cpu_percent(interval=0.1)
-        except Exception as e:
-            self.logger.error(f"Error getting CPU percent: {e}")
-            return 0.0
+    def collect_snapshot(self) -> SystemSnapshot:
+        """
+        Run the due collectors and build an immutable snapshot
+
+        Sources that are not due this tick contribute their cached value, so
+        every source is read at most once per tick.
+
+        Returns:
+            Snapshot of the current tick
+        """
+        refreshed = self.collectors.run_due()
+        values = self.collectors.values()
+        current_time = time.time()
+
+        memory, swap = values["memory"] or (None, None)
+        disks = values["disk_io"] or {}
+        interfaces = values["network_io"] or {}
+        units = values.get("cgroup_units")
+        pressure = values.get("pressure") or {}
+
+        # Rates from monotonic deltas, only when the counters were re-read
+        now = time.monotonic()
+        if "disk_io" in refreshed:
+            self.disk_rates = self.disk_rate_tracker.update(disks, now)
+        if "network_io" in refreshed:
+            self.interface_rates = self.network_rate_tracker.update(interfaces, now)
+            self.network_rates = None
+            if self.interface_rates:
+                self.network_rates = (
+                    RateTracker.total(self.interface_rates, "tx_bytes") / 1024,
+                    RateTracker.total(self.interface_rates, "rx_bytes") / 1024,
+                )
+        if "pressure" in refreshed:
+            self.pressure_rates = self.pressure_rate_tracker.update(pressure, now)
+
+        # cgroup units may be refreshed by the engine between ticks: rate
+        # every new reading against the time it was taken
+        if units is not None and units is not self._unit_counters:
+            self._unit_counters = units
+            read_at = self.collectors.collectors["cgroup_units"].last_run
+            self.unit_rates = self.unit_rate_tracker.update(units, read_at)
+
+        snapshot = SystemSnapshot(
+            timestamp=current_time,
+            cpu=values["cpu"] or CpuUsage(),
+            cpu_temperature=values["cpu_temperature"],
+            memory=memory,
+            swap=swap,
+            disk_usage=values["disk_usage"],
+            disk_io=sum_counters(disks),
+            network_io=sum_counters(interfaces),
+            network_rates=self.network_rates,
+            disk_rates=self.disk_rates,
+            interface_rates=self.interface_rates,
+            unit_rates=self.unit_rates,
+            pressure=pressure,
+            pressure_rates=self.pressure_rates,
+            top_processes=tuple(values["top_processes"] or ()),
+            load_avg=values["load_avg"],
+            cpu_count=values["cpu_count"] or 0,
+            boot_time=values["boot_time"],
+        )
+
+        self.last_snapshot = snapshot
+        return snapshot
 
     def _get_cpu_temperature(self) -> Optional[float]:
         """Get CPU temperature in Celsius"""
         try:
+            # Sensors resolved once at startup: one read per socket
+            if self.thermal:
+                return self.thermal.cpu_temperature()
+
             # Try to get temperature from psutil sensors
             if hasattr(psutil, "sensors_temperatures"):
                 temps = psutil.sensors_temperatures()
@@ -118,27 +450,6 @@ class MonitoringService:
                             )
                             return round(temp_sensor.current, 1)
 
-            # Fallback: try to read from /sys/class/thermal directly
-            try:
-                thermal_zones = [
-                    "/sys/class/thermal/thermal_zone0/temp",
-                    "/sys/class/thermal/thermal_zone1/temp",
-                    "/sys/class/thermal/thermal_zone2/temp",
-                ]
-
-                for zone_path in thermal_zones:
-                    if os.path.exists(zone_path):
-                        with open(zone_path, "r") as f:
-                            temp_millidegrees = int(f.read().strip())
-                            temp_celsius = temp_millidegrees / 1000.0
-                            if 0 < temp_celsius < 150:  # Reasonable temperature range
-                                self.logger.debug(
-                                    f"CPU temperature from {zone_path}: {temp_celsius}°C"
-                                )
-                                return round(temp_celsius, 1)
-            except (OSError, ValueError, FileNotFoundError):
-                pass
-
             # If all methods fail, return None
             self.logger.debug("CPU temperature not available")
             return None
@@ -147,118 +458,29 @@ class MonitoringService:
             self.logger.error(f"Error getting CPU temperature: {e}")
             return None
 
-    def _get_memory_percent(self) -> float:
-        """Get memory usage percentage"""
-        try:
-            return psutil.virtual_memory().percent
-        except Exception as e:
-            self.logger.error(f"Error getting memory percent: {e}")
-            return 0.0
-
-    def _get_memory_info(self) -> Dict:
-        """Get detailed memory information"""
-        try:
-            mem = psutil.virtual_memory()
-            swap = psutil.swap_memory()
-
-            return {
-                "total": mem.total,
-                "available": mem.available,
-                "used": mem.used,
-                "free": mem.free,
-                "percent": mem.percent,
-                "swap_total": swap.total,
-                "swap_used": swap.used,
-                "swap_free": swap.free,
-                "swap_percent": swap.percent,
-            }
-        except Exception as e:
-            self.logger.error(f"Error getting memory info: {e}")
-            return {}
-
-    def _get_disk_percent(self) -> float:
-        """Get disk usage percentage for root partition"""
-        try:
-            return psutil.disk_usage("/").percent
-        except Exception as e:
-            self.logger.error(f"Error getting disk percent: {e}")
-            return 0.0
-
-    def _get_disk_info(self) -> Dict:
-        """Get detailed disk information"""
-        try:
-            disk_usage = psutil.disk_usage("/")
-            disk_io = psutil.disk_io_counters()
-
-            info = {
-                "total": disk_usage.total,
-                "used": disk_usage.used,
-                "free": disk_usage.free,
-                "percent": disk_usage.percent,
-            }
-
-            if disk_io:
-                info.update(
-                    {
-                        "read_bytes": disk_io.read_bytes,
-                        "write_bytes": disk_io.write_bytes,
-                        "read_count": disk_io.read_count,
-                        "write_count": disk_io.write_count,
-                    }
-                )
-
-            return info
-        except Exception as e:
-            self.logger.error(f"Error getting disk info: {e}")
-            return {}
+    def get_temperature_sensors(self) -> List[Dict]:
+        """
+        Get every temperature sensor with its label
 
-    def _get_network_io(self) -> Dict:
-        """Get network I/O statistics"""
+        Returns:
+            List of dictionaries with chip, label and current Celsius value
+        """
         try:
-            current_time = time.time()
-            network_io = psutil.net_io_counters()
-
-            if network_io is None:
-                return {}
-
-            result = {
-                "bytes_sent": network_io.bytes_sent,
-                "bytes_recv": network_io.bytes_recv,
-                "packets_sent": network_io.packets_sent,
-                "packets_recv": network_io.packets_recv,
-            }
-
-            # Calculate rates if we have previous data
-            if self.prev_network_io and self.prev_network_time:
-                time_diff = current_time - self.prev_network_time
-                if time_diff > 0:
-                    bytes_sent_rate = (
-                        (network_io.bytes_sent - self.prev_network_io.bytes_sent)
-                        / time_diff
-                        / 1024
-                    )  # KB/s
-                    bytes_recv_rate = (
-                        (network_io.bytes_recv - self.prev_network_io.bytes_recv)
-                        / time_diff
-                        / 1024
-                    )  # KB/s
-
-                    result.update(
-                        {
-                            "bytes_sent_rate": round(bytes_sent_rate, 2),
-                            "bytes_recv_rate": round(bytes_recv_rate, 2),
-                        }
-                    )
+            if self.thermal:
+                return self.thermal.all_sensors()
 
-            # Update previous values
-            self.prev_network_io = network_io
-            self.prev_network_time = current_time
+            if not hasattr(psutil, "sensors_temperatures"):
+                return []
 
-            return result
+            return [
+                {"chip": chip, "label": sensor.label, "current": sensor.current}
+                for chip, sensors in psutil.sensors_temperatures().items()
+                for sensor in sensors
+            ]
 
         except Exception as e:
-            self.logger.error(f"Error getting network I/O: {e}")
-            return {}
+            self.logger.error(f"Error getting temperature sensors: {e}")
+            return []
 
     def _get_top_processes(self, limit: int = 10) -> List[Dict]:
         """
@@ -271,6 +493,16 @@ class MonitoringService:
             List of process information dictionaries
         """
         try:
+            if self.process_table:
+                self.process_table.update()
+                if self.process_history:
+                    self.process_history.update(
+                        time.time(),
+                        self.process_table.records,
+                        self.process_table.read_io,
+                    )
+                return [record.to_dict() for record in self.process_table.top(limit)]
+
             processes = []
 
             for proc in psutil.process_iter(
@@ -291,205 +523,506 @@ class MonitoringService:
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     pass
 
-            # Sort by CPU usage and return top processes
-            processes.sort(key=lambda x: x["cpu_percent"], reverse=True)
-            return processes[:limit]
+            # Keep the top processes without sorting the whole list
+            return heapq.nlargest(limit, processes, key=lambda x: x["cpu_percent"])
 
         except Exception as e:
             self.logger.error(f"Error getting top processes: {e}")
             return []
 
-    def _get_system_load(self) -> Dict:
-        """Get system load averages"""
+    def _check_alerts(self, snapshot: SystemSnapshot) -> List[Dict]:
+        """
+        Evaluate alert rules on a snapshot
+
+        Returns:
+            Alerts that started firing or resolved on this snapshot; the
+            alerts still firing are available from alert_engine.active()
+        """
         try:
-            load_avg = psutil.getloadavg()
-            cpu_count = psutil.cpu_count()
+            if self.alert_thresholds != self._applied_thresholds:
+                self._apply_alert_thresholds()
 
-            return {
-                "load_1min": load_avg[0],
-                "load_5min": load_avg[1],
-                "load_15min": load_avg[2],
-                "cpu_count": cpu_count,
-                "load_1min_percent": (
-                    (load_avg[0] / cpu_count) * 100 if cpu_count > 0 else 0
-                ),
-                "load_5min_percent": (
-                    (load_avg[1] / cpu_count) * 100 if cpu_count > 0 else 0
-                ),
-                "load_15min_percent": (
-                    (load_avg[2] / cpu_count) * 100 if cpu_count > 0 else 0
-                ),
-            }
-        except Exception as e:
-            self.logger.error(f"Error getting system load: {e}")
-            return {}
+            metrics = self.metric_values(snapshot)
+            if self.anomaly_detector:
+                metrics.update(
+                    self.anomaly_detector.scores(metrics, snapshot.timestamp)
+                )
 
-    def _get_boot_time(self) -> Dict:
-        """Get system boot time information"""
-        try:
-            boot_timestamp = psutil.boot_time()
-            boot_time = datetime.fromtimestamp(boot_timestamp)
-            current_time = datetime.now()
-            uptime = current_time - boot_time
+            return self.alert_engine.evaluate(metrics, snapshot.timestamp)
 
-            return {
-                "boot_time": boot_time.isoformat(),
-                "uptime_seconds": uptime.total_seconds(),
-                "uptime_days": uptime.days,
-                "uptime_hours": uptime.seconds // 3600,
-                "uptime_minutes": (uptime.seconds % 3600) // 60,
-            }
         except Exception as e:
-            self.logger.error(f"Error getting boot time: {e}")
-            return {}
+            self.logger.error(f"Error checking alerts: {e}")
+            return []
 
-    def _check_alerts(self) -> List[Dict]:
-        """Check for system alerts based on thresholds"""
-        alerts = []
+    def _setup_anomaly_detection(self, anomaly_config: Dict):
+        """
+        Create the anomaly detector and one alert rule per tracked metric
 
-        try:
-            # CPU alert
-            cpu_percent = self._get_cpu_percent()
-            if cpu_percent > self.alert_thresholds.get("cpu_percent", 80):
-                alerts.append(
-                    {
-                        "type": "cpu",
-                        "level": "warning",
-                        "message": f"High CPU usage: {cpu_percent:.1f}%",
-                        "value": cpu_percent,
-                        "threshold": self.alert_thresholds.get("cpu_percent", 80),
-                    }
+        Args:
+            anomaly_config: monitoring.anomaly_detection settings
+        """
+        metrics = anomaly_config.get("metrics", [])
+        z_threshold = anomaly_config.get("z_threshold", 4.0)
+
+        self.anomaly_detector = AnomalyDetector(
+            metrics,
+            alpha=anomaly_config.get("alpha", 0.05),
+            warmup=anomaly_config.get("warmup", 30),
+            min_std=anomaly_config.get("min_std", 1.0),
+            seasonal=anomaly_config.get("seasonal", True),
+        )
+
+        for metric in metrics:
+            self.alert_engine.add_rule(
+                AlertRule(
+                    f"{metric}_anomaly",
+                    f"{metric}_anomaly",
+                    z_threshold,
+                    clear=z_threshold / 2,
+                    cooldown=anomaly_config.get("cooldown", 300),
+                    level="info",
+                    message=f"Unusual {metric} reading (z-score {{value:.1f}})",
                 )
+            )
 
-            # Memory alert
-            memory_percent = self._get_memory_percent()
-            if memory_percent > self.alert_thresholds.get("memory_percent", 85):
-                alerts.append(
-                    {
-                        "type": "memory",
-                        "level": "warning",
-                        "message": f"High memory usage: {memory_percent:.1f}%",
-                        "value": memory_percent,
-                        "threshold": self.alert_thresholds.get("memory_percent", 85),
-                    }
+    def _apply_alert_thresholds(self):
+        """(Re)create the simple rules from monitoring.alert_thresholds"""
+        for metric, key, default, level, message in THRESHOLD_ALERTS:
+            self.alert_engine.add_rule(
+                AlertRule(
+                    key,
+                    metric,
+                    self.alert_thresholds.get(key, default),
+                    level=level,
+                    message=message,
                 )
+            )
+        self._applied_thresholds = dict(self.alert_thresholds)
 
-            # Disk alert
-            disk_percent = self._get_disk_percent()
-            if disk_percent > self.alert_thresholds.get("disk_percent", 90):
-                alerts.append(
-                    {
-                        "type": "disk",
-                        "level": "critical",
-                        "message": f"High disk usage: {disk_percent:.1f}%",
-                        "value": disk_percent,
-                        "threshold": self.alert_thresholds.get("disk_percent", 90),
-                    }
-                )
+    def next_interval(self, snapshot: SystemSnapshot) -> float:
+        """
+        Get the seconds until the next sample should be taken
 
-            return alerts
+        Shorter near alert thresholds or while metrics move fast, longer on
+        an idle system (see AdaptiveInterval). The CPU sampler follows
+        slower intervals so an idle host is not woken every second.
 
-        except Exception as e:
-            self.logger.error(f"Error checking alerts: {e}")
-            return []
+        Args:
+            snapshot: Latest snapshot
 
-    def _update_history(self, stats: Dict):
+        Returns:
+            Interval in seconds
+        """
+        if self.adaptive_interval is None:
+            return self.update_interval
+
+        interval = self.adaptive_interval.update(
+            self.metric_values(snapshot),
+            self.alert_engine.thresholds(),
+            snapshot.timestamp,
+        )
+
+        sampler = self.cpu_sampler
+        sample_interval = max(self.cpu_sample_interval, interval)
+        if sample_interval < sampler.interval:
+            # Restart rather than wait out the sampler's long sleep
+            sampler.stop()
+            sampler.interval = sample_interval
+            sampler.start()
+        else:
+            sampler.interval = sample_interval
+        return interval
+
+    @staticmethod
+    def metric_values(snapshot: SystemSnapshot) -> Dict[str, Optional[float]]:
+        """Flat metric values, as used by alert rules and subscriptions"""
+        load_avg = snapshot.load_avg
+        rates = snapshot.network_rates
+        return {
+            "cpu": snapshot.cpu_percent,
+            "memory": snapshot.memory_percent,
+            "disk": snapshot.disk_percent,
+            "swap": snapshot.swap.percent if snapshot.swap is not None else None,
+            "cpu_temperature": snapshot.cpu_temperature,
+            "load_1min": load_avg[0] if load_avg else None,
+            "network_sent_rate": rates[0] if rates else None,
+            "network_recv_rate": rates[1] if rates else None,
+            **{
+                f"{resource}_pressure": stall.some_avg10
+                for resource, stall in snapshot.pressure.items()
+            },
+            **{
+                f"{resource}_pressure_full": stall.full_avg10
+                for resource, stall in snapshot.pressure.items()
+                if resource != "cpu"
+            },
+        }
+
+    def _update_history(self, snapshot: SystemSnapshot):
         """Update historical data"""
         try:
-            timestamp = stats.get("timestamp", datetime.now().isoformat())
-
-            self.cpu_history.append(
-                {"timestamp": timestamp, "value": stats.get("cpu_percent", 0)}
-            )
-
-            self.memory_history.append(
-                {"timestamp": timestamp, "value": stats.get("memory_percent", 0)}
-            )
-
-            self.disk_history.append(
-                {"timestamp": timestamp, "value": stats.get("disk_percent", 0)}
+            for metric, values in self.history_rows(snapshot).items():
+                self.histories[metric].append(snapshot.timestamp, *values)
+
+            # Per-device rate histories, created as devices appear
+            devices = (
+                [
+                    ("disk_io", DISK_RATE_FIELDS, name, rates)
+                    for name, rates in snapshot.disk_rates.items()
+                    if not name.startswith(IGNORED_DISK_PREFIXES)
+                ]
+                + [
+                    ("net_io", NETWORK_RATE_FIELDS, name, rates)
+                    for name, rates in snapshot.interface_rates.items()
+                    if not name.startswith(IGNORED_INTERFACE_PREFIXES)
+                ]
+                + [
+                    ("pressure", PRESSURE_RATE_FIELDS, resource, rates)
+                    for resource, rates in snapshot.pressure_rates.items()
+                ]
             )
+            for kind, fields, name, rates in devices:
+                metric = f"{kind}.{name}"
+                history = self.histories.get(metric)
+                if history is None:
+                    if len(self._device_seen) >= MAX_DEVICE_HISTORIES:
+                        continue
+                    history = self.histories[metric] = RollupHistory(
+                        fields, self.history_size, self.history_rollups
+                    )
+                self._device_seen[metric] = snapshot.timestamp
+                history.append(snapshot.timestamp, *(rates[f] for f in fields))
 
-            network_io = stats.get("network_io", {})
-            self.network_history.append(
-                {
-                    "timestamp": timestamp,
-                    "bytes_sent": network_io.get("bytes_sent", 0),
-                    "bytes_recv": network_io.get("bytes_recv", 0),
-                }
-            )
+            # Drop devices that are gone (container interfaces, unplugged disks)
+            expired = snapshot.timestamp - DEVICE_HISTORY_EXPIRY
+            for metric, seen in list(self._device_seen.items()):
+                if seen < expired:
+                    del self._device_seen[metric]
+                    del self.histories[metric]
 
         except Exception as e:
             self.logger.error(f"Error updating history: {e}")
 
-    def get_history(self, metric: str, limit: Optional[int] = None) -> List[Dict]:
+    def history_rows(self, snapshot: SystemSnapshot) -> Dict[str, Tuple]:
+        """
+        Get the history values recorded for a snapshot
+
+        Args:
+            snapshot: Snapshot to record
+
+        Returns:
+            Dictionary mapping metric names to values in column order
+        """
+        network_io = snapshot.network_io
+        return {
+            "cpu": (snapshot.cpu_percent,),
+            "memory": (snapshot.memory_percent,),
+            "disk": (snapshot.disk_percent,),
+            "network": (
+                network_io.bytes_sent if network_io else 0,
+                network_io.bytes_recv if network_io else 0,
+            ),
+        }
+
+    def get_history(
+        self,
+        metric: str,
+        limit: Optional[int] = None,
+        resolution: str = RAW,
+        window: Optional[float] = None,
+    ) -> Dict:
         """
         Get historical data for a specific metric
 
+        Args:
+            metric: Metric name (cpu, memory, disk, network), or
+                disk_io.<device> / net_io.<interface> for per-device rates,
+                pressure.<cpu|memory|io> for stall percentages
+            limit: Maximum number of entries to return
+            resolution: "raw" samples or a rollup tier such as "1m" or "1h"
+            window: Return the last window seconds at the finest resolution
+                that covers them (overrides limit and resolution)
+
+        Returns:
+            Dictionary of columns ("timestamp" as epoch seconds plus "value",
+            or "bytes_sent"/"bytes_recv" for network), oldest first. Rollup
+            tiers have <column>_min/_max/_mean/_last columns instead. Columns
+            are zero-copy views that newer samples overwrite.
+        """
+        try:
+            if metric not in self.histories:
+                return {}
+
+            if window is not None:
+                return self.histories[metric].window(window, time.time())
+
+            return self.histories[metric].view(limit or None, resolution)
+
+        except Exception as e:
+            self.logger.error(f"Error getting history for {metric}: {e}")
+            return {}
+
+    def get_persisted_history(self, metric: str, limit: Optional[int] = None) -> Dict:
+        """
+        Get history recorded by the daemon, which survives restarts
+
         Args:
             metric: Metric name (cpu, memory, disk, network)
             limit: Maximum number of entries to return
 
         Returns:
-            List of historical data points
+            Dictionary of columns read in place from the daemon's
+            memory-mapped history file, or an empty dict if there is none
         """
         try:
-            history_map = {
-                "cpu": self.cpu_history,
-                "memory": self.memory_history,
-                "disk": self.disk_history,
-                "network": self.network_history,
-            }
+            if self.persisted_history is None:
+                self.persisted_history = TimeSeriesStore(readonly=True)
 
-            if metric not in history_map:
-                return []
+            return self.persisted_history.read(metric, limit or None)
 
-            history = list(history_map[metric])
+        except Exception as e:
+            self.logger.error(f"Error reading persisted history for {metric}: {e}")
+            return {}
 
-            if limit:
-                history = history[-limit:]
+    def get_statistics(
+        self,
+        metrics: Sequence[str],
+        window: float,
+        thresholds: Optional[Dict[str, float]] = None,
+        persisted: Optional[bool] = None,
+    ) -> Dict[str, Dict]:
+        """
+        Get window statistics for several metrics in one call
 
-            return history
+        Args:
+            metrics: Metric names (cpu, memory, disk), or metric.column for
+                other columns such as "network.bytes_recv"
+            window: Window length in seconds, ending now
+            thresholds: Thresholds for time_above per metric name; defaults
+                to the alert thresholds
+            persisted: Read the daemon's history files (True), in-memory
+                history (False), or the daemon's files when they exist (None)
+
+        Returns:
+            Dictionary mapping each metric to its summary (count, mean, min,
+            max, last, p50/p95/p99, rate per second, time_above) and the
+            history "resolution" it was computed from
+        """
+        try:
+            now = time.time()
+            thresholds = thresholds or {}
+            results = {}
+
+            for name in metrics:
+                metric, _, column = name.partition(".")
+                column = column or "value"
+                threshold = thresholds.get(
+                    name, self.alert_thresholds.get(f"{metric}_percent")
+                )
+
+                history, resolution = {}, RAW
+                if persisted is not False:
+                    history = self.get_persisted_history(metric)
+                    if history:
+                        count = count_since(history["timestamp"], now - window)
+                        # Files left by a stopped daemon may hold nothing
+                        # recent; use in-memory history then
+                        history = {
+                            key: values[len(values) - count :]
+                            for key, values in history.items()
+                            if count
+                        }
+                if not history and not persisted and metric in self.histories:
+                    history = self.histories[metric].window(window, now)
+                    resolution = history.pop("resolution")
+
+                # Rollup tiers are summarized from their bucket means
+                values_key = column if resolution == RAW else f"{column}_mean"
+                if values_key not in history:
+                    results[name] = {"count": 0, "resolution": resolution}
+                    continue
+
+                summary = summarize(
+                    history["timestamp"], history[values_key], threshold
+                )
+                if resolution != RAW and summary["count"]:
+                    summary["min"] = float(min(history[f"{column}_min"]))
+                    summary["max"] = float(max(history[f"{column}_max"]))
+                summary["resolution"] = resolution
+                results[name] = summary
+
+            return results
 
         except Exception as e:
-            self.logger.error(f"Error getting history for {metric}: {e}")
-            return []
+            self.logger.error(f"Error computing statistics: {e}")
+            return {}
 
-    def get_process_info(self, pid: int) -> Dict:
+    def get_process_info(
+        self, pid: int, history: bool = True, history_limit: Optional[int] = None
+    ) -> Dict:
         """
         Get detailed information about a specific process
 
         Args:
             pid: Process ID
+            history: Include the process history when the process is tracked
+            history_limit: Only include the most recent history samples
 
         Returns:
-            Dictionary with process information
+            Dictionary with process information; for tracked processes a
+            "history" key holds cpu_percent, rss, io_bytes and num_threads
+            columns. Exited processes that are still tracked only report
+            their pid, name and history.
         """
         try:
-            proc = psutil.Process(pid)
-
-            return {
-                "pid": proc.pid,
-                "name": proc.name(),
-                "cmdline": proc.cmdline(),
-                "cpu_percent": proc.cpu_percent(),
-                "memory_percent": proc.memory_percent(),
-                "memory_info": proc.memory_info()._asdict(),
-                "status": proc.status(),
-                "create_time": proc.create_time(),
-                "username": proc.username(),
-                "num_threads": proc.num_threads(),
-                "connections": (
-                    len(proc.connections()) if hasattr(proc, "connections") else 0
-                ),
-            }
+            info = self.get_processes_info([pid]).get(pid)
+            if info is not None:
+                info = dict(info)
+            if not (history and self.process_history):
+                return info or {}
+
+            with self.process_history.lock:
+                tracked = self.process_history.get(pid)
+                if info is None:
+                    return tracked.to_dict(history_limit) if tracked else {}
+                if tracked and tracked.alive:
+                    info["history"] = tracked.history.view(history_limit)
+            return info
 
-        except psutil.NoSuchProcess:
-            return {}
         except Exception as e:
             self.logger.error(f"Error getting process info for PID {pid}: {e}")
             return {}
 
+    def get_processes_info(
+        self, pids: Iterable[int], fields: Optional[Sequence[str]] = None
+    ) -> Dict[int, Dict]:
+        """
+        Get information about several processes in one call
+
+        Only the requested fields are read, each process inside psutil's
+        oneshot(). Connection counts map sockets to processes once per
+        batch instead of scanning every socket per process. Results are
+        cached until the next snapshot.
+
+        Args:
+            pids: Process IDs
+            fields: Names from PROCESS_FIELDS (all of them by default)
+
+        Returns:
+            Dictionary mapping each running PID to {"pid": pid, field: value};
+            fields that cannot be read (access denied) are None
+
+        Raises:
+            ValueError: If a field is unknown
+        """
+        fields = PROCESS_FIELDS if fields is None else tuple(fields)
+        unknown = set(fields).difference(PROCESS_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown process fields: {', '.join(sorted(unknown))}")
+
+        tick = self.last_snapshot.timestamp if self.last_snapshot else None
+        if tick is None or tick != self._process_info_tick:
+            self._process_info = {}
+            self._process_info_tick = tick
+            self._socket_inodes = None
+
+        results = {}
+        connection_counts = None
+        for pid in pids:
+            info = self._process_info.get(pid)
+            if info is None:
+                info = self._process_info[pid] = {"pid": pid}
+            missing = [field for field in fields if field not in info]
+
+            if missing:
+                if "connections" in missing and connection_counts is None:
+                    connection_counts = self._connection_counter()
+                try:
+                    info.update(self._read_process(pid, missing, connection_counts))
+                except psutil.NoSuchProcess:
+                    del self._process_info[pid]
+                    continue
+
+            results[pid] = {"pid": pid, **{field: info[field] for field in fields}}
+        return results
+
+    def _read_process(self, pid: int, fields: Sequence[str], count_connections):
+        """
+        Read some fields of one process
+
+        Raises:
+            psutil.NoSuchProcess: If the process does not exist
+        """
+        proc = psutil.Process(pid)
+        values = {}
+        with proc.oneshot():
+            for field in fields:
+                try:
+                    if field == "cpu_percent":
+                        values[field] = self._process_cpu_percent(proc)
+                    elif field == "connections":
+                        values[field] = count_connections(proc)
+                    else:
+                        values[field] = PROCESS_READERS[field](proc)
+                except psutil.AccessDenied:
+                    values[field] = None
+        return values
+
+    def _process_cpu_percent(self, proc: psutil.Process) -> float:
+        """CPU usage from the process table, which has a previous reading"""
+        if self.process_table:
+            record = self.process_table.records.get(proc.pid)
+            if record is not None:
+                return record.cpu_percent
+        return proc.cpu_percent()
+
+    def _connection_counter(self):
+        """
+        Build a function counting the TCP and UDP sockets of a process
+
+        On Linux the socket inodes are read once per tick and matched
+        against each process's descriptors; elsewhere all connections are
+        listed once and grouped by PID, falling back to one call per
+        process when that needs privileges.
+        """
+        if self.process_table:
+            if self._socket_inodes is None:
+                self._socket_inodes = self.process_table.socket_inodes()
+            inodes = self._socket_inodes
+            return lambda proc: self.process_table.count_sockets(proc.pid, inodes)
+
+        try:
+            counts = Counter(conn.pid for conn in psutil.net_connections("inet"))
+            return lambda proc: counts.get(proc.pid, 0)
+        except psutil.AccessDenied:
+            return lambda proc: len(
+                proc.net_connections("inet")
+                if hasattr(proc, "net_connections")
+                else proc.connections("inet")
+            )
+
+    def get_collector_profile(self) -> Dict:
+        """
+        Get the cost of each collector
+
+        Returns:
+            CPU overhead of collecting (percent of one core) over the last
+            budget window, the budget, and per collector its call latency
+            (mean, p50, p99, max in ms), CPU share and current interval
+        """
+        return self.collectors.profiler.report(self.collectors.collectors)
+
+    def get_tracked_processes(self) -> List[Dict]:
+        """
+        List the processes with recorded history
+
+        Returns:
+            Tracked processes, most recently interesting first
+        """
+        if not self.process_history:
+            return []
+        return self.process_history.processes()
+
     def get_system_info(self) -> Dict:
         """Get general system information"""
         try:
@@ -27,6 +27,10 @@ class SchedulingService:
         self.scheduler_thread = None
         self.stop_event = Event()
 
+        # Scheduled cleanups wait for an idle system in their own thread, so
+        # the scheduler keeps running other jobs meanwhile
+        self.cleanup_thread = None
+
         # Load existing schedules
         self.schedules = self._load_schedules()
 
@@ -166,7 +170,7 @@ class SchedulingService:
 
             # Create the job function
             def job():
-                self._run_scheduled_cleanup(schedule_config["id"], cleanup_types)
+                self._start_scheduled_cleanup(schedule_config["id"], cleanup_types)
 
             # Add to scheduler based on type
             if schedule_type == "daily":
@@ -183,11 +187,35 @@ class SchedulingService:
         except Exception as e:
             self.logger.error(f"Error adding schedule to scheduler: {e}")
 
+    def _start_scheduled_cleanup(
+        self, schedule_id: str, cleanup_types: List[str]
+    ) -> None:
+        """Start a scheduled cleanup unless another one is still running"""
+        if self.cleanup_thread and self.cleanup_thread.is_alive():
+            self.logger.info(f"Cleanup still running, skipping: {schedule_id}")
+            return
+
+        self.cleanup_thread = Thread(
+            target=self._run_scheduled_cleanup,
+            args=(schedule_id, cleanup_types),
+            name="syspilot-scheduled-cleanup",
+            daemon=True,
+        )
+        self.cleanup_thread.start()
+
     def _run_scheduled_cleanup(
         self, schedule_id: str, cleanup_types: List[str]
     ) -> None:
         """Run a scheduled cleanup operation"""
         try:
+            # Defer while the system is under pressure, but not forever
+            max_delay = self.config.get("cleanup", "pressure_throttle", {}).get(
+                "max_delay", 1800
+            )
+            self.cleanup_service.wait_for_idle(max_delay, stop_event=self.stop_event)
+            if self.stop_event.is_set():
+                return
+
             self.logger.info(f"Running scheduled cleanup: {schedule_id}")
 
             # Update last run time
@@ -248,6 +276,8 @@ class SchedulingService:
 
             if self.scheduler_thread:
                 self.scheduler_thread.join(timeout=5)
+            if self.cleanup_thread:
+                self.cleanup_thread.join(timeout=5)
 
             schedule.clear()
             self.logger.info("Scheduler stopped")
@@ -0,0 +1,216 @@
+"""
+Thumbnail cache validator
+
+Implements the freedesktop.org thumbnail specification check: every
+thumbnail records its source in a ``Thumb::URI`` PNG text chunk, so a
+thumbnail is only worth keeping while that source still exists.
+"""
+
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from ..utils.logger import get_logger
+from ..utils.priority import set_idle_priority
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+CHUNK_HEADER = struct.Struct(">I4s")
+TEXT_CHUNKS = (b"tEXt", b"zTXt", b"iTXt")
+# Text chunks larger than this are not thumbnail metadata
+MAX_TEXT_CHUNK = 64 * 1024
+
+
+def read_thumbnail_metadata(path: str) -> Dict[str, str]:
+    """
+    Read the text metadata of a PNG thumbnail without decoding pixels
+
+    Only the chunk headers before the first IDAT chunk are visited; image data
+    is never read.
+
+    Args:
+        path: Thumbnail path
+
+    Returns:
+        Mapping of text keys (e.g. ``Thumb::URI``) to values
+    """
+    metadata = {}
+
+    with open(path, "rb") as f:
+        if f.read(8) != PNG_SIGNATURE:
+            return metadata
+
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                break
+
+            length, chunk_type = CHUNK_HEADER.unpack(header)
+            if chunk_type in (b"IDAT", b"IEND"):
+                break
+
+            if chunk_type in TEXT_CHUNKS and length <= MAX_TEXT_CHUNK:
+                key, value = _parse_text_chunk(chunk_type, f.read(length))
+                if key:
+                    metadata[key] = value
+                f.seek(4, os.SEEK_CUR)  # CRC
+            else:
+                f.seek(length + 4, os.SEEK_CUR)
+
+    return metadata
+
+
+def _parse_text_chunk(chunk_type: bytes, data: bytes) -> Tuple[str, str]:
+    """Decode a tEXt, zTXt or iTXt chunk into a key/value pair"""
+    key, sep, rest = data.partition(b"\x00")
+    if not sep:
+        return "", ""
+
+    try:
+        if chunk_type == b"tEXt":
+            value = rest.decode("latin-1")
+        elif chunk_type == b"zTXt":
+            value = zlib.decompress(rest[1:]).decode("latin-1")
+        else:
+            compressed, rest = rest[0], rest[2:]
+            _, _, rest = rest.partition(b"\x00")  # language tag
+            _, _, text = rest.partition(b"\x00")  # translated keyword
+            if compressed:
+                text = zlib.decompress(text)
+            value = text.decode("utf-8")
+    except (zlib.error, UnicodeDecodeError, IndexError):
+        return "", ""
+
+    return key.decode("latin-1"), value
+
+
+def uri_to_path(uri: str) -> Optional[str]:
+    """Convert a local file:// URI to a path, None for other schemes"""
+    parsed = urlparse(uri)
+    if parsed.scheme != "file" or parsed.netloc not in ("", "localhost"):
+        return None
+    return unquote(parsed.path)
+
+
+class ThumbnailCleaner:
+    """Delete thumbnails whose source file is gone or has changed"""
+
+    def __init__(
+        self,
+        thumbnail_dir: str,
+        unverifiable_max_age_days: int = 30,
+        workers: int = 4,
+    ):
+        """
+        Initialize thumbnail cleaner
+
+        Args:
+            thumbnail_dir: Thumbnail cache root (e.g. ``~/.cache/thumbnails``)
+            unverifiable_max_age_days: Age limit for thumbnails without a
+                readable local source URI
+            workers: Worker threads used for PNG parsing and source checks
+        """
+        self.thumbnail_dir = thumbnail_dir
+        self.unverifiable_max_age = unverifiable_max_age_days * 24 * 60 * 60
+        self.workers = workers
+        self.logger = get_logger(__name__)
+
+    def run(self) -> Dict:
+        """
+        Validate every thumbnail and remove orphaned or stale ones
+
+        Returns:
+            Dictionary with checked/removed counts and bytes freed
+        """
+        result = {"checked": 0, "removed": 0, "bytes_freed": 0}
+        thumbnails = list(self._iter_thumbnails())
+        if not thumbnails:
+            return result
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, initializer=set_idle_priority
+        ) as pool:
+            metadata = list(pool.map(self._read_metadata, thumbnails, chunksize=64))
+
+            # Many thumbnails (normal/large/fail) share one source: stat each once
+            sources = set()
+            for meta in metadata:
+                source = uri_to_path(meta.get("Thumb::URI", "")) if meta else None
+                if source:
+                    sources.add(source)
+
+            source_mtimes = dict(
+                zip(sources, pool.map(self._source_mtime, sources, chunksize=64))
+            )
+
+        now = time.time()
+        for thumbnail, meta in zip(thumbnails, metadata):
+            result["checked"] += 1
+            if self._is_invalid(thumbnail, meta, source_mtimes, now):
+                self._remove(thumbnail, result)
+
+        return result
+
+    def _iter_thumbnails(self) -> Iterable[str]:
+        """Yield thumbnail PNG paths under the cache root"""
+        for root, dirs, files in os.walk(self.thumbnail_dir):
+            for name in files:
+                if name.endswith(".png"):
+                    yield os.path.join(root, name)
+
+    def _read_metadata(self, path: str) -> Optional[Dict[str, str]]:
+        """Read thumbnail metadata, None when the file cannot be parsed"""
+        try:
+            return read_thumbnail_metadata(path)
+        except (OSError, struct.error):
+            return None
+
+    @staticmethod
+    def _source_mtime(path: str) -> Optional[int]:
+        """Get a source file's mtime, None if it no longer exists"""
+        try:
+            return int(os.stat(path).st_mtime)
+        except OSError:
+            return None
+
+    def _is_invalid(
+        self,
+        thumbnail: str,
+        meta: Optional[Dict[str, str]],
+        source_mtimes: Dict[str, Optional[int]],
+        now: float,
+    ) -> bool:
+        """Decide whether a thumbnail should be removed"""
+        source = uri_to_path(meta.get("Thumb::URI", "")) if meta else None
+
+        if source is None:
+            # Remote or unreadable source: fall back to the age rule
+            try:
+                return now - os.path.getmtime(thumbnail) > self.unverifiable_max_age
+            except OSError:
+                return False
+
+        source_mtime = source_mtimes.get(source)
+        if source_mtime is None:
+            return True
+
+        # The spec marks a thumbnail stale once the source mtime changes
+        recorded = meta.get("Thumb::MTime")
+        if recorded and recorded.isdigit():
+            return int(recorded) != source_mtime
+
+        return False
+
+    def _remove(self, path: str, result: Dict):
+        """Remove a thumbnail and record it in the result"""
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            result["removed"] += 1
+            result["bytes_freed"] += size
+            self.logger.debug(f"Removed thumbnail: {path}")
+        except OSError as e:
+            self.logger.debug(f"Could not remove thumbnail {path}: {e}")
@@ -32,6 +32,14 @@ class ConfigManager:
                 "/var/log/*.log",
                 "~/.xsession-errors*",
             ],
+            "log_dirs": [
+                "/var/log",
+            ],
+            "log_dir_budget_mb": 256,
+            "log_compress_delay_days": 1,
+            "journal_dir": "/var/log/journal",
+            "journal_max_size_mb": 512,
+            "journal_max_age_days": 30,
             "package_cache": [
                 "/var/cache/apt",
                 "/var/cache/debconf",
@@ -43,14 +51,78 @@ class ConfigManager:
             ],
             "max_age_days": 30,
             "min_free_space_mb": 1000,
+            "pressure_throttle": {
+                "enabled": True,
+                # "some" stall percentages that count as busy
+                "thresholds": {"cpu": 40, "memory": 10, "io": 30},
+                "max_wait": 300,  # total pause per cleanup run
+                "max_delay": 1800,  # deferral of a scheduled cleanup
+            },
         },
         "monitoring": {
             "update_interval": 2,
             "history_size": 100,
+            "history_rollups": {
+                "1m": {"interval": 60, "size": 1440},
+                "1h": {"interval": 3600, "size": 720},
+            },
+            "persistent_history": True,
+            "persistent_history_size": 86400,
+            "cpu_sample_interval": 1,
+            "collector_intervals": {
+                "disk_usage": 5,
+                "cpu_temperature": 10,
+                "top_processes": 5,
+            },
+            "cgroups": {
+                "enabled": True,
+            },
+            # update_interval is the normal interval; it shortens near alert
+            # thresholds and lengthens while the system is idle
+            "adaptive_interval": {
+                "enabled": True,
+                "min_interval": 0.5,
+                "max_interval": 30,
+            },
+            "overhead_budget": {
+                "enabled": True,
+                "cpu_percent": 1.0,  # of one core, spent in collectors
+                "window": 60,
+                "max_slowdown": 8,
+            },
+            "process_history": {
+                "enabled": True,
+                "max_processes": 32,
+                "size": 300,
+                "top": 5,
+                "names": [],
+            },
             "alert_thresholds": {
                 "cpu_percent": 80,
                 "memory_percent": 85,
                 "disk_percent": 90,
+                "cpu_pressure_percent": 50,
+                "memory_pressure_percent": 10,
+                "io_pressure_percent": 30,
+            },
+            "alert_rules": [],
+            "anomaly_detection": {
+                "enabled": True,
+                "metrics": [
+                    "cpu",
+                    "memory",
+                    "swap",
+                    "load_1min",
+                    "cpu_temperature",
+                    "network_sent_rate",
+                    "network_recv_rate",
+                ],
+                "z_threshold": 4.0,
+                "alpha": 0.05,
+                "warmup": 30,
+                "min_std": 1.0,
+                "seasonal": True,
+                "cooldown": 300,
             },
         },
         "ui": {
@@ -63,6 +135,20 @@ class ConfigManager:
             "auto_cleanup": False,
             "cleanup_schedule": "0 2 * * *",  # 2 AM daily
             "monitoring_enabled": True,
+            "metrics_exporter": {
+                "enabled": False,
+                "host": "127.0.0.1",
+                "port": 9877,
+            },
+            "control_socket": {
+                "enabled": True,
+                "path": "~/.config/syspilot/daemon.sock",
+            },
+            "shared_memory": {
+                "enabled": True,
+                "name": None,  # defaults to syspilot-<uid>
+                "history_size": 300,
+            },
         },
         "advanced": {
             "debug_mode": False,
@@ -215,6 +301,11 @@ class ConfigManager:
         log_files = self.get("cleanup", "log_files", [])
         return [os.path.expanduser(f) for f in log_files]
 
+    def get_log_dirs(self) -> list:
+        """Get list of log directories to compact"""
+        log_dirs = self.get("cleanup", "log_dirs", [])
+        return [os.path.expanduser(d) for d in log_dirs]
+
     def get_package_cache(self) -> list:
         """Get list of package cache directories to clean"""
         package_cache = self.get("cleanup", "package_cache", [])
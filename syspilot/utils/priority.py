@@ -0,0 +1,73 @@
+"""
+Thread priority utilities
+"""
+
+import os
+import threading
+from typing import Any, Callable
+
+from .logger import get_logger
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is a hard dependency
+    psutil = None
+
+logger = get_logger(__name__)
+
+
+def set_idle_priority():
+    """
+    Lower the CPU and I/O priority of the calling thread
+
+    On Linux both niceness and the I/O class are per-thread, so only the
+    calling thread is affected. Failures are logged and ignored, since running
+    at normal priority is always a safe fallback.
+    """
+    tid = threading.get_native_id()
+
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Could not lower CPU priority: {e}")
+
+    if psutil is None or not hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+        return
+
+    try:
+        psutil.Process(tid).ionice(psutil.IOPRIO_CLASS_IDLE)
+    except (psutil.Error, OSError) as e:
+        logger.debug(f"Could not lower I/O priority: {e}")
+
+
+def run_at_idle_priority(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a function in a helper thread at idle CPU and I/O priority
+
+    Priority cannot be raised again without privileges, so the work is moved
+    to a short-lived thread instead of demoting the caller.
+
+    Args:
+        func: Function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value (exceptions are re-raised in the caller)
+    """
+    result = {}
+
+    def _target():
+        set_idle_priority()
+        try:
+            result["value"] = func(*args, **kwargs)
+        except BaseException as e:  # re-raised in the calling thread
+            result["error"] = e
+
+    worker = threading.Thread(target=_target, name="syspilot-idle", daemon=True)
+    worker.start()
+    worker.join()
+
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
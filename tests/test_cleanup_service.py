@@ -0,0 +1,209 @@
+"""
+Tests for cleanup engines
+"""
+
+import gzip
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+import zlib
+from urllib.parse import quote
+
+from syspilot.services.log_compactor import LogCompactor
+from syspilot.services.thumbnail_cleaner import (
+    ThumbnailCleaner,
+    read_thumbnail_metadata,
+)
+
+
+def _png_chunk(chunk_type, data):
+    crc = zlib.crc32(chunk_type + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def write_thumbnail(path, source_uri, source_mtime=None):
+    """Write a minimal PNG carrying freedesktop thumbnail metadata"""
+    ihdr = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    chunks = [_png_chunk(b"IHDR", ihdr)]
+    chunks.append(_png_chunk(b"tEXt", b"Thumb::URI\x00" + source_uri.encode()))
+    if source_mtime is not None:
+        chunks.append(
+            _png_chunk(b"tEXt", b"Thumb::MTime\x00" + str(source_mtime).encode())
+        )
+    chunks.append(_png_chunk(b"IDAT", zlib.compress(b"\x00\x00")))
+    chunks.append(_png_chunk(b"IEND", b""))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n" + b"".join(chunks))
+    return path
+
+
+class TestLogCompactor(unittest.TestCase):
+    """Test rotated log and journal compaction"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_dir = os.path.join(self.temp_dir, "log")
+        self.journal_dir = os.path.join(self.log_dir, "journal", "machine")
+        os.makedirs(self.journal_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, path, size, age_days=0):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        mtime = time.time() - age_days * 24 * 60 * 60
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def _compactor(self, **kwargs):
+        options = {
+            "dir_budget_bytes": 0,
+            "journal_dir": os.path.join(self.log_dir, "journal"),
+        }
+        options.update(kwargs)
+        return LogCompactor([self.log_dir], **options)
+
+    def test_compresses_rotated_logs(self):
+        """Test rotated logs are gzipped and active logs are left alone"""
+        active = self._write(os.path.join(self.log_dir, "syslog"), 1000, 5)
+        rotated = self._write(os.path.join(self.log_dir, "syslog.1"), 1000, 5)
+
+        result = self._compactor().run()
+
+        self.assertEqual(result["compressed"], 1)
+        self.assertTrue(os.path.exists(active))
+        self.assertFalse(os.path.exists(rotated))
+        with gzip.open(rotated + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"x" * 1000)
+        self.assertAlmostEqual(
+            os.path.getmtime(rotated + ".gz"), time.time() - 5 * 86400, delta=5
+        )
+
+    @unittest.skipUnless(os.geteuid() == 0, "needs root to change owners")
+    def test_compressed_log_keeps_owner(self):
+        """Test the compressed file belongs to the log's owner"""
+        self._write(os.path.join(self.log_dir, "syslog"), 100)
+        rotated = self._write(os.path.join(self.log_dir, "syslog.1"), 100, 5)
+        os.chown(rotated, 65534, 65534)
+
+        self._compactor().run()
+
+        st = os.stat(rotated + ".gz")
+        self.assertEqual((st.st_uid, st.st_gid), (65534, 65534))
+
+    def test_respects_compress_delay(self):
+        """Test freshly rotated logs are not compressed yet"""
+        self._write(os.path.join(self.log_dir, "kern.log"), 100)
+        rotated = self._write(os.path.join(self.log_dir, "kern.log.1"), 100)
+
+        result = self._compactor(compress_delay_days=1).run()
+
+        self.assertEqual(result["compressed"], 0)
+        self.assertTrue(os.path.exists(rotated))
+
+    def test_skips_numbered_files_without_log(self):
+        """Test numbered files with no active log next to them are kept"""
+        mysql_dir = os.path.join(self.log_dir, "mysql")
+        os.makedirs(mysql_dir)
+        binlog = self._write(os.path.join(mysql_dir, "mysql-bin.000123"), 400, 5)
+
+        result = self._compactor(dir_budget_bytes=100).run()
+
+        self.assertEqual(result["compressed"], 0)
+        self.assertEqual(result["deleted"], 0)
+        self.assertTrue(os.path.exists(binlog))
+
+    def test_enforces_directory_budget(self):
+        """Test oldest rotated logs are removed until under budget"""
+        self._write(os.path.join(self.log_dir, "app.log"), 400)
+        oldest = self._write(os.path.join(self.log_dir, "app.log.3.gz"), 400, 3)
+        older = self._write(os.path.join(self.log_dir, "app.log.2.gz"), 400, 2)
+
+        result = self._compactor(dir_budget_bytes=900).run()
+
+        self.assertEqual(result["deleted"], 1)
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(os.path.join(self.log_dir, "app.log")))
+
+    def test_vacuums_archived_journal_files(self):
+        """Test archived journals are vacuumed and the active journal kept"""
+        active = self._write(os.path.join(self.journal_dir, "system.journal"), 500)
+        old = self._write(
+            os.path.join(self.journal_dir, "system@0001-0002.journal"), 500, 40
+        )
+        recent = self._write(
+            os.path.join(self.journal_dir, "system@0003-0004.journal"), 500, 1
+        )
+
+        result = self._compactor(journal_max_age_days=30).run()
+
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(recent))
+        self.assertTrue(os.path.exists(active))
+        self.assertEqual(result["bytes_freed"], 500)
+
+        result = self._compactor(journal_max_bytes=600).run()
+
+        self.assertFalse(os.path.exists(recent))
+        self.assertTrue(os.path.exists(active))
+
+
+class TestThumbnailCleaner(unittest.TestCase):
+    """Test thumbnail validation against source files"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.thumb_dir = os.path.join(self.temp_dir, "thumbnails", "normal")
+        os.makedirs(self.thumb_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _source(self, name):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as f:
+            f.write("data")
+        return path, "file://" + quote(path)
+
+    def test_reads_uri_from_header(self):
+        """Test Thumb::URI is read from the PNG text chunk"""
+        thumb = write_thumbnail(
+            os.path.join(self.thumb_dir, "a.png"), "file:///tmp/a b.jpg", 42
+        )
+
+        metadata = read_thumbnail_metadata(thumb)
+
+        self.assertEqual(metadata["Thumb::URI"], "file:///tmp/a b.jpg")
+        self.assertEqual(metadata["Thumb::MTime"], "42")
+
+    def test_removes_orphans_and_keeps_valid(self):
+        """Test orphaned and stale thumbnails go while valid ones stay"""
+        source, uri = self._source("photo one.jpg")
+        mtime = int(os.stat(source).st_mtime)
+        valid = write_thumbnail(os.path.join(self.thumb_dir, "v.png"), uri, mtime)
+        stale = write_thumbnail(os.path.join(self.thumb_dir, "s.png"), uri, 1)
+        orphan = write_thumbnail(
+            os.path.join(self.thumb_dir, "o.png"), uri.replace("one", "gone")
+        )
+        remote = write_thumbnail(
+            os.path.join(self.thumb_dir, "r.png"), "smb://server/share/x.jpg"
+        )
+
+        result = ThumbnailCleaner(os.path.join(self.temp_dir, "thumbnails")).run()
+
+        self.assertEqual(result["checked"], 4)
+        self.assertEqual(result["removed"], 2)
+        self.assertTrue(os.path.exists(valid))
+        self.assertTrue(os.path.exists(remote))
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(orphan))
+
+
+if __name__ == "__main__":
+    unittest.main()
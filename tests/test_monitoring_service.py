@@ -0,0 +1,1256 @@
+"""
+Tests for the monitoring service and its engine components
+"""
+
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+import unittest
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from syspilot.core.control import (
+    CODEC_JSON,
+    ControlError,
+    ControlServer,
+    DaemonClient,
+    RemoteMonitoringService,
+    connect_monitoring_service,
+)
+from syspilot.monitoring import analytics
+from syspilot.monitoring import history as history_module
+from syspilot.monitoring.adaptive import AdaptiveInterval
+from syspilot.monitoring.alerts import AlertEngine, AlertRule
+from syspilot.monitoring.anomaly import AnomalyDetector
+from syspilot.monitoring.collectors import CollectorRegistry
+from syspilot.monitoring.cpu_sampler import CpuSampler, CpuUsage
+from syspilot.monitoring.engine import MonitoringEngine
+from syspilot.monitoring.exporter import MetricsExporter
+from syspilot.monitoring.history import ColumnarHistory
+from syspilot.monitoring.pressure import BusySignal
+from syspilot.monitoring.process_history import ProcessHistory
+from syspilot.monitoring.profiling import CollectorProfiler, LatencyHistogram
+from syspilot.monitoring.rates import (
+    DISK_RATE_FIELDS,
+    NETWORK_RATE_FIELDS,
+    UNIT_RATE_FIELDS,
+    RateTracker,
+    compute_disk_rates,
+    compute_network_rates,
+    compute_unit_rates,
+)
+from syspilot.monitoring.rollups import RollupHistory
+from syspilot.monitoring.shared import SharedSnapshotPublisher, SharedSnapshotReader
+from syspilot.monitoring.snapshot import SystemSnapshot
+from syspilot.monitoring.tsdb import TimeSeriesStore
+from syspilot.platforms.linux.cgroups import CgroupUnits
+from syspilot.platforms.linux.pressure import PressureReader, PressureStall
+from syspilot.platforms.linux.process_table import ProcessTable
+from syspilot.platforms.linux.procfs import ProcfsReader
+from syspilot.platforms.linux.thermal import ThermalSensors
+from syspilot.services.monitoring_service import THRESHOLD_ALERTS, MonitoringService
+from syspilot.utils.config import ConfigManager
+
+
+class FakeCpuTimes:
+    """Scripted per-CPU time readings ordered as CPU_MODES"""
+
+    def __init__(self, readings):
+        self.readings = list(readings)
+
+    def __call__(self):
+        return self.readings.pop(0)
+
+
+class TestCpuSampler(unittest.TestCase):
+    """Test the background CPU sampler"""
+
+    def test_percent_from_last_delta(self):
+        """Test usage is computed from the delta of the last two readings"""
+        source = FakeCpuTimes(
+            [
+                [(0, 0, 0, 0, 0, 0, 0, 0), (0, 0, 0, 0, 0, 0, 0, 0)],
+                [(30, 0, 10, 50, 10, 0, 0, 0), (0, 0, 0, 100, 0, 0, 0, 0)],
+            ]
+        )
+        sampler = CpuSampler(source=source)
+
+        self.assertIsNone(sampler.sample())
+        sampler.sample()
+
+        self.assertEqual(sampler.cpu_percent(), 20.0)
+        self.assertEqual(sampler.cpu_percent(percpu=True), [40.0, 0.0])
+
+        modes = sampler.cpu_times_percent()
+        self.assertEqual(modes["user"], 15.0)
+        self.assertEqual(modes["iowait"], 5.0)
+        self.assertEqual(sampler.cpu_times_percent(percpu=True)[0]["system"], 10.0)
+
+    def test_no_window_is_zero(self):
+        """Test a sampler without any readings reports idle"""
+        sampler = CpuSampler(source=FakeCpuTimes([[(0,) * 8]]))
+
+        self.assertEqual(sampler.cpu_percent(), 0.0)
+
+    def test_background_thread(self):
+        """Test the background thread keeps refreshing the window"""
+        sampler = CpuSampler(interval=0.01)
+        sampler.start()
+        try:
+            time.sleep(0.05)
+            self.assertIsNotNone(sampler._usage)
+        finally:
+            sampler.stop()
+
+
+class TestColumnarHistory(unittest.TestCase):
+    """Test the ring-buffer history store"""
+
+    def test_wraps_and_keeps_order(self):
+        """Test the newest samples are returned oldest first after wrapping"""
+        history = ColumnarHistory(["value"], 3)
+        for i in range(5):
+            history.append(1000.0 + i, i * 10)
+
+        view = history.view()
+        self.assertEqual(len(history), 3)
+        self.assertEqual(list(view["timestamp"]), [1002.0, 1003.0, 1004.0])
+        self.assertEqual(list(view["value"]), [20.0, 30.0, 40.0])
+        self.assertEqual(list(history.column("value", limit=2)), [30.0, 40.0])
+        self.assertEqual(history.latest(), {"timestamp": 1004.0, "value": 40.0})
+
+    def test_column_count_checked(self):
+        """Test appends must provide one value per column"""
+        history = ColumnarHistory(["bytes_sent", "bytes_recv"], 10)
+
+        with self.assertRaises(ValueError):
+            history.append(0.0, 1)
+
+
+class TestRollupHistory(unittest.TestCase):
+    """Test the downsampling tiers"""
+
+    def setUp(self):
+        self.history = RollupHistory(
+            ["value"], 10, {"1m": {"interval": 60, "size": 100}}
+        )
+
+    def test_bucket_aggregates(self):
+        """Test closed buckets keep min, max, mean and last"""
+        for timestamp, value in ((0, 10), (20, 30), (40, 20), (60, 50)):
+            self.history.append(timestamp, value)
+
+        minute = self.history.view(resolution="1m")
+        self.assertEqual(list(minute["timestamp"]), [0.0])
+        self.assertEqual(minute["value_min"][0], 10.0)
+        self.assertEqual(minute["value_max"][0], 30.0)
+        self.assertEqual(minute["value_mean"][0], 20.0)
+        self.assertEqual(minute["value_last"][0], 20.0)
+
+    def test_window_picks_resolution(self):
+        """Test long windows are served from the rollup tier"""
+        for second in range(0, 1200, 10):
+            self.history.append(second, second)
+
+        short = self.history.window(60, now=1190)
+        long = self.history.window(600, now=1190)
+
+        self.assertEqual(short["resolution"], "raw")
+        self.assertEqual(list(short["value"])[0], 1130.0)
+        self.assertEqual(long["resolution"], "1m")
+        self.assertEqual(long["timestamp"][-1], 1080.0)
+
+
+class TestAnalytics(unittest.TestCase):
+    """Test window statistics"""
+
+    TIMESTAMPS = [0.0, 10.0, 20.0, 30.0, 40.0]
+    VALUES = [10.0, 90.0, 50.0, 95.0, 30.0]
+
+    def _check(self):
+        summary = analytics.summarize(self.TIMESTAMPS, self.VALUES, threshold=80)
+
+        self.assertEqual(summary["count"], 5)
+        self.assertEqual(summary["mean"], 55.0)
+        self.assertEqual(summary["p50"], 50.0)
+        self.assertAlmostEqual(summary["p95"], 94.0)
+        self.assertEqual(summary["max"], 95.0)
+        self.assertEqual(summary["rate"], 0.5)
+        self.assertEqual(summary["time_above"], 20.0)
+
+    def test_summary(self):
+        """Test the summary statistics"""
+        self._check()
+
+    def test_pure_python_matches(self):
+        """Test the fallback without NumPy gives the same results"""
+        numpy = analytics.np
+        analytics.np = None
+        try:
+            self._check()
+        finally:
+            analytics.np = numpy
+
+    def test_empty_window(self):
+        """Test an empty window only reports its count"""
+        self.assertEqual(analytics.summarize([], []), {"count": 0})
+
+
+class TestAlertEngine(unittest.TestCase):
+    """Test stateful alert rules"""
+
+    def _states(self, rule, samples):
+        engine = AlertEngine([rule])
+        return [
+            [event["state"] for event in engine.evaluate({rule.metric: value}, t)]
+            for t, value in samples
+        ]
+
+    def test_hysteresis(self):
+        """Test a value hovering at the threshold fires once"""
+        rule = AlertRule("cpu_high", "cpu", 80, clear=70)
+        states = self._states(rule, enumerate([85, 79, 81, 75, 69, 85]))
+
+        self.assertEqual(states, [["firing"], [], [], [], ["resolved"], ["firing"]])
+
+    def test_sustained_for(self):
+        """Test a duration rule fires only after the condition holds"""
+        rule = AlertRule("cpu_sustained", "cpu", 80, duration=20)
+        states = self._states(rule, [(0, 90), (10, 90), (15, 50), (20, 90), (40, 90)])
+
+        self.assertEqual(states, [[], [], [], [], ["firing"]])
+
+    def test_cooldown(self):
+        """Test a rule does not re-fire within its cooldown"""
+        rule = AlertRule("disk_full", "disk", 90, cooldown=60)
+        states = self._states(rule, [(0, 95), (10, 80), (20, 95), (70, 95)])
+
+        self.assertEqual(states, [["firing"], ["resolved"], [], ["firing"]])
+
+    def test_rate_rule(self):
+        """Test rate rules fire on change per second"""
+        rule = AlertRule("memory_growth", "memory", 1.0, kind="rate")
+        states = self._states(rule, [(0, 10), (10, 15), (20, 40)])
+
+        self.assertEqual(states, [[], [], ["firing"]])
+        self.assertEqual(rule.value, 2.5)
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    """Test the sampling interval follows system activity"""
+
+    def setUp(self):
+        self.adaptive = AdaptiveInterval(2.0, min_interval=0.5, max_interval=30)
+        self.thresholds = {"cpu": 80.0, "memory": 85.0}
+        self.now = 1000.0
+
+    def _sample(self, cpu, memory=30.0):
+        interval = self.adaptive.update(
+            {"cpu": cpu, "memory": memory}, self.thresholds, self.now
+        )
+        self.now += interval
+        return interval
+
+    def test_backs_off_while_idle(self):
+        """Test flat metrics stretch the interval up to their headroom"""
+        intervals = [self._sample(5.0) for _ in range(12)]
+        self.assertEqual(intervals[0], 3.0)
+        # Memory at 30 of the 68 counted as near its threshold
+        self.assertAlmostEqual(intervals[-1], 30 * (1 - 30 / 68))
+        self.assertEqual(self.adaptive.reason, "idle")
+
+    def test_noise_and_slow_gauges_back_off(self):
+        """Test a noisy CPU and a half-full disk still let the interval grow"""
+        noise = random.Random(1)
+        thresholds = {"cpu": 80.0, "memory": 85.0, "disk": 90.0}
+        intervals = []
+        for _ in range(100):
+            metrics = {"cpu": noise.uniform(5, 25), "memory": 20.0, "disk": 50.0}
+            intervals.append(self.adaptive.update(metrics, thresholds, self.now))
+            self.now += intervals[-1]
+
+        self.assertGreater(min(intervals[20:]), 10.0)
+
+    def test_speeds_up_near_threshold_or_fast_change(self):
+        """Test approaching a threshold or a spike shortens the interval"""
+        for _ in range(5):
+            self._sample(5.0)
+        self.assertEqual(self._sample(70.0), 0.5)  # within 80% of the threshold
+        self.assertEqual(self._sample(70.0), 0.5)
+
+        # Back to the configured interval one step at a time
+        self.assertEqual(self._sample(50.0), 1.0)
+        self.assertEqual(self.adaptive.reason, "normal")
+        self.assertEqual(self._sample(50.0), 2.0)
+
+        self.adaptive.interval = 30.0
+        # Rising fast enough to reach the threshold during a long sleep
+        self.assertEqual(self._sample(60.0), 0.5)
+
+
+class TestAnomalyDetector(unittest.TestCase):
+    """Test streaming anomaly detection"""
+
+    def test_spike_is_flagged(self):
+        """Test a spike scores high once the baseline has warmed up"""
+        detector = AnomalyDetector(["cpu"], warmup=20, seasonal=False)
+        scores = [detector.score("cpu", 20 + (i % 5), 1000.0 + i) for i in range(40)]
+
+        self.assertIsNone(scores[0])
+        self.assertLess(abs(scores[-1]), 4)
+        self.assertGreater(detector.score("cpu", 95, 1040.0), 4)
+
+    def test_findings_feed_alerts(self):
+        """Test z-scores drive anomaly alert rules"""
+        detector = AnomalyDetector(["memory"], warmup=10, seasonal=False)
+        engine = AlertEngine([AlertRule("memory_anomaly", "memory_anomaly", 4.0)])
+
+        events = []
+        for i, value in enumerate([50.0] * 15 + [90.0]):
+            events += engine.evaluate(
+                detector.scores({"memory": value}, float(i)), float(i)
+            )
+
+        self.assertEqual([event["state"] for event in events], ["firing"])
+
+
+class TestRateTracker(unittest.TestCase):
+    """Test per-device rates from counter deltas"""
+
+    def test_disk_rates(self):
+        """Test throughput, IOPS, utilization and await per disk"""
+        tracker = RateTracker(DISK_RATE_FIELDS, compute_disk_rates)
+        disk = namedtuple(
+            "DiskIo",
+            "read_count write_count read_bytes write_bytes "
+            "read_time write_time busy_time",
+        )
+
+        self.assertEqual(tracker.update({"sda": disk(0, 0, 0, 0, 0, 0, 0)}, 10.0), {})
+        rates = tracker.update(
+            {
+                "sda": disk(20, 10, 8192, 4096, 60, 30, 500),
+                "sdb": disk(1, 1, 1, 1, 1, 1, 1),
+            },
+            12.0,
+        )
+
+        self.assertEqual(list(rates), ["sda"])
+        self.assertEqual(rates["sda"]["read_bytes"], 4096)
+        self.assertEqual(rates["sda"]["read_iops"], 10)
+        self.assertEqual(rates["sda"]["utilization"], 25)
+        self.assertEqual(rates["sda"]["await_ms"], 3)
+
+    def test_network_rates_skip_counter_resets(self):
+        """Test interface rates and that counters going backwards are skipped"""
+        tracker = RateTracker(NETWORK_RATE_FIELDS, compute_network_rates)
+        nic = namedtuple(
+            "NetIo",
+            "bytes_sent bytes_recv packets_sent packets_recv "
+            "errin errout dropin dropout",
+        )
+        zero = nic(0, 0, 0, 0, 0, 0, 0, 0)
+
+        tracker.update({"eth0": zero, "wlan0": nic(9, 9, 9, 9, 0, 0, 0, 0)}, 0.0)
+        rates = tracker.update(
+            {"eth0": nic(2048, 1024, 4, 2, 1, 0, 1, 0), "wlan0": zero}, 2.0
+        )
+
+        self.assertEqual(list(rates), ["eth0"])
+        self.assertEqual(rates["eth0"]["tx_bytes"], 1024)
+        self.assertEqual(rates["eth0"]["rx_bytes"], 512)
+        self.assertEqual(rates["eth0"]["errors"], 0.5)
+        self.assertEqual(RateTracker.total(rates, "tx_bytes"), 1024)
+
+
+class TestCollectorProfiler(unittest.TestCase):
+    """Test collector timing and the overhead budget"""
+
+    def test_histogram_percentiles(self):
+        """Test percentiles come from bucket bounds, capped at the maximum"""
+        histogram = LatencyHistogram()
+        for duration in [20_000] * 98 + [3_000_000, 40_000_000]:
+            histogram.record(duration)
+
+        summary = histogram.to_dict()
+        self.assertEqual(summary["calls"], 100)
+        self.assertEqual(summary["p50_ms"], 0.025)
+        self.assertEqual(summary["p99_ms"], 5.0)
+        self.assertEqual(summary["max_ms"], 40.0)
+
+    def test_budget_slows_costliest_collector(self):
+        """Test the costliest collector backs off and later recovers"""
+        registry = CollectorRegistry(CollectorProfiler(budget_percent=1.0, window=10))
+        registry.register("cheap", lambda: 1, 0)
+        registry.register("costly", lambda: 2, 5)
+        registry.register("boot", lambda: 3, None)
+        profiler = registry.profiler
+        start = profiler._window_start
+
+        registry.run_due(start)
+        profiler.record("costly", 10**6, 5 * 10**8)  # 5% of a core over 10 s
+        profiler.enforce(registry.collectors, start + 10)
+        self.assertEqual(registry.collectors["costly"].interval, 10)
+        self.assertEqual(registry.collectors["cheap"].interval, 0)
+
+        report = profiler.report(registry.collectors)
+        self.assertGreater(report["overhead_percent"], 1.0)
+        self.assertEqual(report["collectors"]["costly"]["base_interval"], 5)
+        self.assertEqual(report["collectors"]["cheap"]["calls"], 1)
+
+        # A quiet window restores the configured interval
+        profiler.enforce(registry.collectors, start + 20)
+        self.assertEqual(registry.collectors["costly"].interval, 5)
+
+
+class TestMetricsExporter(unittest.TestCase):
+    """Test the OpenMetrics endpoint"""
+
+    def setUp(self):
+        self.service = Mock()
+        self.service.alert_engine = AlertEngine()
+        self.service.last_snapshot = SystemSnapshot(
+            timestamp=1700000000.0,
+            cpu=CpuUsage(42.5, percpu=[40.0, 45.0]),
+            disk_rates={"sda": dict.fromkeys(DISK_RATE_FIELDS, 1.5)},
+            load_avg=(0.5, 1.0, 1.5),
+        )
+        self.exporter = MetricsExporter(self.service, port=0)
+        self.exporter.start()
+        self.addCleanup(self.exporter.stop)
+
+    def test_scrape(self):
+        """Test /metrics serves the snapshot in OpenMetrics format"""
+        with urllib.request.urlopen(self.exporter.url, timeout=5) as response:
+            content_type = response.headers["Content-Type"]
+            body = response.read().decode()
+
+        self.assertTrue(content_type.startswith("application/openmetrics-text"))
+        self.assertIn("# TYPE syspilot_cpu_usage_percent gauge", body)
+        self.assertIn("syspilot_cpu_usage_percent 42.5\n", body)
+        self.assertIn('syspilot_cpu_core_usage_percent{cpu="1"} 45\n', body)
+        self.assertIn("# UNIT syspilot_disk_busy_percent percent", body)
+        self.assertIn('syspilot_disk_busy_percent{device="sda"} 1.5\n', body)
+        self.assertIn('syspilot_disk_await_seconds{device="sda"} 0.0015\n', body)
+        self.assertIn('syspilot_load_average{period="15m"} 1.5', body)
+        self.assertTrue(body.endswith("# EOF\n"))
+
+    def test_body_cached_per_snapshot(self):
+        """Test the body is only rebuilt when the snapshot changes"""
+        body = self.exporter.body()
+        self.assertIs(self.exporter.body(), body)
+
+        self.service.last_snapshot = self.service.last_snapshot._replace(
+            cpu=CpuUsage(10.0)
+        )
+        self.assertIn(b"syspilot_cpu_usage_percent 10\n", self.exporter.body())
+
+
+class TestControlSocket(unittest.TestCase):
+    """Test the daemon control socket and its client"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, "daemon.sock")
+
+        history = ColumnarHistory(["value"], 10)
+        history.append(1.0, 20.0)
+        history.append(2.0, 30.0)
+
+        self.daemon = Mock()
+        self.daemon.monitoring_service.alert_engine = AlertEngine()
+        self.daemon.monitoring_service.last_snapshot = SystemSnapshot(
+            timestamp=1700000000.0, cpu=CpuUsage(12.5)
+        )
+        self.daemon.monitoring_service.get_history.return_value = history.view()
+        self.daemon.monitoring_service.metric_values = MonitoringService.metric_values
+        self.daemon.get_daemon_status.return_value = {"running": True}
+
+        self.engine = MonitoringEngine(self.daemon.monitoring_service, 1.0)
+        self.server = ControlServer(self.daemon, self.path, engine=self.engine)
+        self.server.start()
+        self.addCleanup(self.engine.runner.stop)
+        self.addCleanup(self.server.stop)
+
+        self.client = DaemonClient.connect(self.path)
+        self.addCleanup(self.client.close)
+
+    def test_calls(self):
+        """Test snapshot, history and status calls over the socket"""
+        self.assertEqual(self.client.snapshot()["cpu_percent"], 12.5)
+        self.assertEqual(self.client.history("cpu")["value"], [20.0, 30.0])
+        self.assertEqual(self.client.status(), {"running": True})
+
+        with self.assertRaises(ControlError):
+            self.client.call("unknown")
+        # The connection survives an error response
+        self.assertEqual(self.client.status(), {"running": True})
+
+    @unittest.skipIf(history_module.np is None, "numpy is not installed")
+    def test_numpy_results(self):
+        """Test numpy history views encode in every codec"""
+        view = self.daemon.monitoring_service.get_history.return_value
+        self.assertIsInstance(view["value"], history_module.np.ndarray)
+
+        # The client's default codec is msgpack when it is installed
+        for codec in {self.client.codec, CODEC_JSON}:
+            self.client.codec = codec
+            history = self.client.history("cpu")
+            self.assertEqual(history["value"], [20.0, 30.0])
+            self.assertEqual(history["timestamp"], [1.0, 2.0])
+
+    def test_processes_info_in_every_codec(self):
+        """Test PID keys survive the msgpack and JSON codecs"""
+        service = self.daemon.monitoring_service
+        service.get_processes_info.return_value = {42: {"pid": 42, "name": "init"}}
+
+        # The client's default codec is msgpack when it is installed
+        for codec in {self.client.codec, CODEC_JSON}:
+            self.client.codec = codec
+            self.assertEqual(
+                self.client.processes_info([42], ["name"]),
+                {42: {"pid": 42, "name": "init"}},
+            )
+
+    def test_unencodable_result(self):
+        """Test a result that cannot be encoded is answered with an error"""
+        self.daemon.get_daemon_status.return_value = {"running": object()}
+
+        with self.assertRaises(ControlError):
+            self.client.status()
+        self.assertEqual(self.client.snapshot()["cpu_percent"], 12.5)
+
+    def test_subscribe(self):
+        """Test metric subscriptions receive published ticks"""
+        stream = self.client.subscribe(["cpu"])
+        with ThreadPoolExecutor(1) as pool:
+            first = pool.submit(next, stream)
+            while not self.engine.subscriptions:
+                time.sleep(0.01)
+
+            snapshot = self.daemon.monitoring_service.last_snapshot
+            self.engine.runner.loop.call_soon_threadsafe(
+                self.engine.publish, snapshot, {}
+            )
+            self.assertEqual(first.result(5), {"timestamp": 1700000000.0, "cpu": 12.5})
+        stream.close()
+
+    def test_stop_ends_connections(self):
+        """Test stopping the server closes connected clients quietly"""
+        stream = self.client.subscribe(["cpu"])
+        with ThreadPoolExecutor(1) as pool:
+            items = pool.submit(list, stream)
+            while not self.engine.subscriptions:
+                time.sleep(0.01)
+
+            with self.assertNoLogs("asyncio", "ERROR"):
+                self.server.stop()
+            self.assertEqual(items.result(5), [])
+        self.assertFalse(self.engine.subscriptions)
+        self.assertFalse(self.server._clients)
+
+    def test_remote_fallback_on_transport_errors_only(self):
+        """Test a failed call keeps the daemon and a lost daemon falls back"""
+        local = Mock()
+        remote = RemoteMonitoringService(self.client, lambda: local)
+        service = self.daemon.monitoring_service
+        service.get_statistics.side_effect = ValueError("Unknown metric")
+
+        with self.assertRaises(ControlError):
+            remote.get_statistics(["cpu"], 60)
+        self.assertIs(remote.client, self.client)
+        self.assertEqual(remote.get_system_stats()["cpu_percent"], 12.5)
+
+        self.server.stop()
+        self.assertIs(remote.get_system_stats(), local.get_system_stats.return_value)
+        self.assertIsNone(remote.client)
+
+    def test_remote_proxies_process_calls(self):
+        """Test process calls go to the daemon and others are not served"""
+        service = self.daemon.monitoring_service
+        service.get_processes_info.return_value = {42: {"pid": 42, "name": "init"}}
+        factory = Mock()
+        remote = RemoteMonitoringService(self.client, factory)
+
+        self.assertEqual(
+            remote.get_processes_info([42], ["name"]),
+            {42: {"pid": 42, "name": "init"}},
+        )
+        service.get_processes_info.assert_called_once_with([42], ["name"])
+        self.assertFalse(hasattr(remote, "get_tracked_processes"))
+        factory.assert_not_called()
+
+    def test_fallback_without_daemon(self):
+        """Test clients sample locally when no daemon is listening"""
+        self.server.stop()
+        local = Mock()
+        config = Mock()
+        config.get.return_value = {"path": self.path}
+
+        self.assertIsNone(DaemonClient.connect(self.path))
+        self.assertIs(connect_monitoring_service(config, lambda: local), local)
+
+
+class TestMonitoringEngine(unittest.TestCase):
+    """Test the asyncio monitoring engine"""
+
+    def test_ticks_and_background_collectors(self):
+        """Test ticks reach listeners and slow collectors run as tasks"""
+        service = MonitoringService(ConfigManager("/nonexistent/syspilot-test.json"))
+        self.addCleanup(service.stop)
+        engine = MonitoringEngine(service, 0.05)
+        ticks = []
+        engine.add_listener(ticks.append)
+
+        engine.start()
+        deadline = time.monotonic() + 5
+        while len(ticks) < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertIn("top_processes", service.collectors.background)
+        engine.stop()
+
+        self.assertGreaterEqual(len(ticks), 3)
+        self.assertIn("cpu_percent", ticks[-1])
+        self.assertEqual(service.collectors.background, set())
+
+    def test_slow_subscriber_drops_oldest(self):
+        """Test a full subscription queue drops its oldest items"""
+
+        async def scenario():
+            engine = MonitoringEngine(Mock(), 1.0)
+            subscription = engine.subscribe(maxsize=2)
+            for i in range(3):
+                engine.publish(None, {"tick": i})
+            ticks = [(await subscription.__anext__())["tick"] for _ in range(2)]
+            return ticks, subscription.dropped
+
+        self.assertEqual(asyncio.run(scenario()), ([1, 2], 1))
+
+
+class TestSharedSnapshot(unittest.TestCase):
+    """Test shared-memory snapshot publishing"""
+
+    def setUp(self):
+        name = f"syspilot-test-{os.getpid()}"
+        self.publisher = SharedSnapshotPublisher(name, history_size=3)
+        self.addCleanup(self.publisher.close)
+        self.reader = SharedSnapshotReader.open(name)
+        self.addCleanup(self.reader.close)
+
+    def test_read_published_snapshot(self):
+        """Test readers see the latest snapshot and history ring"""
+        self.assertIsNone(self.reader.read())
+        generation = self.reader.generation
+
+        for i in range(5):
+            snapshot = SystemSnapshot(
+                timestamp=1000.0 + i, cpu=CpuUsage(10.0 * i), load_avg=(1, 2, 3)
+            )
+            self.publisher.publish(snapshot, alerts_active=1)
+
+        values = self.reader.read()
+        self.assertNotEqual(self.reader.generation, generation)
+        self.assertEqual(values["cpu_percent"], 40.0)
+        self.assertEqual(values["load_15min"], 3.0)
+        self.assertEqual(values["alerts_active"], 1.0)
+        self.assertIsNone(values["cpu_temperature"])
+        self.assertEqual(self.reader.history()["timestamp"], [1002.0, 1003.0, 1004.0])
+        self.assertEqual(self.reader.history(1)["cpu_percent"], [40.0])
+
+    def test_missing_segment(self):
+        """Test opening a segment nobody publishes"""
+        self.assertIsNone(SharedSnapshotReader.open("syspilot-test-missing"))
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    """Test the memory-mapped history files"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, samples, capacity=4, columns=("value",)):
+        store = TimeSeriesStore(self.temp_dir, capacity=capacity)
+        for timestamp, value in samples:
+            store.append("cpu", columns, timestamp, (value,) * len(columns))
+        store.close()
+
+    def test_reader_sees_writer_samples(self):
+        """Test a read-only mapping sees the ring, oldest first"""
+        self._write([(t, t * 10) for t in range(6)])
+
+        reader = TimeSeriesStore(self.temp_dir, readonly=True)
+        history = reader.read("cpu")
+
+        self.assertEqual(list(history["timestamp"]), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(list(history["value"]), [20.0, 30.0, 40.0, 50.0])
+        self.assertEqual(reader.metrics(), ["cpu"])
+        self.assertEqual(reader.read("missing"), {})
+        del history
+        reader.close()
+
+    def test_survives_restart(self):
+        """Test reopening for writing keeps existing samples"""
+        self._write([(1, 1), (2, 2)])
+        self._write([(3, 3)])
+
+        reader = TimeSeriesStore(self.temp_dir, readonly=True)
+        self.assertEqual(list(reader.read("cpu")["value"]), [1.0, 2.0, 3.0])
+
+    def test_layout_change_resets(self):
+        """Test a different capacity starts a new ring"""
+        self._write([(1, 1), (2, 2)])
+        reader = TimeSeriesStore(self.temp_dir, readonly=True)
+        old = reader.read("cpu")
+
+        self._write([(3, 3)], capacity=8)
+
+        # Mappings of the old file stay readable
+        self.assertEqual(list(old["value"]), [1.0, 2.0])
+        self.assertEqual(list(reader.read("cpu")["value"]), [3.0])
+        self.assertEqual(reader.metrics(), ["cpu"])
+
+
+class TestProcfsReader(unittest.TestCase):
+    """Test the /proc fast-path parsers"""
+
+    FILES = {
+        "stat": "cpu  10 0 10 80 0 0 0 0 0 0\n"
+        "cpu0 5 0 5 40 0 0 0 0 0 0\n"
+        "cpu1 5 0 5 40 0 0 0 0 0 0\n"
+        "intr 0\n",
+        "meminfo": "MemTotal:       1000 kB\n"
+        "MemFree:         200 kB\n"
+        "MemAvailable:    600 kB\n"
+        "Buffers:          10 kB\n"
+        "Cached:          300 kB\n"
+        "SwapTotal:       100 kB\n"
+        "SwapFree:         75 kB\n",
+        "diskstats": "   8       0 sda 10 1 100 5 20 2 200 6 0 7 11 0 0 0 0\n"
+        "   8       1 sda1 10 1 100 5 20 2 200 6 0 7 11 0 0 0 0\n",
+        "net/dev": "Inter-|   Receive |  Transmit\n"
+        " face |bytes packets errs drop fifo frame compressed multicast|bytes\n"
+        "    lo:     100       1    0    0    0     0          0         0"
+        "      100       1    0    0    0     0       0          0\n"
+        "  eth0:    1000      10    1    2    0     0          0         0"
+        "     2000      20    3    4    0     0       0          0\n",
+    }
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.temp_dir, "proc", "net"))
+        os.makedirs(os.path.join(self.temp_dir, "block", "sda"))
+        for name, content in self.FILES.items():
+            with open(os.path.join(self.temp_dir, "proc", name), "w") as f:
+                f.write(content)
+
+        self.reader = ProcfsReader(
+            os.path.join(self.temp_dir, "proc"), os.path.join(self.temp_dir, "block")
+        )
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_cpu_times(self):
+        """Test per-CPU times are parsed in seconds"""
+        ticks = os.sysconf("SC_CLK_TCK")
+        cpus = self.reader.cpu_times()
+
+        self.assertEqual(len(cpus), 2)
+        self.assertEqual(cpus[0][0], 5 / ticks)
+        self.assertEqual(cpus[0][3], 40 / ticks)
+
+    def test_memory(self):
+        """Test memory and swap come from one meminfo read"""
+        memory, swap = self.reader.memory()
+
+        self.assertEqual(memory.total, 1000 * 1024)
+        self.assertEqual(memory.available, 600 * 1024)
+        self.assertEqual(memory.percent, 40.0)
+        self.assertEqual(swap.used, 25 * 1024)
+        self.assertEqual(swap.percent, 25.0)
+
+    def test_disk_totals_skip_partitions(self):
+        """Test partitions are not double counted in disk totals"""
+        totals = self.reader.disk_io_counters()
+
+        self.assertEqual(totals.read_count, 10)
+        self.assertEqual(totals.write_bytes, 200 * 512)
+        self.assertEqual(len(self.reader.disk_io_counters(perdisk=True)), 2)
+
+    def test_network(self):
+        """Test interface counters and totals"""
+        totals = self.reader.net_io_counters()
+        eth0 = self.reader.net_io_counters(pernic=True)["eth0"]
+
+        self.assertEqual(totals.bytes_recv, 1100)
+        self.assertEqual(eth0.bytes_sent, 2000)
+        self.assertEqual(eth0.dropin, 2)
+        self.assertEqual(eth0.errout, 3)
+
+    def test_rereads_in_place(self):
+        """Test the kept-open handle sees new content"""
+        with open(os.path.join(self.temp_dir, "proc", "meminfo"), "w") as f:
+            f.write("MemTotal: 2000 kB\nMemFree: 1000 kB\nMemAvailable: 1000 kB\n")
+
+        memory, _ = self.reader.memory()
+
+        self.assertEqual(memory.percent, 50.0)
+
+    def test_unavailable_falls_back(self):
+        """Test a missing procfs disables the fast path"""
+        self.assertIsNone(ProcfsReader.open("/nonexistent-proc"))
+
+
+class TestProcessHistory(unittest.TestCase):
+    """Test per-process history with a bounded pool"""
+
+    Record = namedtuple("Record", "pid start_time name cpu_percent rss num_threads")
+
+    def _records(self, *specs):
+        return {
+            pid: self.Record(pid, start, name, cpu, rss, 4)
+            for pid, start, name, cpu, rss in specs
+        }
+
+    def test_tracks_top_and_named_processes(self):
+        """Test top and name-matched processes get history, others do not"""
+        history = ProcessHistory(
+            max_processes=4, capacity=10, top=1, name_patterns=["pg*"]
+        )
+        records = self._records(
+            (1, 0, "busy", 90.0, 10),
+            (2, 0, "big", 1.0, 900),
+            (3, 0, "pgsql", 0.0, 5),
+            (4, 0, "idle", 0.0, 1),
+        )
+        history.update(100.0, records, read_io=lambda pid: pid * 1000)
+        history.update(102.0, records)
+
+        self.assertEqual({p["pid"] for p in history.processes()}, {1, 2, 3})
+        busy = history.get(1).history.view()
+        self.assertEqual(list(busy["cpu_percent"]), [90.0, 90.0])
+        self.assertEqual(busy["io_bytes"][0], 1000)
+
+    def test_eviction_keeps_memory_fixed(self):
+        """Test churn evicts the least recently interesting process"""
+        history = ProcessHistory(max_processes=2, capacity=5, top=1)
+        for pid in range(1, 6):
+            history.update(float(pid), self._records((pid, pid, f"job{pid}", 50.0, 1)))
+
+        self.assertEqual([p["pid"] for p in history.processes()], [5, 4])
+        self.assertFalse(history.get(4).alive)
+        self.assertIsNone(history.get(1))
+
+        # A reused PID is a different process with its own history
+        history.update(6.0, self._records((4, 99, "other", 80.0, 1)))
+        self.assertEqual(history.get(4).start_time, 99)
+        self.assertEqual(len(history.get(4).history), 1)
+
+
+class TestCgroupUnits(unittest.TestCase):
+    """Test per-unit accounting from a cgroup v2 tree"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self._write("cgroup.controllers", "cpu io memory\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _write_unit(self, path, cpu_usec, memory, rbytes):
+        self._write(f"{path}/cpu.stat", f"usage_usec {cpu_usec}\nuser_usec 0\n")
+        self._write(f"{path}/memory.current", f"{memory}\n")
+        self._write(f"{path}/io.stat", f"8:0 rbytes={rbytes} wbytes=0 rios=1\n")
+        self._write(
+            f"{path}/memory.pressure",
+            "some avg10=1.50 avg60=0.00 avg300=0.00 total=10\n"
+            "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+        )
+
+    def test_rates_and_top_units(self):
+        """Test units are discovered under slices and ranked by usage"""
+        self._write_unit("system.slice/db.service", 0, 500, 0)
+        self._write_unit("system.slice/web.service/worker", 0, 0, 0)
+        self._write("system.slice/web.service/cpu.stat", "usage_usec 0\n")
+        units = CgroupUnits.open(self.temp_dir)
+        self.assertEqual(set(units.units), {"db.service", "web.service"})
+
+        tracker = RateTracker(UNIT_RATE_FIELDS, compute_unit_rates)
+        tracker.update(units.read(), 0.0)
+        self._write_unit("system.slice/db.service", 1_000_000, 800, 4096)
+        rates = tracker.update(units.read(), 2.0)
+
+        self.assertEqual(rates["db.service"]["cpu_percent"], 50.0)
+        self.assertEqual(rates["db.service"]["io_read_bytes"], 2048)
+        self.assertEqual(rates["db.service"]["memory_pressure"], 1.5)
+        self.assertEqual(rates["web.service"]["memory_bytes"], 0)
+
+        top = SystemSnapshot(timestamp=0, cpu=CpuUsage(), unit_rates=rates).top_units()
+        self.assertEqual(top["memory"][0]["unit"], "db.service")
+
+    def test_requires_cgroup_v2(self):
+        """Test no reader is created without a unified hierarchy"""
+        os.remove(os.path.join(self.temp_dir, "cgroup.controllers"))
+        self.assertIsNone(CgroupUnits.open(self.temp_dir))
+
+
+class TestPressure(unittest.TestCase):
+    """Test PSI readings and the busy signal"""
+
+    def test_reader_parses_some_and_full(self):
+        """Test pressure files are parsed, with or without a "full" line"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        os.makedirs(os.path.join(temp_dir, "pressure"))
+        lines = {
+            "cpu": "some avg10=2.50 avg60=1.00 avg300=0.50 total=1000\n",
+            "io": "some avg10=0.00 avg60=0.00 avg300=0.00 total=5\n"
+            "full avg10=1.25 avg60=0.00 avg300=0.00 total=3\n",
+        }
+        for name, content in lines.items():
+            with open(os.path.join(temp_dir, "pressure", name), "w") as f:
+                f.write(content)
+
+        reader = PressureReader.open(temp_dir)
+        self.addCleanup(reader.close)
+        readings = reader.read()
+
+        self.assertEqual(set(readings), {"cpu", "io"})
+        self.assertEqual(readings["cpu"].some_avg10, 2.5)
+        self.assertEqual(readings["cpu"].full_total, 0)
+        self.assertEqual(readings["io"].full_avg10, 1.25)
+
+    def test_busy_from_stall_delta(self):
+        """Test the signal uses stall time since the previous check"""
+        totals = iter([0, 0, 10**9])
+
+        def read():
+            return {"memory": PressureStall(20.0, 0.0, 0.0, next(totals))}
+
+        signal = BusySignal(read, {"memory": 10.0}, min_interval=0)
+
+        # No delta yet: the 10 second average decides
+        self.assertTrue(signal.is_busy())
+        time.sleep(0.01)
+        self.assertEqual(signal.busy_resources(), {})
+        time.sleep(0.01)
+        self.assertEqual(signal.busy_resources(), {"memory": 100.0})
+
+    def test_wait_until_idle_times_out(self):
+        """Test waiting gives up while pressure stays high"""
+        stalled = PressureStall(0.0, 0.0, 0.0, 0)
+        signal = BusySignal(lambda: {"io": stalled}, {"io": -1.0}, min_interval=0)
+        self.assertFalse(signal.wait_until_idle(timeout=0.05, poll=0.01))
+
+
+class TestProcessTable(unittest.TestCase):
+    """Test the incremental process table"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.table = ProcessTable(self.temp_dir)
+        self._write("uptime", "1000.00 2000.00\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def _write_stat(self, pid, name, cpu_ticks, start_ticks=0, rss_pages=10):
+        fields = ["S"] + ["0"] * 40
+        fields[11] = str(cpu_ticks)
+        fields[17] = "1"
+        fields[19] = str(start_ticks)
+        fields[21] = str(rss_pages)
+        self._write(f"{pid}/stat", f"{pid} ({name}) " + " ".join(fields) + "\n")
+
+    def test_cpu_from_delta(self):
+        """Test CPU usage is the delta between two scans"""
+        self._write_stat(1, "idle", 0)
+        self._write_stat(2, "busy worker", 0)
+        self.table.update(now=0.0)
+
+        self._write_stat(2, "busy worker", self.ticks // 2)
+        self.table.update(now=1.0)
+
+        top = self.table.top(1)
+        self.assertEqual(top[0].pid, 2)
+        self.assertEqual(top[0].name, "busy worker")
+        self.assertEqual(top[0].cpu_percent, 50.0)
+
+    def test_new_process_uses_lifetime(self):
+        """Test a process seen once is estimated from its lifetime"""
+        self._write_stat(1, "init", 100 * self.ticks)
+        self.table.update(now=0.0)
+
+        self.assertEqual(self.table.records[1].cpu_percent, 10.0)
+
+    def test_dead_and_reused_pids(self):
+        """Test exited PIDs expire and reused PIDs get a fresh record"""
+        self._write_stat(1, "old", 0)
+        self._write_stat(2, "gone", 0)
+        self.table.update(now=0.0)
+        old = self.table.records[1]
+
+        shutil.rmtree(os.path.join(self.temp_dir, "2"))
+        self._write_stat(1, "new", 0, start_ticks=500 * self.ticks)
+        self.table.update(now=1.0)
+
+        self.assertNotIn(2, self.table.records)
+        self.assertIsNot(self.table.records[1], old)
+        self.assertEqual(self.table.records[1].name, "new")
+
+
+class TestThermalSensors(unittest.TestCase):
+    """Test CPU temperature source resolution"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.hwmon = os.path.join(self.temp_dir, "hwmon")
+        self.thermal = os.path.join(self.temp_dir, "thermal")
+        self._write("hwmon/hwmon0/name", "acpitz")
+        self._write("hwmon/hwmon0/temp1_input", "30000")
+        for socket, package in ((1, 55000), (2, 61500)):
+            self._write(f"hwmon/hwmon{socket}/name", "coretemp")
+            self._write(f"hwmon/hwmon{socket}/temp1_label", f"Package id {socket}")
+            self._write(f"hwmon/hwmon{socket}/temp1_input", str(package))
+            self._write(f"hwmon/hwmon{socket}/temp2_label", "Core 0")
+            self._write(f"hwmon/hwmon{socket}/temp2_input", "90000")
+        self._write("thermal/thermal_zone0/type", "acpitz")
+        self._write("thermal/thermal_zone0/temp", "30000")
+
+        self.sensors = ThermalSensors(self.hwmon, self.thermal)
+
+    def tearDown(self):
+        self.sensors.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content + "\n")
+
+    def test_package_sensor_per_socket(self):
+        """Test the coretemp package sensors are used, hottest socket wins"""
+        labels = [sensor.label for sensor in self.sensors.cpu_sensors]
+
+        self.assertEqual(labels, ["Package id 1", "Package id 2"])
+        self.assertEqual(self.sensors.cpu_temperature(), 61.5)
+
+    def test_all_sensors_on_demand(self):
+        """Test every sensor is listed with its label"""
+        sensors = self.sensors.all_sensors()
+
+        self.assertEqual(len(sensors), 6)
+        self.assertIn({"chip": "coretemp", "label": "Core 0", "current": 90.0}, sensors)
+        self.assertEqual(sensors[-1]["chip"], "thermal_zone")
+
+    def test_rediscovers_removed_device(self):
+        """Test a failed read resolves the sources again"""
+        shutil.rmtree(os.path.join(self.hwmon, "hwmon1"))
+        shutil.rmtree(os.path.join(self.hwmon, "hwmon2"))
+        self._write("hwmon/hwmon3/name", "k10temp")
+        self._write("hwmon/hwmon3/temp1_label", "Tccd1")
+        self._write("hwmon/hwmon3/temp1_input", "40000")
+        self._write("hwmon/hwmon3/temp2_label", "Tctl")
+        self._write("hwmon/hwmon3/temp2_input", "48000")
+        self.sensors.rescan_interval = 0
+
+        self.assertEqual(self.sensors.cpu_temperature(), 48.0)
+
+
+class TestMonitoringService(unittest.TestCase):
+    """Test system statistics collection"""
+
+    def setUp(self):
+        self.service = MonitoringService(self._config())
+
+    def tearDown(self):
+        self.service.stop()
+
+    def _config(self):
+        from syspilot.utils.config import ConfigManager
+
+        return ConfigManager("/nonexistent/syspilot-test-config.json")
+
+    def test_stats_do_not_block(self):
+        """Test a tick does not block on CPU measurement"""
+        start = time.perf_counter()
+        stats = self.service.get_system_stats()
+        elapsed = time.perf_counter() - start
+
+        self.assertIn("cpu_percent", stats)
+        self.assertIn("cpu_times_percent", stats)
+        self.assertLess(elapsed, 0.1)
+
+    def test_single_read_per_source(self):
+        """Test each source is read once per tick"""
+        collectors = self.service.collectors.collectors
+        readers = {}
+        for name in ("memory", "disk_usage", "network_io"):
+            readers[name] = collectors[name].func = Mock(wraps=collectors[name].func)
+
+        self.service.get_system_stats()
+
+        for name, reader in readers.items():
+            self.assertEqual(reader.call_count, 1, name)
+
+    def test_collectors_run_when_due(self):
+        """Test slow collectors are served from cache between refreshes"""
+        calls = []
+        self.service.collectors.register(
+            "boot_time", lambda: calls.append(1) or 0.0, interval=None
+        )
+        self.service.collectors.register(
+            "top_processes", lambda: calls.append(2) or [], interval=60
+        )
+
+        self.service.get_system_stats()
+        self.service.get_system_stats()
+
+        self.assertEqual(sorted(calls), [1, 2])
+
+    def test_statistics_over_history(self):
+        """Test several metrics are summarized in one call"""
+        now = time.time()
+        for offset, value in ((30, 20.0), (20, 40.0), (10, 60.0)):
+            self.service.cpu_history.append(now - offset, value)
+            self.service.memory_history.append(now - offset, 50.0)
+
+        stats = self.service.get_statistics(
+            ["cpu", "memory"], 60, {"cpu": 30}, persisted=False
+        )
+
+        self.assertEqual(stats["cpu"]["mean"], 40.0)
+        self.assertEqual(stats["cpu"]["time_above"], 10.0)
+        self.assertEqual(stats["memory"]["max"], 50.0)
+        self.assertEqual(stats["memory"]["resolution"], "raw")
+
+    def test_statistics_ignore_stale_persisted_history(self):
+        """Test a history file without recent samples falls back to memory"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        now = time.time()
+        store = TimeSeriesStore(temp_dir, capacity=8)
+        store.append("cpu", ("value",), now - 86400, (90.0,))
+        store.close()
+        self.service.persisted_history = TimeSeriesStore(temp_dir, readonly=True)
+        for offset in (30, 20, 10):
+            self.service.cpu_history.append(now - offset, 40.0)
+
+        stats = self.service.get_statistics(["cpu"], 3600)
+
+        self.assertEqual(stats["cpu"]["count"], 3)
+        self.assertEqual(stats["cpu"]["mean"], 40.0)
+
+    def test_device_histories_expire(self):
+        """Test virtual interfaces are skipped and gone devices are dropped"""
+        rates = dict.fromkeys(NETWORK_RATE_FIELDS, 1.0)
+        self.service._update_history(
+            SystemSnapshot(
+                timestamp=1000.0,
+                cpu=CpuUsage(0.0),
+                interface_rates={"eth0": rates, "veth1a2b": rates, "lo": rates},
+            )
+        )
+        self.assertIn("net_io.eth0", self.service.histories)
+        self.assertNotIn("net_io.veth1a2b", self.service.histories)
+        self.assertNotIn("net_io.lo", self.service.histories)
+
+        self.service._update_history(
+            SystemSnapshot(
+                timestamp=2000.0, cpu=CpuUsage(0.0), interface_rates={"eth1": rates}
+            )
+        )
+        self.assertNotIn("net_io.eth0", self.service.histories)
+        self.assertIn("net_io.eth1", self.service.histories)
+
+    def test_psutil_disks_skip_partitions(self):
+        """Test the psutil fallback counts whole disks only"""
+        counters = {"sda": 1, "sda1": 2, "nvme0n1": 3, "nvme0n1p1": 4}
+        disks = {"/sys/block/sda", "/sys/block/nvme0n1"}
+        with patch("psutil.disk_io_counters", return_value=counters), patch(
+            "os.path.isdir", return_value=True
+        ), patch("os.path.exists", side_effect=disks.__contains__):
+            self.assertEqual(
+                self.service._read_psutil_disks(), {"sda": 1, "nvme0n1": 3}
+            )
+
+    def test_alert_events_are_transitions(self):
+        """Test a sustained alert is reported as an event only once"""
+        # Only the disk rule can fire, however busy the test host is
+        never = {key: float("inf") for _, key, *_ in THRESHOLD_ALERTS}
+        self.service.alert_thresholds = dict(never, disk_percent=-1)
+
+        first = self.service.get_system_stats()
+        second = self.service.get_system_stats()
+
+        self.assertEqual(
+            [event["name"] for event in first["alert_events"]], ["disk_percent"]
+        )
+        self.assertEqual(second["alert_events"], [])
+        self.assertIn("disk", [alert["type"] for alert in second["alerts"]])
+
+    def test_alerts_match_snapshot(self):
+        """Test alerts are evaluated on the same values that are returned"""
+        self.service.alert_thresholds = {
+            "cpu_percent": -1,
+            "memory_percent": -1,
+            "disk_percent": -1,
+        }
+
+        stats = self.service.get_system_stats()
+        alerts = {alert["type"]: alert["value"] for alert in stats["alerts"]}
+
+        self.assertEqual(alerts["cpu"], stats["cpu_percent"])
+        self.assertEqual(alerts["memory"], stats["memory_percent"])
+        self.assertEqual(alerts["disk"], stats["disk_percent"])
+        self.assertEqual(
+            self.service.get_history("memory")["value"][-1], stats["memory_percent"]
+        )
+
+    def test_processes_info_reads_requested_fields_once_per_tick(self):
+        """Test batch process info computes only missing fields within a tick"""
+        self.service.get_system_stats()
+        pid = os.getpid()
+
+        first = self.service.get_processes_info(
+            [pid, 2**31 - 1], ["name", "connections"]
+        )
+        readers = "syspilot.services.monitoring_service.PROCESS_READERS"
+        with patch.dict(readers, name=Mock(side_effect=AssertionError)):
+            again = self.service.get_processes_info([pid], ["name", "num_threads"])
+
+        self.assertEqual(list(first), [pid])
+        self.assertEqual(set(first[pid]), {"pid", "name", "connections"})
+        self.assertIsInstance(first[pid]["connections"], int)
+        self.assertEqual(again[pid]["name"], first[pid]["name"])
+        self.assertGreaterEqual(again[pid]["num_threads"], 1)
+        with self.assertRaises(ValueError):
+            self.service.get_processes_info([pid], ["bogus"])
+
+
+if __name__ == "__main__":
+    unittest.main()